@@ -0,0 +1,132 @@
+"""AIMD concurrency limit for the series scan (``--workers auto``).
+
+The limit grows by one worker after every window of healthy responses and is
+cut multiplicatively when Sonarr answers 429/5xx, a request had to be
+retried, or latency climbs well above the best level seen so far.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_SMOOTHING = 0.2
+BASELINE_DRIFT = 0.01
+# Below this many seconds above the baseline, jitter is not treated as congestion.
+MIN_LATENCY_INCREASE = 0.05
+
+
+class AdaptiveConcurrency:
+    """Shared limit on series fetched at once, adjusted from response feedback.
+
+    ``observe`` is a requests response hook: urllib3 retries stay invisible
+    to the caller, so the retry history of each final response is inspected
+    too. At most one decrease is applied per window, since the requests
+    already in flight when Sonarr started struggling report the same event.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        overload_statuses=(429, 500, 502, 503, 504),
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.5,
+        clock=time.monotonic,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = initial
+        self.overload_statuses = frozenset(overload_statuses)
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self._clock = clock
+        self._started = clock()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._healthy = 0
+        self._since_decrease = None
+        self._smoothed = None
+        self._baseline = None
+        self.timeline = [(0.0, initial)]
+
+    @contextmanager
+    def slot(self):
+        """Hold one unit of concurrency, waiting while the limit is reached."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def observe(self, response, *args, **kwargs):
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        overloaded = response.status_code in self.overload_statuses or any(
+            attempt.error is not None or attempt.status in self.overload_statuses
+            for attempt in getattr(retries, "history", ())
+        )
+        self.record(response.elapsed.total_seconds(), overloaded)
+        return response
+
+    def record(self, latency: float, overloaded: bool = False):
+        """Feed one response: its time to headers and whether Sonarr pushed back."""
+        with self._condition:
+            if self._smoothed is None:
+                self._smoothed = latency
+            else:
+                self._smoothed += (latency - self._smoothed) * LATENCY_SMOOTHING
+            if self._baseline is None or self._smoothed < self._baseline:
+                self._baseline = self._smoothed
+            else:
+                self._baseline += (self._smoothed - self._baseline) * BASELINE_DRIFT
+            if self._since_decrease is not None:
+                self._since_decrease += 1
+                if self._since_decrease >= self.limit:
+                    self._since_decrease = None
+            congested = (
+                self._smoothed > self._baseline * self.latency_tolerance
+                and self._smoothed - self._baseline > MIN_LATENCY_INCREASE
+            )
+            if overloaded or congested:
+                self._healthy = 0
+                if self._since_decrease is None:
+                    self._since_decrease = 0
+                    self._set_limit(min(self.limit - 1, int(self.limit * self.decrease_factor)))
+                return
+            self._healthy += 1
+            if self._healthy >= self.limit:
+                self._healthy = 0
+                self._set_limit(self.limit + 1)
+
+    def _set_limit(self, limit: int):
+        limit = max(self.minimum, min(self.maximum, limit))
+        if limit == self.limit:
+            return
+        self.limit = limit
+        self.timeline.append((self._clock() - self._started, limit))
+        self._condition.notify_all()
+
+    def summary(self) -> dict:
+        limits = [limit for _, limit in self.timeline]
+        return {
+            "final": self.limit,
+            "min": min(limits),
+            "max": max(limits),
+            "changes": len(self.timeline) - 1,
+            "timeline": [[round(elapsed, 3), limit] for elapsed, limit in self.timeline],
+        }
+
+
+def format_timeline(timeline, shown: int = 12) -> str:
+    """``0.0s→4, 1.2s→5, …`` keeping the first and last changes of a long timeline."""
+    parts = [f"{elapsed:.1f}s→{limit}" for elapsed, limit in timeline]
+    if len(parts) > shown:
+        parts = parts[: shown // 2] + ["…"] + parts[-(shown - shown // 2 - 1):]
+    return ", ".join(parts)
@@ -0,0 +1,182 @@
+"""asyncio transport for the Sonarr JSON API, built on httpx (the ``async`` extra).
+
+httpx owns the connection pool, redirects, proxies and CA bundles from the
+environment, informational responses, chunked framing and content decoding
+(gzip and deflate, plus brotli and zstd when their packages are installed).
+This module only adds what build_session configures for requests: the
+shared urllib3 retry policy, a response hook for ScanStats and errors
+worded like the ones requests raises.
+"""
+
+import asyncio
+import os
+import ssl
+import time
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import httpx
+from urllib3.exceptions import InvalidHeader
+from urllib3.util.retry import RequestHistory, Retry
+
+# Decoded bytes accepted per response; a larger body is rejected instead of
+# being inflated in memory (a compression bomb or a broken proxy).
+MAX_BODY_SIZE = 256 * 1024 * 1024
+MAX_REDIRECTS = 30  # requests' default
+
+
+class AsyncHTTPError(Exception):
+    """Non-success response, worded like requests' raise_for_status().
+
+    3xx responses that cannot be followed (no Location, 304) are errors too.
+    """
+
+    def __init__(self, status: int, url: str):
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ""
+        kind = "Redirect" if status < 400 else "Client" if status < 500 else "Server"
+        super().__init__(f"{status} {kind} Error: {reason} for url: {url}")
+        self.status = status
+
+
+class AsyncProtocolError(ConnectionError):
+    """Malformed response (status line, headers, chunk framing), worded like requests' ConnectionError for it."""
+
+    def __init__(self, url: str, error: Exception):
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        super().__init__(
+            f"{'HTTPS' if secure else 'HTTP'}ConnectionPool(host={parts.hostname!r}, "
+            f"port={parts.port or (443 if secure else 80)}): Max retries exceeded with url: {target} "
+            f"(Caused by ProtocolError('Connection aborted.', {error!r}))"
+        )
+
+
+def ssl_verification():
+    """CA bundle from REQUESTS_CA_BUNDLE or CURL_CA_BUNDLE, as requests reads it; httpx's defaults otherwise."""
+    bundle = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE")
+    if not bundle:
+        return True
+    if os.path.isdir(bundle):
+        return ssl.create_default_context(capath=bundle)
+    return ssl.create_default_context(cafile=bundle)
+
+
+class AsyncSonarrClient:
+    """httpx connection pool shared by every coroutine of one scan.
+
+    ``limit`` bounds the requests in flight, and therefore the number of
+    open connections per host. ``retry`` is the urllib3 Retry policy of
+    build_session. ``on_response`` is called once per final response, like
+    a requests response hook, with the ``url``, ``status``, ``elapsed``
+    seconds, body ``size`` as transferred, ``decoded_size`` and ``retries``
+    as keyword arguments.
+    """
+
+    def __init__(
+        self,
+        apikey: str,
+        limit: int,
+        timeout,
+        retry: Retry,
+        on_response=None,
+        max_body_size: int = MAX_BODY_SIZE,
+    ):
+        connect_timeout, self.read_timeout = timeout
+        self.retry = retry
+        self.on_response = on_response
+        self.max_body_size = max_body_size
+        self._semaphore = asyncio.Semaphore(limit)
+        self._client = httpx.AsyncClient(
+            headers={"X-Api-Key": apikey, "Accept": "application/json"},
+            # Waiting for a free connection is bounded by the semaphore, not by a pool timeout.
+            timeout=httpx.Timeout(self.read_timeout, connect=connect_timeout, pool=None),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            follow_redirects=True,
+            max_redirects=MAX_REDIRECTS,
+            verify=ssl_verification(),
+        )
+
+    async def get(self, url: str) -> bytes:
+        """Return the body of a successful GET, following redirects and retrying transient failures."""
+        retry = self.retry
+        while True:
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    response, body = await self._fetch(url)
+                    elapsed = time.perf_counter() - started
+            except httpx.TransportError as error:
+                retry = _increment(retry, url, error=error)
+                if retry.is_exhausted():
+                    raise self._transport_error(url, error) from error
+                await asyncio.sleep(retry.get_backoff_time())
+                continue
+            except httpx.DecodingError as error:
+                raise ValueError(f"invalid compressed response body for url: {url}: {error}") from error
+            except httpx.TooManyRedirects as error:
+                raise ConnectionError(f"Exceeded {MAX_REDIRECTS} redirects.") from error
+
+            status = response.status_code
+            if not response.is_success and retry.is_retry("GET", status, "retry-after" in response.headers):
+                next_retry = _increment(retry, url, status=status)
+                if not next_retry.is_exhausted():
+                    delay = _retry_after(retry, response)
+                    retry = next_retry
+                    await asyncio.sleep(retry.get_backoff_time() if delay is None else delay)
+                    continue
+            if self.on_response is not None:
+                self.on_response(
+                    url=url,
+                    status=status,
+                    elapsed=elapsed,
+                    size=response.num_bytes_downloaded,
+                    decoded_size=len(body),
+                    retries=len(retry.history),
+                )
+            if not response.is_success:
+                raise AsyncHTTPError(status, str(response.url))
+            return body
+
+    async def _fetch(self, url: str):
+        async with self._client.stream("GET", url) as response:
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_body_size:
+                    raise ValueError(f"response body over {self.max_body_size} bytes once decoded for url: {url}")
+                chunks.append(chunk)
+        return response, b"".join(chunks)
+
+    def _transport_error(self, url: str, error: httpx.TransportError) -> OSError:
+        if isinstance(error, httpx.ProtocolError):
+            return AsyncProtocolError(url, error)
+        if isinstance(error, httpx.ReadTimeout):
+            return TimeoutError(f"Read timed out. (read timeout={self.read_timeout})")
+        if isinstance(error, httpx.TimeoutException):
+            return TimeoutError(f"Connection timed out. ({error or type(error).__name__})")
+        return ConnectionError(str(error) or type(error).__name__)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def _increment(retry: Retry, url: str, error=None, status=None) -> Retry:
+    # Retry.increment() expects a urllib3 response; the history drives the backoff the same way.
+    return retry.new(
+        total=retry.total - 1,
+        history=(*retry.history, RequestHistory("GET", url, error, status, None)),
+    )
+
+
+def _retry_after(retry: Retry, response: httpx.Response):
+    if not retry.respect_retry_after_header:
+        return None
+    try:
+        return retry.get_retry_after(response)
+    except InvalidHeader:
+        return None
@@ -0,0 +1,57 @@
+"""Compare analysis on the fetching threads with the process-pool analysis stage.
+
+Usage: uv run python benchmarks/bench_analysis_processes.py [--series N] [--episodes M] [--processes 1,2,4]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+from main import MAX_WORKERS, build_session, fetch_all_series_language_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=300)
+    parser.add_argument("--episodes", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--fetch-mode", default="split", choices=("auto", "split", "files"))
+    parser.add_argument(
+        "--processes",
+        default=",".join(str(count) for count in (1, 2, 4, os.cpu_count() or 1)),
+        help="comma-separated process counts to try",
+    )
+    args = parser.parse_args()
+    counts = sorted({int(value) for value in args.processes.split(",")})
+
+    with FakeSonarr(args.series, args.episodes) as fake:
+        print(f"{'analysis':<14} {'wall (s)':>9}")
+        reference = None
+        for processes in [0, *counts]:
+            started = time.perf_counter()
+            result = fetch_all_series_language_data(
+                fake.series,
+                lambda: build_session("benchmark", pool_size=args.workers),
+                fake.base_url,
+                (3.0, 60.0),
+                args.workers,
+                pooled=True,
+                fetch_mode=args.fetch_mode,
+                analysis_processes=processes,
+            )
+            elapsed = time.perf_counter() - started
+            assert not result[1], result[1][:3]
+            if reference is None:
+                reference = result
+            assert result == reference, f"{processes} processes disagree with threads"
+            label = "threads" if not processes else f"{processes} processes"
+            print(f"{label:<14} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
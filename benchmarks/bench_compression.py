@@ -0,0 +1,90 @@
+"""Compressed vs. identity transfer over a bandwidth-limited link to a local Sonarr stand-in.
+
+Every response goes through one shared link of ``--bandwidth`` bytes per
+second, modelling a WAN VPN between the monitoring host and Sonarr. For each
+coding the stand-in can produce (gzip and deflate, plus br and zstd when
+brotli and zstandard are installed) both engines scan the library; wire and
+decoded bytes come from ScanStats, as shown by ``--stats``.
+
+Usage: uv run python benchmarks/bench_compression.py [--series N] [--episodes M] [--bandwidth BYTES]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from benchmarks.fake_sonarr import ENCODERS, FakeSonarr  # noqa: E402
+from main import (  # noqa: E402
+    DEFAULT_WORKERS,
+    build_session,
+    fetch_all_series_language_data,
+    fetch_all_series_language_data_async,
+    get_series,
+)
+from scan_stats import ScanStats, _size  # noqa: E402
+from urllib3.util.request import ACCEPT_ENCODING  # noqa: E402
+
+
+def scan(fake, engine: str, workers: int):
+    stats = ScanStats()
+    timeout = (3.0, 120.0)
+    session = build_session("benchmark", request_counter=stats)
+    try:
+        series = get_series(session, fake.base_url, timeout)
+    finally:
+        session.close()
+    if engine == "threads":
+        result = fetch_all_series_language_data(
+            series,
+            lambda: build_session("benchmark", pool_size=workers, request_counter=stats),
+            fake.base_url,
+            timeout,
+            workers,
+            pooled=True,
+        )
+    else:
+        result = fetch_all_series_language_data_async(
+            series, "benchmark", fake.base_url, timeout, workers, request_counter=stats
+        )
+    return result, stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=100)
+    parser.add_argument("--episodes", type=int, default=40)
+    parser.add_argument("--bandwidth", type=float, default=4_000_000, help="bytes per second of the shared link")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    requests_codings = set(ACCEPT_ENCODING.split(","))
+    with httpx.Client() as client:
+        httpx_codings = {coding.strip() for coding in client.headers["Accept-Encoding"].split(",")}
+    print(f"{'engine':<8} {'coding':<9} {'wall (s)':>9} {'wire':>10} {'decoded':>10} {'ratio':>6}")
+    reference = None
+    for coding in ("identity", *ENCODERS):
+        for engine in ("threads", "async"):
+            if coding != "identity" and coding not in (requests_codings if engine == "threads" else httpx_codings):
+                continue
+            compression = () if coding == "identity" else (coding,)
+            with FakeSonarr(args.series, args.episodes, compression=compression, bandwidth=args.bandwidth) as fake:
+                started = time.perf_counter()
+                result, summary = scan(fake, engine, args.workers)
+                elapsed = time.perf_counter() - started
+            assert not result[1], result[1][:3]
+            if reference is None:
+                reference = result
+            assert result == reference, f"{engine} with {coding} changed the report"
+            ratio = summary["decoded_bytes"] / summary["bytes"]
+            print(
+                f"{engine:<8} {coding:<9} {elapsed:>9.3f} {_size(summary['bytes']):>10} "
+                f"{_size(summary['decoded_bytes']):>10} {ratio:>5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare memory and detector time of dict and interned (SeriesLanguages) summaries.
+
+Usage: uv run python benchmarks/bench_detectors.py [--series N] [--seasons N] [--rounds N]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import DEFAULT_LANGUAGES  # noqa: E402
+from language_codes import SeriesLanguages, normalize_audio_languages  # noqa: E402
+from main import detect_mismatches, detect_wanted_coverage  # noqa: E402
+
+WANTED_SETS = (["ita"], ["eng"], ["ita", "eng"], ["jpn"], ["fra", "deu"])
+
+
+def build_summaries(series_count, seasons, seed=0):
+    rng = random.Random(seed)
+    combos = [normalize_audio_languages(code) for code, _ in DEFAULT_LANGUAGES]
+    weights = [weight for _, weight in DEFAULT_LANGUAGES]
+    summary = {}
+    for series_id in range(series_count):
+        series = {}
+        for season in range(1, seasons + 1):
+            langs = {}
+            for combo in rng.choices(combos, weights, k=rng.randint(1, 3)):
+                langs[combo] = langs.get(combo, 0) + rng.randint(1, 12)
+            series[season] = langs
+        summary[f"Series {series_id:05d}"] = series
+    return summary
+
+
+def measure(build):
+    tracemalloc.start()
+    data = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--seasons", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    plain = build_summaries(args.series, args.seasons)
+    variants = {
+        "dict": lambda: {title: {season: dict(langs) for season, langs in seasons.items()}
+                         for title, seasons in plain.items()},
+        "interned": lambda: {title: SeriesLanguages.from_mapping(seasons) for title, seasons in plain.items()},
+    }
+    print(f"{'summary':<9} {'memory MiB':>11} {'coverage (s)':>13} {'mismatch (s)':>13}")
+    reference = None
+    for name, build in variants.items():
+        data, size = measure(build)
+        started = time.perf_counter()
+        coverage = [
+            detect_wanted_coverage(data, wanted, include_all=True)
+            for _ in range(args.rounds)
+            for wanted in WANTED_SETS
+        ]
+        coverage_time = time.perf_counter() - started
+        started = time.perf_counter()
+        mismatches = [detect_mismatches(data, include_all=True) for _ in range(args.rounds)]
+        mismatch_time = time.perf_counter() - started
+        if reference is None:
+            reference = (coverage, mismatches)
+        assert (coverage, mismatches) == reference, f"{name} disagrees with dict"
+        print(f"{name:<9} {size / 2**20:>11.1f} {coverage_time:>13.3f} {mismatch_time:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare the thread and asyncio fetch engines on a local Sonarr stand-in.
+
+Usage: uv run python benchmarks/bench_engines.py [--series N] [--latency SECONDS]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+from main import (  # noqa: E402
+    MAX_WORKERS,
+    build_session,
+    fetch_all_series_language_data,
+    fetch_all_series_language_data_async,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=1000)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--max-in-flight", type=int, default=128)
+    args = parser.parse_args()
+    timeout = (3.0, 20.0)
+
+    with FakeSonarr(args.series, args.episodes, latency=args.latency) as fake:
+        runs = (
+            (
+                f"threads x{MAX_WORKERS}",
+                lambda: fetch_all_series_language_data(
+                    fake.series,
+                    lambda: build_session("benchmark", pool_size=MAX_WORKERS),
+                    fake.base_url,
+                    timeout,
+                    MAX_WORKERS,
+                    pooled=True,
+                ),
+            ),
+            (
+                f"async x{args.max_in_flight}",
+                lambda: fetch_all_series_language_data_async(
+                    fake.series, "benchmark", fake.base_url, timeout, args.max_in_flight
+                ),
+            ),
+        )
+        print(f"{'engine':<14} {'wall (s)':>9}")
+        for label, run in runs:
+            started = time.perf_counter()
+            _, failures = run()
+            elapsed = time.perf_counter() - started
+            assert not failures, failures[:3]
+            print(f"{label:<14} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare requests, transferred body bytes and wall time of each --fetch-mode.
+
+Usage: uv run python benchmarks/bench_fetch_modes.py [--series N] [--episodes N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+from main import build_session, fetch_all_series_language_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=200)
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with FakeSonarr(args.series, args.episodes) as fake:
+        print(f"{'fetch mode':<10} {'wall (s)':>9} {'requests':>9} {'body MiB':>9}")
+        reference = None
+        for mode in ("split", "auto", "files"):
+            fake.reset_counters()
+            started = time.perf_counter()
+            data, failures = fetch_all_series_language_data(
+                fake.series,
+                lambda: build_session("benchmark", pool_size=args.workers),
+                fake.base_url,
+                (3.0, 20.0),
+                args.workers,
+                pooled=True,
+                fetch_mode=mode,
+            )
+            elapsed = time.perf_counter() - started
+            assert not failures, failures[:3]
+            if reference is None:
+                reference = data
+            assert data == reference, f"{mode} disagrees with split"
+            print(f"{mode:<10} {elapsed:>9.3f} {fake.requests:>9} {fake.bytes_sent / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
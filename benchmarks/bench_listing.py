@@ -0,0 +1,111 @@
+"""Scan wall time and listing memory: whole /series first vs. scanning while it streams.
+
+The stand-in sends /series at ``--series-latency`` seconds per item, like a
+large library that Sonarr serializes slowly, and pads every item with the
+images, seasons and alternate titles Sonarr returns. ``listed first`` is the
+default path (get_series, then the scan); ``streamed`` feeds a SeriesListing
+to the scan, as ``--order sonarr`` does. Memory is what the decoded
+listing holds, as raw items and as SeriesRecords.
+
+Usage: uv run python benchmarks/bench_listing.py [--series N] [--episodes M] [--series-latency SECONDS]
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+from main import (  # noqa: E402
+    DEFAULT_WORKERS,
+    SeriesListing,
+    SeriesRecord,
+    build_session,
+    fetch_all_series_language_data,
+    get_series,
+)
+from series_filters import SeriesFilter  # noqa: E402
+
+
+def pad_like_sonarr(serie: dict):
+    serie_id = serie["id"]
+    serie["overview"] = "x" * 600
+    serie["images"] = [
+        {"coverType": kind, "url": f"/MediaCover/{serie_id}/{kind}.jpg", "remoteUrl": f"https://img/{serie_id}/{kind}"}
+        for kind in ("banner", "poster", "fanart")
+    ]
+    serie["seasons"] = [
+        {"seasonNumber": number, "monitored": True, "statistics": {"episodeFileCount": 10, "sizeOnDisk": 10**10}}
+        for number in range(1, 6)
+    ]
+    serie["alternateTitles"] = [{"title": f"Alt {serie_id} {n}", "seasonNumber": -1} for n in range(3)]
+
+
+def listing_memory(items: list):
+    body = json.dumps(items)
+    results = []
+    for project in (lambda item: item, SeriesRecord):
+        tracemalloc.start()
+        listing = [project(item) for item in json.loads(body)]
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(held)
+        del listing
+    return results
+
+
+def scan(fake, streamed: bool, workers: int):
+    timeout = (3.0, 60.0)
+    session = build_session("benchmark")
+    try:
+        if streamed:
+            series = SeriesListing(session, fake.base_url, timeout, SeriesFilter())
+        else:
+            series = get_series(session, fake.base_url, timeout)
+        return fetch_all_series_language_data(
+            series,
+            lambda: build_session("benchmark", pool_size=workers),
+            fake.base_url,
+            timeout,
+            workers,
+            pooled=True,
+        )
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--series-latency", type=float, default=0.004, help="seconds per /series item")
+    parser.add_argument("--item-latency", type=float, default=0.0005, help="seconds per episode of a response")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    with FakeSonarr(
+        args.series, args.episodes, item_latency=args.item_latency, series_latency=args.series_latency
+    ) as fake:
+        for serie in fake.series:
+            pad_like_sonarr(serie)
+        raw, slim = listing_memory(fake.series)
+        print(f"listing held: raw items {raw / 1024:.0f} KiB, SeriesRecord {slim / 1024:.0f} KiB")
+        print(f"{'mode':<13} {'wall (s)':>9}")
+        reference = None
+        for name, streamed in (("listed first", False), ("streamed", True)):
+            started = time.perf_counter()
+            result = scan(fake, streamed, args.workers)
+            elapsed = time.perf_counter() - started
+            assert not result[1], result[1][:3]
+            if reference is None:
+                reference = result
+            assert result == reference, f"{name} changed the report"
+            print(f"{name:<13} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Compare peak memory of streamed and fully decoded /episode + /episodefile parsing.
+
+Each variant runs in its own process against a shared local Sonarr stand-in,
+so the reported peak RSS only covers that variant's scan. Python allocations
+are traced in a second run, since tracemalloc itself inflates RSS and time.
+``store`` is the default path of main.py: with the cache on, sessions carry
+a ResponseStore and per-series requests are conditional and hashed.
+
+Usage: uv run python benchmarks/bench_memory.py [--series N] [--episodes N] [--workers N]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+import main as checker  # noqa: E402
+
+
+def decoded_get_episodes(session, series_id, base_url, timeout):
+    """The pre-streaming path: decode the whole response, then validate it."""
+    res = session.get(f'{base_url}/episode?seriesId={series_id}', timeout=timeout)
+    res.raise_for_status()
+    return checker.validate_episodes(res.json(), series_id)
+
+
+def decoded_get_episode_files(session, series_id, base_url, timeout):
+    res = session.get(f'{base_url}/episodefile?seriesId={series_id}', timeout=timeout)
+    res.raise_for_status()
+    return checker.validate_episode_files(res.json(), series_id)
+
+
+def peak_rss():
+    # ru_maxrss survives exec and would report the forking benchmark's own peak.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_variant(variant, base_url, series_count, workers, traced):
+    if variant == "decoded":
+        checker.get_episodes = decoded_get_episodes
+        checker.get_episode_files = decoded_get_episode_files
+    response_store = None
+    if variant == "store":
+        from scan_cache import ResponseStore
+
+        response_store = ResponseStore()
+    series = [{"id": series_id, "title": f"Series {series_id}"} for series_id in range(1, series_count + 1)]
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    data, failures = checker.fetch_all_series_language_data(
+        series,
+        lambda: checker.build_session("benchmark", pool_size=workers, response_store=response_store),
+        base_url,
+        (3.0, 60.0),
+        workers,
+        pooled=True,
+    )
+    elapsed = time.perf_counter() - started
+    traced_peak = tracemalloc.get_traced_memory()[1] if traced else None
+    assert not failures, failures[:3]
+    print(json.dumps({
+        "wall": elapsed,
+        "traced_peak": traced_peak,
+        "max_rss": peak_rss(),
+        "digest": repr(
+            sorted((title, sorted((season, sorted(dict(langs).items())) for season, langs in seasons.items()))
+                   for title, seasons in data.items())
+        ),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=32)
+    parser.add_argument("--episodes", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--variant", choices=("streamed", "decoded", "store"), help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.base_url, args.series, args.workers, args.traced)
+        return
+
+    with FakeSonarr(args.series, args.episodes) as fake:
+        print(f"{'parsing':<10} {'wall (s)':>9} {'traced peak MiB':>16} {'peak RSS MiB':>13}")
+        digests = set()
+        for variant in ("decoded", "streamed", "store"):
+            plain, traced = (
+                json.loads(
+                    subprocess.run(
+                        [
+                            sys.executable, __file__,
+                            "--variant", variant,
+                            "--base-url", fake.base_url,
+                            "--series", str(args.series),
+                            "--workers", str(args.workers),
+                            *extra,
+                        ],
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    ).stdout
+                )
+                for extra in ([], ["--traced"])
+            )
+            digests.update((plain["digest"], traced["digest"]))
+            print(
+                f"{variant:<10} {plain['wall']:>9.3f} {traced['traced_peak'] / 2**20:>16.1f} "
+                f"{plain['max_rss'] / 2**20:>13.1f}"
+            )
+        assert len(digests) == 1, "the variants' results differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Time audioLanguages normalization over a realistic distribution of raw values.
+
+Usage: uv run python benchmarks/bench_normalization.py [--values N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import language_codes  # noqa: E402
+
+# Raw mediaInfo.audioLanguages values as Sonarr reports them, with weights.
+RAW_VALUES = (
+    ("ita", 30), ("eng", 20), ("ita/eng", 15), ("eng/ita", 5), ("jpn/eng", 4),
+    ("jpn/ita", 3), ("", 3), ("und", 2), ("Italian / English", 2), ("eng/eng", 2),
+    ("ita/eng/jpn", 2), ("fre/eng", 1), ("ger/eng", 1), ("spa/eng", 1), ("por", 1),
+    ("rus/eng", 1), ("chi/eng", 1), ("ita/und", 1), ("Unknown", 1), ("ENG / ITA", 1),
+)
+
+
+def unmemoized(value):
+    """The same normalization without the cache."""
+    if not value:
+        return "und"
+    return language_codes._normalize_combo.__wrapped__(str(value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=500_000, help="episodes to normalize")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    values = rng.choices([value for value, _ in RAW_VALUES], [weight for _, weight in RAW_VALUES], k=args.values)
+
+    print(f"{'variant':<11} {'total (s)':>10} {'ns/value':>9}")
+    results = {}
+    for name, normalize in (("unmemoized", unmemoized), ("memoized", language_codes.normalize_audio_languages)):
+        started = time.perf_counter()
+        results[name] = [normalize(value) for value in values]
+        elapsed = time.perf_counter() - started
+        print(f"{name:<11} {elapsed:>10.3f} {elapsed / len(values) * 1e9:>9.0f}")
+    assert results["unmemoized"] == results["memoized"]
+    stats = language_codes.normalization_cache_stats()
+    print(f"cache: {stats['hits']} hits, {stats['misses']} misses, hit rate {stats['hit_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Time the full main() pipeline and each of its stages against a synthetic Sonarr.
+
+Stages run in isolation on the same library: fetch (HTTP + parsing), normalize
+(cold audioLanguages normalization), analyze (per-series language counts),
+detect (mismatch and wanted-language reports) and render (text report).
+Medians over ``--rounds`` runs can be saved as JSON and compared with a
+baseline from another commit; the exit code is 1 when a stage regressed.
+
+Usage: uv run python benchmarks/bench_pipeline.py [--series N] [--episodes M] [--latency S]
+       [--error-rate R] [--languages ita=50,eng=25] [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import language_codes  # noqa: E402
+from benchmarks.fake_sonarr import DEFAULT_LANGUAGES, FakeSonarr  # noqa: E402
+from main import (  # noqa: E402
+    DEFAULT_WORKERS,
+    analyze_language_distribution,
+    build_session,
+    detect_issues,
+    fetch_all_series_language_data,
+    main as run_main,
+    print_report,
+)
+
+STAGES = ("pipeline", "fetch", "normalize", "analyze", "detect", "render")
+WANTED = ["ita"]
+
+
+def language_weights(value: str):
+    """``ita=50,eng=25,ita/eng=15`` as (raw audioLanguages, weight) pairs."""
+    pairs = []
+    for item in value.split(","):
+        code, _, weight = item.rpartition("=")
+        try:
+            pairs.append((code.strip(), float(weight)))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected CODE=WEIGHT, got {item!r}") from None
+    return tuple(pairs)
+
+
+def median_time(run, rounds: int):
+    times = []
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def run_pipeline(fake, workers: int):
+    """One main() run; its text report goes to a buffer, timing via --stats."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    argv = [
+        "--apikey", "benchmark", "--url", fake.base_url, "--no-cache",
+        "--workers", str(workers), "--retries", "5", "--retry-backoff", "0", "--stats", "json",
+    ]
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        run_main(argv)
+    text = stderr.getvalue()
+    return json.JSONDecoder().raw_decode(text, text.index("{\n"))[0]
+
+
+def render_report(results):
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        print_report(results)
+    return buffer.getvalue()
+
+
+def measure(args):
+    results = {}
+    with FakeSonarr(
+        args.series,
+        args.episodes,
+        latency=args.latency,
+        languages=args.languages,
+        error_rate=args.error_rate,
+        overview_size=args.overview_size,
+    ) as fake:
+        phases = []
+
+        def pipeline():
+            phases.append(run_pipeline(fake, args.workers))
+
+        results["pipeline"], _ = median_time(pipeline, args.rounds)
+        for phase in ("series_list", "scan", "detection", "output"):
+            results[f"pipeline.{phase}"] = statistics.median(run["phases"][phase] for run in phases)
+
+        fake.reset_counters()
+        results["fetch"], (lang_data, failures) = median_time(
+            lambda: fetch_all_series_language_data(
+                fake.series,
+                lambda: build_session("benchmark", pool_size=args.workers, retries=5, backoff_factor=0),
+                fake.base_url,
+                (3.0, 20.0),
+                args.workers,
+                pooled=True,
+            ),
+            args.rounds,
+        )
+        results["fetch.failures"] = len(failures)
+        results["fetch.bytes"] = fake.bytes_sent // args.rounds
+
+    raw_values = [item["mediaInfo"]["audioLanguages"] for files in fake.files.values() for item in files]
+
+    def normalize():
+        language_codes._normalize_combo.cache_clear()
+        return [language_codes.normalize_audio_languages(value) for value in raw_values]
+
+    results["normalize"], _ = median_time(normalize, args.rounds)
+    files_by_series = {
+        series_id: {item["id"]: item for item in files} for series_id, files in fake.files.items()
+    }
+    results["analyze"], _ = median_time(
+        lambda: [
+            analyze_language_distribution(serie, fake.episodes[serie["id"]], files_by_series[serie["id"]])
+            for serie in fake.series
+        ],
+        args.rounds,
+    )
+    results["detect"], issues = median_time(
+        lambda: detect_issues(lang_data, [], include_all=True) + detect_issues(lang_data, WANTED, include_all=True),
+        args.rounds,
+    )
+    results["render"], _ = median_time(lambda: render_report(issues), args.rounds)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance: float, min_delta: float) -> bool:
+    """Print the change of every stage against the baseline; True when none regressed.
+
+    A stage regresses when it is slower by more than ``tolerance`` and by more
+    than ``min_delta`` seconds, so millisecond stages do not fail on noise.
+    """
+    ok = True
+    print(f"\n{'stage':<10} {'baseline':>10} {'now':>10} {'change':>8}")
+    for stage in STAGES:
+        before = baseline["results"].get(stage)
+        if not before:
+            continue
+        change = results[stage] / before - 1
+        regressed = change > tolerance and results[stage] - before > min_delta
+        ok = ok and not regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{stage:<10} {before:>10.4f} {results[stage]:>10.4f} {change:>+8.1%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=300)
+    parser.add_argument("--episodes", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of per-series requests failing with 503")
+    parser.add_argument("--overview-size", type=int, default=200, help="padding bytes per episode")
+    parser.add_argument("--languages", type=language_weights, default=DEFAULT_LANGUAGES)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="JSON saved by --save on another commit")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="allowed slowdown in seconds")
+    args = parser.parse_args()
+
+    results = measure(args)
+    print(f"{'stage':<22} {'median (s)':>11}")
+    for name, value in results.items():
+        print(f"{name:<22} {value:>11.4f}" if isinstance(value, float) else f"{name:<22} {value:>11}")
+
+    parameters = {
+        key: value for key, value in vars(args).items() if key not in ("save", "compare", "tolerance", "min_delta")
+    }
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "results": results,
+    }
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if baseline.get("parameters") != json.loads(json.dumps(parameters)):
+            print("⚠️ the baseline was measured with different parameters", file=sys.stderr)
+        if not compare(results, baseline, args.tolerance, args.min_delta):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Makespan of a scan for each --order on a library with a few very large series.
+
+Most series have a handful of episodes and ``--large`` of them have
+``--large-episodes``; the large ones sit at the end of /series, the worst
+case for submission in response order. Response time grows with the size of
+the series (``--item-latency`` seconds per episode), as it does on Sonarr.
+
+Usage: uv run python benchmarks/bench_scheduling.py [--series N] [--large K] [--workers W]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+from main import DEFAULT_WORKERS, build_session, fetch_all_series_language_data, order_series  # noqa: E402
+
+
+def episode_counts(args):
+    rng = random.Random(0)
+    small = [rng.randint(args.min_episodes, args.max_episodes) for _ in range(args.series - args.large)]
+    return small + [args.large_episodes] * args.large
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=200)
+    parser.add_argument("--large", type=int, default=2, help="number of very large series")
+    parser.add_argument("--large-episodes", type=int, default=1500)
+    parser.add_argument("--min-episodes", type=int, default=5)
+    parser.add_argument("--max-episodes", type=int, default=60)
+    parser.add_argument("--item-latency", type=float, default=0.001, help="seconds per episode of a response")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with FakeSonarr(
+        args.series, episode_counts(args), item_latency=args.item_latency, overview_size=20
+    ) as fake:
+        print(f"{'order':<8} {'makespan (s)':>13}")
+        reference = None
+        for order in ("sonarr", "largest", "recent"):
+            series = order_series(fake.series, order)
+            times = []
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                result = fetch_all_series_language_data(
+                    series,
+                    lambda: build_session("benchmark", pool_size=args.workers),
+                    fake.base_url,
+                    (3.0, 60.0),
+                    args.workers,
+                    pooled=True,
+                )
+                times.append(time.perf_counter() - started)
+            assert not result[1], result[1][:3]
+            if reference is None:
+                reference = result
+            assert result == reference, f"--order {order} changed the report"
+            print(f"{order:<8} {min(times):>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
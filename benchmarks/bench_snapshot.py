@@ -0,0 +1,96 @@
+"""Snapshot size and diff time against re-detecting and comparing two full reports.
+
+A synthetic library of ``--series`` series is saved as a snapshot and as the
+``--json --show-all`` report; then ``--changed`` series change their counts.
+``snapshot diff`` opens the previous snapshot and diffs it as
+``--diff-against`` does; ``full compare`` loads the previous report, detects
+the issues of the whole new scan and matches them by series and season.
+
+Usage: uv run python benchmarks/bench_snapshot.py [--series N] [--seasons S] [--changed C]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import detect_issues  # noqa: E402
+from scan_snapshot import ScanIndex, Snapshot, diff_snapshots, issue_key  # noqa: E402
+
+COMBOS = ("ita", "eng", "ita+eng", "jpn", "und")
+
+
+def build_lang_data(series: int, seasons: int, rng: random.Random) -> dict:
+    return {
+        f"Series {index:05d}": {
+            season: {combo: rng.randint(1, 24) for combo in rng.sample(COMBOS, rng.randint(1, 3))}
+            for season in range(1, seasons + 1)
+        }
+        for index in range(series)
+    }
+
+
+def detect(lang_summary):
+    return detect_issues(lang_summary, [], include_all=True, ignore_unknown=False)
+
+
+def full_compare(report_path: Path, lang_data: dict) -> dict:
+    previous = {issue_key(issue): issue for issue in json.loads(report_path.read_text(encoding="utf-8"))}
+    diff = {"new": [], "resolved": [], "changed": []}
+    for issue in detect(lang_data):
+        old = previous.pop(issue_key(issue), None)
+        if old is None:
+            diff["new"].append(issue)
+        elif old != issue:
+            diff["changed"].append({"before": old, "after": issue})
+    diff["resolved"] = list(previous.values())
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--seasons", type=int, default=6)
+    parser.add_argument("--changed", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    previous = build_lang_data(args.series, args.seasons, rng)
+    current = {
+        title: {season: dict(counts) for season, counts in seasons.items()} for title, seasons in previous.items()
+    }
+    for title in rng.sample(sorted(current), args.changed):
+        current[title][1] = {"ita": 7, "eng": 3}
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = Path(directory) / "scan.snap"
+        report_path = Path(directory) / "report.json"
+        snapshot_path.write_bytes(ScanIndex(previous).encode())
+        report_path.write_text(json.dumps(detect(previous), ensure_ascii=False, indent=2), encoding="utf-8")
+        sizes = snapshot_path.stat().st_size / 1024, report_path.stat().st_size / 1024
+        print(f"snapshot {sizes[0]:.0f} KiB, report {sizes[1]:.0f} KiB")
+
+        print(f"{'mode':<14} {'wall (ms)':>10}")
+        reference = None
+        for name in ("full compare", "snapshot diff"):
+            started = time.perf_counter()
+            if name == "full compare":
+                diff = full_compare(report_path, current)
+            else:
+                with Snapshot(snapshot_path) as snapshot:
+                    diff = diff_snapshots(snapshot, ScanIndex(current), detect)
+            elapsed = time.perf_counter() - started
+            summary = {key: sorted(map(str, items)) for key, items in diff.items()}
+            if reference is None:
+                reference = summary
+            assert summary == reference, f"{name} changed the diff"
+            print(f"{name:<14} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
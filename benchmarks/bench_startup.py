@@ -0,0 +1,76 @@
+"""Wall time of invocations that end before any scan, as run from cron every minute.
+
+Each command runs ``--runs`` times in a fresh interpreter; the median is
+printed next to a bare interpreter start, so the difference is what main.py
+itself costs. The import time of ``--help`` follows: the modules main.py
+imports after ``site``, from ``-X importtime``, with the slowest ones.
+
+Usage: uv run python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+COMMANDS = {
+    "python -c pass": ["-c", "pass"],
+    "--help": [str(MAIN), "--help"],
+    "argument error": [str(MAIN), "--workers", "0"],
+    "missing API key": [str(MAIN)],
+}
+
+
+def median_ms(argv, runs: int) -> float:
+    env = {**os.environ, "API_KEY": "", "SONARR_URL": ""}
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *argv], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def import_times_us(argv) -> dict:
+    """Cumulative import time of each top-level module imported after ``site``, in µs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv], capture_output=True, text=True, env={**os.environ, "API_KEY": ""}
+    )
+    top_level = {}
+    after_site = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if after_site and not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative)
+        after_site = after_site or name.strip() == "site"
+    return top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'command':<16} {'median (ms)':>12} {'over python':>12}")
+    baseline = None
+    for name, argv in COMMANDS.items():
+        elapsed = median_ms(argv, args.runs)
+        baseline = elapsed if baseline is None else baseline
+        print(f"{name:<16} {elapsed:>12.1f} {elapsed - baseline:>12.1f}")
+
+    runs = [import_times_us(COMMANDS["--help"]) for _ in range(args.runs)]
+    totals = [sum(run.values()) / 1000 for run in runs]
+    print(f"\n--help imports: median {statistics.median(totals):.1f} ms; slowest:")
+    slowest = sorted(runs[-1].items(), key=lambda item: -item[1])[:5]
+    for module, cumulative in slowest:
+        print(f"  {module:<24} {cumulative / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare per-series sessions with the shared connection pool.
+
+Usage: uv run python benchmarks/bench_transport.py [--series N] [--workers N] [--latency SECONDS]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_sonarr import FakeSonarr  # noqa: E402
+from main import build_session, fetch_all_series_language_data  # noqa: E402
+
+
+def run(fake, workers, pooled):
+    fake.reset_counters()
+    started = time.perf_counter()
+    data, failures = fetch_all_series_language_data(
+        fake.series,
+        lambda: build_session("benchmark", pool_size=workers),
+        fake.base_url,
+        (3.0, 20.0),
+        workers,
+        pooled=pooled,
+    )
+    elapsed = time.perf_counter() - started
+    assert not failures, failures
+    return elapsed, fake.connections, fake.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    with FakeSonarr(args.series, args.episodes, latency=args.latency) as fake:
+        print(f"{'transport':<12} {'wall (s)':>9} {'connections':>12} {'requests':>9}")
+        for label, pooled in (("per-series", False), ("pooled", True)):
+            elapsed, connections, requests_count = run(fake, args.workers, pooled)
+            print(f"{label:<12} {elapsed:>9.3f} {connections:>12} {requests_count:>9}")
+
+
+if __name__ == "__main__":
+    main()
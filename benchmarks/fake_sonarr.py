@@ -0,0 +1,372 @@
+"""Local stand-in for the subset of the Sonarr v4 API used by main.py."""
+
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_LANGUAGES = (
+    ("ita", 50),
+    ("eng", 25),
+    ("ita/eng", 15),
+    ("jpn/eng", 5),
+    ("", 3),
+    ("Italian / English", 2),
+)
+
+
+def build_library(
+    series_count,
+    episodes_per_series,
+    episodes_per_season=10,
+    languages=DEFAULT_LANGUAGES,
+    seed=0,
+    overview_size=200,
+):
+    """Generate a deterministic library: /series items plus episodes and files per series id.
+
+    ``episodes_per_series`` is either one count for every series or a list
+    with the count of each series, in /series order. ``languages`` pairs raw ``audioLanguages`` values with weights;
+    ``overview_size`` pads every episode to model larger payloads.
+    """
+    rng = random.Random(seed)
+    codes = [code for code, _ in languages]
+    weights = [weight for _, weight in languages]
+    series = []
+    episodes = {}
+    files = {}
+    if isinstance(episodes_per_series, int):
+        episodes_per_series = [episodes_per_series] * series_count
+    for series_id, episode_count in zip(range(1, series_count + 1), episodes_per_series):
+        series_episodes = []
+        series_files = []
+        for number in range(episode_count):
+            season = number // episodes_per_season + 1
+            file_id = series_id * 100_000 + number
+            series_episodes.append(
+                {
+                    "id": file_id,
+                    "seriesId": series_id,
+                    "seasonNumber": season,
+                    "episodeNumber": number % episodes_per_season + 1,
+                    "episodeFileId": file_id,
+                    "hasFile": True,
+                    "title": f"Episode {number + 1}",
+                    "overview": "x" * overview_size,
+                    "airDate": "2020-01-01",
+                    "airDateUtc": "2020-01-01T20:00:00Z",
+                    "runtime": 45,
+                    "monitored": True,
+                    "tvdbId": 1_000_000 + file_id,
+                    "absoluteEpisodeNumber": number + 1,
+                    "unverifiedSceneNumbering": False,
+                }
+            )
+            episode_code = f"S{season:02d}E{number % episodes_per_season + 1:02d}"
+            series_files.append(
+                {
+                    "id": file_id,
+                    "seriesId": series_id,
+                    "seasonNumber": season,
+                    "relativePath": f"Season {season:02d}/Series {series_id} - {episode_code}.mkv",
+                    "path": f"/tv/Series {series_id}/Season {season:02d}/Series {series_id} - {episode_code}.mkv",
+                    "size": 1_000_000_000,
+                    "dateAdded": "2020-01-02T03:04:05Z",
+                    "sceneName": f"Series.{series_id}.{episode_code}.1080p.WEB-DL.x265-GROUP",
+                    "releaseGroup": "GROUP",
+                    "languages": [{"id": 5, "name": "Italian"}, {"id": 1, "name": "English"}],
+                    "quality": {
+                        "quality": {"id": 3, "name": "WEBDL-1080p", "source": "web", "resolution": 1080},
+                        "revision": {"version": 1, "real": 0, "isRepack": False},
+                    },
+                    "customFormats": [],
+                    "customFormatScore": 0,
+                    "indexerFlags": 0,
+                    "releaseType": "singleEpisode",
+                    "mediaInfo": {
+                        "audioBitrate": 384000,
+                        "audioChannels": 5.1,
+                        "audioCodec": "AAC",
+                        "audioLanguages": rng.choices(codes, weights)[0],
+                        "audioStreamCount": 2,
+                        "videoBitDepth": 10,
+                        "videoBitrate": 4_000_000,
+                        "videoCodec": "x265",
+                        "videoFps": 23.976,
+                        "videoDynamicRange": "",
+                        "videoDynamicRangeType": "",
+                        "resolution": "1920x1080",
+                        "runTime": "44:12",
+                        "scanType": "Progressive",
+                        "subtitles": "ita/eng",
+                    },
+                    "qualityCutoffNotMet": False,
+                }
+            )
+        episodes[series_id] = series_episodes
+        files[series_id] = series_files
+        series.append(
+            {
+                "id": series_id,
+                "title": f"Series {series_id:05d}",
+                "year": 2000 + series_id % 25,
+                "seriesType": "anime" if series_id % 10 == 0 else "standard",
+                "path": f"/tv/Series {series_id}",
+                "rootFolderPath": "/tv/",
+                "qualityProfileId": 1,
+                "monitored": series_id % 4 != 0,
+                "tags": [1] if series_id % 3 == 0 else [],
+                "lastInfoSync": "2026-01-01T00:00:00Z",
+                "statistics": {
+                    "episodeFileCount": episode_count,
+                    "episodeCount": episode_count,
+                    "totalEpisodeCount": episode_count,
+                    "sizeOnDisk": episode_count * 1_000_000_000,
+                },
+            }
+        )
+    return series, episodes, files
+
+
+def _deflate(body):
+    return zlib.compress(body, 6)
+
+
+# Codings the stand-in can serve; brotli and zstd only when their packages are installed.
+ENCODERS = {"gzip": lambda body: gzip.compress(body, 6, mtime=0), "deflate": _deflate}
+try:
+    import brotli
+
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=4)
+except ImportError:
+    pass
+try:
+    import zstandard
+
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+except ImportError:
+    pass
+
+
+class _CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, handler, fake):
+        super().__init__(address, handler)
+        self.fake = fake
+
+    def process_request(self, request, client_address):
+        with self.fake.lock:
+            self.fake.connections += 1
+        super().process_request(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        return None
+
+    def do_GET(self):
+        fake = self.server.fake
+        with fake.lock:
+            fake.requests += 1
+        url = urlsplit(self.path)
+        self.pace = 0.0
+        query = parse_qs(url.query)
+        series_id = int(query.get("seriesId", ["0"])[0])
+        delay = fake.latency + fake.item_latency * len(fake.episodes.get(series_id, ()))
+        if delay:
+            time.sleep(delay)
+        if series_id and fake.should_fail():
+            self._send(503, b'{"message": "Service Unavailable"}')
+            return
+        if url.path == "/api/v3/series":
+            payload = fake.series
+            self.pace = fake.series_latency
+        elif url.path.startswith("/api/v3/series/") and url.path.rsplit("/", 1)[1] in fake.series_by_id():
+            payload = fake.series_by_id()[url.path.rsplit("/", 1)[1]]
+        elif url.path == "/api/v3/tag":
+            payload = fake.tags
+        elif url.path == "/api/v3/history/since":
+            since = query.get("date", [""])[0]
+            payload = [event for event in fake.history if event["date"] >= since]
+        elif url.path == "/api/v3/episode" and series_id in fake.episodes:
+            payload = fake.episodes[series_id]
+            if fake.embed_episode_files and query.get("includeEpisodeFile") == ["true"]:
+                files_by_id = {item["id"]: item for item in fake.files[series_id]}
+                payload = [
+                    {**episode, "episodeFile": files_by_id[episode["episodeFileId"]]}
+                    for episode in payload
+                ]
+        elif url.path == "/api/v3/episodefile" and series_id in fake.files:
+            payload = fake.files[series_id]
+        else:
+            self._send(404, b'{"message": "NotFound"}')
+            return
+        body = json.dumps(payload).encode()
+        encoding = fake.negotiate(self.headers.get("Accept-Encoding", ""))
+        if encoding is not None:
+            body = fake.encode(body, encoding)
+        if fake.etags:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                with fake.lock:
+                    fake.not_modified += 1
+                self._send(304, b"", etag)
+                return
+            self._send(200, body, etag, encoding)
+            return
+        self._send(200, body, encoding=encoding)
+
+    def _send(self, status, body, etag=None, encoding=None):
+        fake = self.server.fake
+        with fake.lock:
+            fake.bytes_sent += len(body)
+        fake.throttle(len(body))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not self.pace or status != 200:
+            self.wfile.write(body)
+            return
+        step = max(len(body) // max(len(fake.series), 1), 1)
+        for start in range(0, len(body), step):
+            time.sleep(self.pace)
+            self.wfile.write(body[start:start + step])
+
+
+class FakeSonarr:
+    """Threaded HTTP/1.1 keep-alive server counting connections, requests and body bytes.
+
+    ``error_rate`` is the share of per-series requests answered with 503,
+    drawn from a seeded generator so runs are reproducible. ``item_latency``
+    adds that many seconds per episode of the requested series, modelling a
+    Sonarr whose query time grows with the size of the show. With ``etags``
+    responses carry an ETag and a matching If-None-Match gets 304.
+    ``compression`` lists the Content-Encodings the server may use, in order
+    of preference among those the client accepts, and ``bandwidth`` (bytes
+    per second) is one link shared by every response, like a WAN VPN.
+    ``series_latency`` paces /series at that many seconds per item, sent as
+    it is produced, like a large library that Sonarr serializes slowly.
+    """
+
+    def __init__(
+        self,
+        series_count=100,
+        episodes_per_series=20,
+        latency=0.0,
+        seed=0,
+        embed_episode_files=True,
+        languages=DEFAULT_LANGUAGES,
+        error_rate=0.0,
+        overview_size=200,
+        item_latency=0.0,
+        etags=False,
+        compression=(),
+        bandwidth=None,
+        series_latency=0.0,
+    ):
+        self.series, self.episodes, self.files = build_library(
+            series_count, episodes_per_series, languages=languages, seed=seed, overview_size=overview_size
+        )
+        self.latency = latency
+        self.item_latency = item_latency
+        self.etags = etags
+        self.compression = tuple(compression)
+        self.bandwidth = bandwidth
+        self.series_latency = series_latency
+        self._link_free_at = 0.0
+        self._encoded = {}
+        self.error_rate = error_rate
+        self._error_rng = random.Random(seed)
+        self.embed_episode_files = embed_episode_files
+        self.history = []
+        self.tags = [{"id": 1, "label": "kids"}]
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.not_modified = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+
+    def reset_counters(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = 0
+            self.bytes_sent = 0
+            self.errors = 0
+            self.not_modified = 0
+
+    def negotiate(self, accept_encoding):
+        offered = {value.split(";", 1)[0].strip().lower() for value in accept_encoding.split(",")}
+        return next((name for name in self.compression if name in offered), None)
+
+    def encode(self, body, encoding):
+        """Compressed ``body``, memoized so repeated scans do not pay for compression again."""
+        key = (encoding, hashlib.sha1(body).digest())
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = ENCODERS[encoding](body)
+        return encoded
+
+    def throttle(self, size):
+        """Sleep until ``size`` bytes got through the shared link."""
+        if not self.bandwidth:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self._link_free_at = max(self._link_free_at, now) + size / self.bandwidth
+            delay = self._link_free_at - now
+        time.sleep(delay)
+
+    def series_by_id(self):
+        """``GET /series/{id}`` items, keyed by the id as it appears in the path."""
+        return {str(serie["id"]): serie for serie in self.series}
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self.lock:
+            failed = self._error_rng.random() < self.error_rate
+            self.errors += failed
+        return failed
+
+    def start(self):
+        self._server = _CountingServer(("127.0.0.1", 0), _Handler, self)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,168 @@
+"""Sonarr instances listed in a TOML config file, scanned together in one run.
+
+Each ``[[instances]]`` table names one server; settings missing from it are
+taken from ``[defaults]`` and then from the command line.
+"""
+
+import argparse
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+INSTANCE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+INSTANCE_KEYS = frozenset({"name", "url", "apikey", "apikey_env", "cache_file"})
+# Settings that may appear both in [defaults] and in an [[instances]] table.
+TUNABLE_KEYS = ("workers", "max_in_flight", "timeout", "retries", "backoff_factor")
+
+
+class ConfigError(ValueError):
+    """The instances file cannot be used."""
+
+
+class SonarrInstance:
+    """Connection settings and concurrency budget of one Sonarr server."""
+
+    def __init__(
+        self,
+        name: Optional[str],
+        url: str,
+        apikey: str,
+        workers: int,
+        max_in_flight: int,
+        timeout: float,
+        retries: int,
+        backoff_factor: float,
+        cache_file: Optional[str] = None,
+    ):
+        self.name = name
+        self.url = url
+        self.apikey = apikey
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.cache_file = cache_file
+
+    def __repr__(self) -> str:
+        return f"SonarrInstance(name={self.name!r}, url={self.url!r})"
+
+
+def instance_cache_file(cache_file, name: str) -> str:
+    """Per-instance cache path, so concurrent scans never share an SQLite writer."""
+    path = Path(cache_file)
+    return str(path.with_name(f"{path.stem}.{name}{path.suffix}"))
+
+
+def load_instances(
+    path,
+    defaults: Dict[str, object],
+    validators: Dict[str, Callable[[str], object]],
+    normalize_url: Callable[[str], str],
+) -> List[SonarrInstance]:
+    """Read and validate the instances of a config file.
+
+    ``defaults`` holds the command-line value of every TUNABLE_KEYS setting
+    plus ``cache_file``; ``validators`` are the argparse type functions used
+    for the same settings on the command line.
+    """
+    try:
+        with open(path, "rb") as config_file:
+            config = tomllib.load(config_file)
+    except tomllib.TOMLDecodeError as error:
+        raise ConfigError(f"{path}: TOML non valido: {error}") from error
+    file_defaults = config.get("defaults", {})
+    if not isinstance(file_defaults, dict):
+        raise ConfigError("[defaults] deve essere una tabella")
+    _check_keys(file_defaults, set(TUNABLE_KEYS), "[defaults]")
+    settings = dict(defaults)
+    settings.update(_validated(file_defaults, validators, "[defaults]"))
+
+    tables = config.get("instances")
+    if not isinstance(tables, list) or not tables:
+        raise ConfigError("serve almeno una tabella [[instances]]")
+    instances = []
+    names = set()
+    for position, table in enumerate(tables, start=1):
+        if not isinstance(table, dict):
+            raise ConfigError(f"l'istanza n. {position} deve essere una tabella")
+        name = table.get("name")
+        if not isinstance(name, str) or not INSTANCE_NAME_PATTERN.match(name):
+            raise ConfigError(
+                f"l'istanza n. {position} richiede un name composto da lettere, cifre, '-' o '_'"
+            )
+        context = f"istanza '{name}'"
+        if name.casefold() in names:
+            raise ConfigError(f"{context}: nome duplicato")
+        names.add(name.casefold())
+        _check_keys(table, INSTANCE_KEYS | set(TUNABLE_KEYS), context)
+        url = table.get("url")
+        if not isinstance(url, str) or not url.strip():
+            raise ConfigError(f"{context}: url mancante")
+        instance_settings = dict(settings)
+        instance_settings.update(_validated(table, validators, context))
+        cache_file = table.get("cache_file")
+        if cache_file is None:
+            cache_file = instance_cache_file(settings["cache_file"], name)
+        elif not isinstance(cache_file, str):
+            raise ConfigError(f"{context}: cache_file deve essere un percorso")
+        instances.append(
+            SonarrInstance(
+                name,
+                normalize_url(url.strip()),
+                _apikey(table, context),
+                workers=instance_settings["workers"],
+                max_in_flight=instance_settings["max_in_flight"],
+                timeout=instance_settings["timeout"],
+                retries=instance_settings["retries"],
+                backoff_factor=instance_settings["backoff_factor"],
+                cache_file=cache_file,
+            )
+        )
+    return instances
+
+
+def _check_keys(table: dict, allowed, context: str):
+    unknown = sorted(set(table) - set(allowed))
+    if unknown:
+        raise ConfigError(f"{context}: chiavi sconosciute: {', '.join(unknown)}")
+
+
+def _validated(table: dict, validators, context: str) -> dict:
+    values = {}
+    for key in TUNABLE_KEYS:
+        if key not in table:
+            continue
+        value = table[key]
+        # TOML already typed the value; bools are ints to Python but not to us.
+        # The only string accepted is "auto", which validators that want it understand.
+        if value != "auto" and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ConfigError(f"{context}: {key} deve essere un numero")
+        try:
+            values[key] = validators[key](str(value))
+        except argparse.ArgumentTypeError as error:
+            raise ConfigError(f"{context}: {key} {error}") from error
+        except ValueError as error:
+            raise ConfigError(f"{context}: {key} non valido: {value!r}") from error
+    return values
+
+
+def _apikey(table: dict, context: str) -> str:
+    if "apikey" in table and "apikey_env" in table:
+        raise ConfigError(f"{context}: usa apikey oppure apikey_env, non entrambi")
+    if "apikey_env" in table:
+        variable = table["apikey_env"]
+        apikey = os.environ.get(variable) if isinstance(variable, str) else None
+        if not apikey:
+            raise ConfigError(f"{context}: variabile d'ambiente {variable} non impostata")
+        return apikey
+    apikey = table.get("apikey")
+    if not isinstance(apikey, str) or not apikey:
+        raise ConfigError(f"{context}: apikey o apikey_env mancante")
+    return apikey
@@ -0,0 +1,84 @@
+"""Item-by-item decoding of a top-level JSON array read in chunks.
+
+Lets the scan look at one /episode or /episodefile item at a time instead of
+holding the whole decoded response, so memory no longer grows with the size
+of the largest series times the number of workers.
+"""
+
+import codecs
+import json
+from json.decoder import WHITESPACE
+
+
+class NotAJSONArray(ValueError):
+    """The document is valid so far but is not a JSON array."""
+
+
+def iter_json_array(chunks):
+    """Yield the items of the JSON array spread over ``chunks`` (bytes or str).
+
+    Malformed JSON raises json.JSONDecodeError, like json.loads would.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+    state = "start"  # start → item_or_end → separator → item → ... → done
+
+    def fill():
+        nonlocal buffer, pos, eof
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer = buffer[pos:] + (chunk if isinstance(chunk, str) else text.decode(chunk))
+            pos = 0
+            return True
+        buffer = buffer[pos:] + text.decode(b"", final=True)
+        pos = 0
+        eof = True
+        return False
+
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                break
+            fill()
+            continue
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise NotAJSONArray("expected a JSON array")
+            pos += 1
+            state = "item_or_end"
+        elif state in ("item_or_end", "separator") and char == "]":
+            pos += 1
+            state = "done"
+        elif state == "separator":
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+            state = "item"
+        elif state == "done":
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The item may continue in the next chunk.
+                if eof:
+                    raise
+                fill()
+                continue
+            after = WHITESPACE.match(buffer, end).end()
+            if not eof and (after == len(buffer) or buffer[after] not in ",]"):
+                # A number such as "-1." or "12" could still go on in the next chunk.
+                fill()
+                continue
+            pos = end
+            state = "separator"
+            yield item
+    if state != "done":
+        raise json.JSONDecodeError("Expecting value", buffer, pos)
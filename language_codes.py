@@ -0,0 +1,272 @@
+"""Canonical audio-language codes: alias table, cached normalization and flags.
+
+Sonarr reports a handful of distinct ``audioLanguages`` strings per library,
+repeated on every episode, so each raw string is normalized once and the
+result is reused from a bounded cache. Normalized combos are then interned
+as small integer ids with a bitmask over the known languages.
+"""
+
+import threading
+from array import array
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Iterable, List
+
+from language_flags import LANGUAGE_FLAGS
+
+NORMALIZATION_CACHE_SIZE = 4096
+UNKNOWN_FLAG = '🏳️'
+
+# Common synonyms mapped to the ISO 639-2 codes Sonarr uses.
+LANGUAGE_ALIASES = {
+    'en': 'eng', 'english': 'eng',
+    'it': 'ita', 'italian': 'ita',
+    'ja': 'jpn', 'jp': 'jpn', 'japanese': 'jpn',
+    'fr': 'fra', 'fre': 'fra', 'french': 'fra',
+    'de': 'deu', 'ger': 'deu', 'german': 'deu',
+    'pt': 'por', 'portuguese': 'por',
+    'ru': 'rus', 'russian': 'rus',
+    'zh': 'zho', 'chi': 'zho', 'chinese': 'zho',
+    'es': 'spa', 'spanish': 'spa',
+    'unknown': 'und', 'undetermined': 'und', 'unk': 'und', 'und': 'und',
+}
+
+
+def normalize_audio_languages(value: str) -> str:
+    """
+    Normalize Sonarr mediaInfo.audioLanguages values so that order does not matter.
+    Examples:
+    - "ita/eng" == "eng/ita" -> "eng/ita"
+    - Handles extra spaces, casing and common aliases: "ENG / Italian" -> "eng/ita"
+    """
+    if not value:
+        return "und"
+    return _normalize_combo(value if isinstance(value, str) else str(value))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_combo(value: str) -> str:
+    tokens = {LANGUAGE_ALIASES.get(token, token) for token in _tokens(value)}
+    if not tokens:
+        return "und"
+    return "/".join(sorted(tokens))
+
+
+def _tokens(value: str) -> List[str]:
+    return [token.strip() for token in value.lower().split('/') if token.strip()]
+
+
+def parse_wanted_langs(csv: str) -> List[str]:
+    if not csv:
+        return []
+    result = []
+    for part in csv.split(','):
+        # A part may itself be a combo such as "eng/ita".
+        for token in normalize_audio_languages(part).split('/'):
+            if token not in result:
+                result.append(token)
+    return result
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def get_flag(lang_code: str) -> str:
+    return ' '.join(
+        LANGUAGE_FLAGS.get(LANGUAGE_ALIASES.get(code, code), UNKNOWN_FLAG)
+        for code in lang_code.lower().split('/')
+    )
+
+
+def normalization_cache_stats() -> dict:
+    """Hits, misses and size of the audioLanguages normalization cache."""
+    info = _normalize_combo.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+class LanguageRegistry:
+    """One bit per language code and one small integer id per language combo.
+
+    Starts from the LANGUAGE_FLAGS codes and grows as Sonarr reports new
+    ones. Ids and bits are never reused, so they stay valid for the whole
+    process; lookups are lock-free, registrations are serialized.
+    """
+
+    def __init__(self, codes: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._bits = {}
+        self._combo_ids = {}
+        self.combos: List[str] = []
+        self.masks: List[int] = []
+        for code in codes:
+            self.language_bit(code)
+
+    def language_bit(self, code: str) -> int:
+        bit = self._bits.get(code)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.setdefault(code, 1 << len(self._bits))
+        return bit
+
+    def mask(self, codes: Iterable[str]) -> int:
+        mask = 0
+        for code in codes:
+            mask |= self.language_bit(code)
+        return mask
+
+    def combo_id(self, combo: str) -> int:
+        """Id of a normalized combo such as ``"eng/ita"``, registering it if new."""
+        combo_id = self._combo_ids.get(combo)
+        if combo_id is None:
+            mask = self.mask(combo.split('/'))
+            with self._lock:
+                combo_id = self._combo_ids.get(combo)
+                if combo_id is None:
+                    combo_id = len(self.combos)
+                    # Publish the id only once combos/masks can be indexed by it.
+                    self.combos.append(combo)
+                    self.masks.append(mask)
+                    self._combo_ids[combo] = combo_id
+        return combo_id
+
+    def find_combo(self, combo: str):
+        return self._combo_ids.get(combo)
+
+
+LANGUAGES = LanguageRegistry(sorted({LANGUAGE_ALIASES.get(code, code) for code in LANGUAGE_FLAGS}))
+
+
+class SeasonLanguages(Mapping):
+    """Episode counts per language combo of one season.
+
+    A view over ``(season, combo id, count)`` rows of a SeriesLanguages
+    array that reads like the ``{combo: count}`` dict it replaces.
+    """
+
+    __slots__ = ("_rows", "_start", "_stop")
+
+    def __init__(self, rows, start: int, stop: int):
+        self._rows = rows
+        self._start = start
+        self._stop = stop
+
+    @classmethod
+    def from_mapping(cls, langs) -> "SeasonLanguages":
+        """Accept a ``{combo: count}`` mapping, such as a hand-built summary."""
+        if isinstance(langs, cls):
+            return langs
+        return SeriesLanguages.from_mapping({0: langs})[0]
+
+    def __reduce__(self):
+        # Combo ids are local to this process; pickle the combos themselves.
+        return (SeasonLanguages.from_mapping, (dict(self.items()),))
+
+    def __getitem__(self, combo: str) -> int:
+        combo_id = LANGUAGES.find_combo(combo)
+        rows = self._rows
+        for index in range(self._start, self._stop, 3):
+            if rows[index + 1] == combo_id:
+                return rows[index + 2]
+        raise KeyError(combo)
+
+    def __iter__(self):
+        combos = LANGUAGES.combos
+        rows = self._rows
+        return (combos[rows[index + 1]] for index in range(self._start, self._stop, 3))
+
+    def __len__(self) -> int:
+        return (self._stop - self._start) // 3
+
+    def items(self):
+        combos = LANGUAGES.combos
+        rows = self._rows
+        return [(combos[rows[index + 1]], rows[index + 2]) for index in range(self._start, self._stop, 3)]
+
+    def __repr__(self) -> str:
+        return f"SeasonLanguages({dict(self.items())!r})"
+
+    def coverage(self, wanted_mask: int, ignore_unknown: bool = False):
+        """Return ``(total, supported)`` episode counts for a LANGUAGES mask.
+
+        A combo supports the wanted languages when it shares at least one
+        of them; with ``ignore_unknown`` episodes tagged only ``und`` are
+        left out of both counts.
+        """
+        skipped = LANGUAGES.find_combo("und") if ignore_unknown else None
+        masks = LANGUAGES.masks
+        rows = self._rows
+        total = supported = 0
+        for index in range(self._start, self._stop, 3):
+            combo_id = rows[index + 1]
+            if combo_id == skipped:
+                continue
+            count = rows[index + 2]
+            total += count
+            if masks[combo_id] & wanted_mask:
+                supported += count
+        return total, supported
+
+
+class SeriesLanguages(Mapping):
+    """Language counts of every season of one series in one flat array.
+
+    Each ``(season, combo id, count)`` row takes 12 bytes, sorted by season
+    and combo; it reads like a ``{season: {combo: count}}`` dict whose
+    values are SeasonLanguages views.
+    """
+
+    __slots__ = ("_rows",)
+
+    def __init__(self, counts=None):
+        """``counts`` maps season numbers to ``{LANGUAGES combo id: count}``."""
+        counts = counts or {}
+        self._rows = array("i", [
+            value
+            for season in sorted(counts)
+            for combo_id, count in sorted(counts[season].items())
+            for value in (season, combo_id, count)
+        ])
+
+    @classmethod
+    def from_mapping(cls, seasons) -> "SeriesLanguages":
+        """Accept a ``{season: {combo: count}}`` mapping, such as a cached summary."""
+        if isinstance(seasons, cls):
+            return seasons
+        return cls({
+            season: {LANGUAGES.combo_id(combo): count for combo, count in langs.items()}
+            for season, langs in seasons.items()
+        })
+
+    def __reduce__(self):
+        return (SeriesLanguages.from_mapping, ({season: dict(langs) for season, langs in self.items()},))
+
+    def _seasons(self):
+        rows = self._rows
+        start = 0
+        for index in range(3, len(rows) + 3, 3):
+            if index == len(rows) or rows[index] != rows[start]:
+                yield rows[start], start, index
+                start = index
+
+    def __getitem__(self, season) -> SeasonLanguages:
+        for number, start, stop in self._seasons():
+            if number == season:
+                return SeasonLanguages(self._rows, start, stop)
+        raise KeyError(season)
+
+    def __iter__(self):
+        return (number for number, _, _ in self._seasons())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._seasons())
+
+    def items(self):
+        return [(number, SeasonLanguages(self._rows, start, stop)) for number, start, stop in self._seasons()]
+
+    def __repr__(self) -> str:
+        return f"SeriesLanguages({ {season: dict(langs) for season, langs in self.items()}!r})"
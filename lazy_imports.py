@@ -0,0 +1,26 @@
+"""Modules imported on first use.
+
+``--help``, argument errors and configuration errors should not pay for
+requests, asyncio, sqlite3 and the HTTP servers; tests/test_startup.py checks
+they stay out of those paths.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Stand-in for module ``name``, imported on its first attribute access.
+
+    Bind it at module level in place of ``import name`` when the module is
+    used as ``name.attribute``; the import lock makes the first access safe
+    from any thread.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attribute: str):
+        return getattr(importlib.import_module(self._name), attribute)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
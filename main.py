@@ -1,41 +1,121 @@
+from __future__ import annotations
+
 import argparse
+import hashlib
 import json
 import math
 import os
+import re
 import stat
 import sys
-import tempfile
+import threading
+import time
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from datetime import datetime, timedelta, timezone
 from os import getenv
 from pathlib import Path
-from typing import Callable, Dict, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from adaptive_concurrency import AdaptiveConcurrency, format_timeline
+from json_stream import NotAJSONArray, iter_json_array
+from language_codes import (
+    LANGUAGES,
+    SeasonLanguages,
+    SeriesLanguages,
+    get_flag,
+    normalize_audio_languages,
+    parse_wanted_langs,
+)
+from lazy_imports import LazyModule
+from scan_progress import ScanProgress
+from scan_snapshot import EMPTY_SNAPSHOT, ScanIndex, Snapshot, SnapshotError, diff_snapshots
+from scan_stats import ScanStats, format_stats_table
+from series_filters import Condition, SeriesFilter, series_condition
 
-import requests
-from dotenv import load_dotenv
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+# The scan's heavier dependencies are imported on first use, so that --help
+# and argument errors start fast (see tests/test_startup.py).
+asyncio = LazyModule("asyncio")
+multiprocessing = LazyModule("multiprocessing")
+requests = LazyModule("requests")
+sqlite3 = LazyModule("sqlite3")
+tempfile = LazyModule("tempfile")
 
-from language_flags import LANGUAGE_FLAGS
+if TYPE_CHECKING:
+    from async_http import AsyncSonarrClient
+    from instances import SonarrInstance
+    from metrics_exporter import ExporterMetrics, MetricsServer
+    from scan_cache import ResponseStore, ScanCache
+    from webhook_server import WebhookServer
 
 PADDING_WIDTH = 24  # larghezza usata per allineare le etichette nella stampa
 DEFAULT_CONNECT_TIMEOUT = 3.0
 DEFAULT_READ_TIMEOUT = 20.0
 DEFAULT_WORKERS = 4
 MAX_WORKERS = 16
+MIN_ADAPTIVE_WORKERS = 1
+AUTO_WORKERS = "auto"
+MAX_ANALYSIS_PROCESSES = 64
+# Bodies waiting for an analysis process, per process, before I/O workers block.
+ANALYSIS_QUEUE_PER_PROCESS = 2
+DEFAULT_MAX_IN_FLIGHT = 64
+MAX_IN_FLIGHT = 512
 DEFAULT_RETRY_COUNT = 3
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
 DEFAULT_RETRY_BACKOFF_SECONDS = 0.25
 RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
 EXIT_OK = 0
 EXIT_FATAL = 1
 EXIT_PARTIAL = 2
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parent / ".scan-cache.sqlite3"
+DEFAULT_INCREMENTAL_MAX_AGE_HOURS = 168
+DEFAULT_LISTEN_ADDRESS = "127.0.0.1:8787"
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+DEFAULT_SCAN_INTERVAL_SECONDS = 900.0
+EXPORTER_INSTANCE_NAME = "default"
+# History events that add, replace, remove or rename episode files.
+FILE_HISTORY_EVENTS = frozenset(
+    {"downloadFolderImported", "seriesFolderImported", "episodeFileDeleted", "episodeFileRenamed"}
+)
+# Fields of /episode and /episodefile items the analysis reads; the rest is dropped.
+EPISODE_FIELDS = ("seasonNumber", "episodeFileId", "episodeFile")
+EPISODE_FILE_FIELDS = ("id", "seasonNumber", "relativePath", "path")
+# Fields of /series items read by the filters, the ordering, the cache and the report.
+SERIES_FIELDS = (
+    "id",
+    "title",
+    "year",
+    "seriesType",
+    "statistics",
+    "lastAired",
+    "previousAiring",
+    "added",
+    "monitored",
+    "tags",
+    "qualityProfileId",
+    "languageProfileId",
+    "rootFolderPath",
+    "path",
+)
+# Statistics kept from /series: the cache fingerprint (scan_cache.FINGERPRINT_STATISTICS) and the ordering.
+SERIES_STATISTICS = ("episodeFileCount", "episodeCount", "totalEpisodeCount", "sizeOnDisk")
+# SxxEyy followed by further episode numbers: E01E02, E01-E02, E01-02.
+MULTI_EPISODE_PATTERN = re.compile(
+    r"[Ss]\d{1,4}[Ee](\d{1,4})((?:-?[Ee]\d{1,4}|-\d{1,4}(?![0-9A-Za-z]))*)"
+)
+DOTENV_PATH = Path(__file__).resolve().parent / ".env"
+# Options whose default comes from the environment or .env, read once parsing succeeded.
+ENV_DEFAULTS = {
+    "apikey": "API_KEY",
+    "url": "SONARR_URL",
+    "cache_file": "SCAN_CACHE_FILE",
+    "webhook_password": "WEBHOOK_PASSWORD",
+}
 
-# Carica .env se presente
-dotenv_path = Path(__file__).resolve().parent / ".env"
-if dotenv_path.exists():
-    load_dotenv(dotenv_path)
-
-def positive_worker_count(value: str) -> int:
+def positive_worker_count(value: str) -> Union[int, str]:
+    if value == AUTO_WORKERS:
+        return AUTO_WORKERS
     workers = int(value)
     if not 1 <= workers <= MAX_WORKERS:
         raise argparse.ArgumentTypeError(
@@ -44,6 +124,26 @@ def positive_worker_count(value: str) -> int:
     return workers
 
 
+def analysis_process_count(value: str) -> int:
+    if value == AUTO_WORKERS:
+        return min(os.cpu_count() or 1, MAX_ANALYSIS_PROCESSES)
+    processes = int(value)
+    if not 0 <= processes <= MAX_ANALYSIS_PROCESSES:
+        raise argparse.ArgumentTypeError(
+            f"deve essere compreso tra 0 e {MAX_ANALYSIS_PROCESSES}"
+        )
+    return processes
+
+
+def positive_in_flight_count(value: str) -> int:
+    in_flight = int(value)
+    if not 1 <= in_flight <= MAX_IN_FLIGHT:
+        raise argparse.ArgumentTypeError(
+            f"deve essere compreso tra 1 e {MAX_IN_FLIGHT}"
+        )
+    return in_flight
+
+
 def positive_timeout(value: str) -> float:
     timeout = float(value)
     if not math.isfinite(timeout) or timeout <= 0:
@@ -51,12 +151,43 @@ def positive_timeout(value: str) -> float:
     return timeout
 
 
+def retry_count(value: str) -> int:
+    retries = int(value)
+    if retries < 0:
+        raise argparse.ArgumentTypeError("non può essere negativo")
+    return retries
+
+
+def non_negative_seconds(value: str) -> float:
+    seconds = float(value)
+    if not math.isfinite(seconds) or seconds < 0:
+        raise argparse.ArgumentTypeError("deve essere un numero non negativo")
+    return seconds
+
+
+def listen_address(value: str) -> Tuple[str, int]:
+    host, separator, port = value.rpartition(":")
+    if not separator or not port.isdigit() or int(port) > 65535:
+        raise argparse.ArgumentTypeError("deve essere nel formato HOST:PORTA")
+    return host.strip("[]") or "0.0.0.0", int(port)
+
+
+# Validators shared by the command line and the --config file settings.
+INSTANCE_SETTING_TYPES = {
+    "workers": positive_worker_count,
+    "max_in_flight": positive_in_flight_count,
+    "timeout": positive_timeout,
+    "retries": retry_count,
+    "backoff_factor": non_negative_seconds,
+}
+
+
 def parse_args(argv=None):
     parser = argparse.ArgumentParser(
         description="Controlla le discrepanze linguistiche nelle stagioni/serie presenti in Sonarr (compatibile solo con Sonarr v4)."
     )
-    parser.add_argument('--apikey', default=getenv("API_KEY"), help='API key di Sonarr (può anche essere in .env)')
-    parser.add_argument('--url', default=getenv("SONARR_URL"), help='URL base di Sonarr (può anche essere in .env)')
+    parser.add_argument('--apikey', help='API key di Sonarr (può anche essere in .env)')
+    parser.add_argument('--url', help='URL base di Sonarr (può anche essere in .env)')
     parser.add_argument('--output', help='Percorso file su cui salvare l’output')
     parser.add_argument('--json', action='store_true', help='Mostra output in formato JSON')
     parser.add_argument(
@@ -64,6 +195,29 @@ def parse_args(argv=None):
         action='store_true',
         help='Include results, failures e complete nell’output JSON',
     )
+    parser.add_argument(
+        '--snapshot',
+        metavar='FILE',
+        help='Salva i conteggi delle lingue per stagione in uno snapshot binario, da confrontare con --diff-against',
+    )
+    parser.add_argument(
+        '--diff-against',
+        metavar='FILE',
+        help='Mostra solo i problemi nuovi, risolti e modificati rispetto a uno snapshot precedente '
+        '(può essere lo stesso file di --snapshot)',
+    )
+    parser.add_argument(
+        '-q',
+        '--quiet',
+        action='store_true',
+        help='Non mostra l’avanzamento dell’analisi su stderr (utile per cron)',
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Scrive i risultati di ogni serie appena analizzata: NDJSON con --json/--output '
+        '(file sostituito solo a fine analisi), altrimenti testo progressivo',
+    )
     parser.add_argument('--show-all', action='store_true', help='Mostra anche stagioni monolingua')
     parser.add_argument('--ignore-unknown', action='store_true', help='Ignora "und/unknown" nel calcolo dei mismatch')
     parser.add_argument(
@@ -74,13 +228,210 @@ def parse_args(argv=None):
     parser.add_argument('--wanted-langs', dest='wanted_langs', help='Lista di lingue desiderate separate da virgola (es: ita,eng)')
     parser.add_argument('--wanted-lang', dest='wanted_langs', help='Alias di --wanted-langs')
     parser.add_argument('--ignore-anime', action='store_true', help='Ignora le serie con tipo "Anime"')
+    parser.add_argument(
+        '--include',
+        action='append',
+        type=series_condition,
+        default=[],
+        metavar='CAMPO=VALORE',
+        help='Analizza solo le serie che soddisfano la condizione (ripetibile; più valori separati da virgola). '
+        'Campi: tag, quality-profile, language-profile (id o nome), root-folder, type, monitored, path (glob), '
+        'min-files, max-files',
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        type=series_condition,
+        default=[],
+        metavar='CAMPO=VALORE',
+        help='Esclude le serie che soddisfano la condizione (ripetibile, stessi campi di --include)',
+    )
+    parser.add_argument(
+        '--scan-trivial',
+        action='store_true',
+        help='Analizza anche le serie che non possono dare risultati (senza file, o con un solo file '
+        'senza --wanted-langs), altrimenti saltate',
+    )
     parser.add_argument(
         '--workers',
         type=positive_worker_count,
         default=DEFAULT_WORKERS,
-        help=f'Richieste concorrenti massime verso Sonarr (default: {DEFAULT_WORKERS}, max: {MAX_WORKERS})',
+        help=f'Richieste concorrenti massime verso Sonarr (default: {DEFAULT_WORKERS}, max: {MAX_WORKERS}); '
+        f'"{AUTO_WORKERS}" adatta la concorrenza tra {MIN_ADAPTIVE_WORKERS} e {MAX_WORKERS} '
+        'in base a latenza ed errori 429/5xx',
+    )
+    parser.add_argument(
+        '--retries',
+        type=retry_count,
+        default=DEFAULT_RETRY_COUNT,
+        help=f'Tentativi aggiuntivi per errori di rete e risposte {"/".join(map(str, RETRYABLE_STATUS_CODES))} '
+        f'(default: {DEFAULT_RETRY_COUNT})',
+    )
+    parser.add_argument(
+        '--retry-backoff',
+        type=non_negative_seconds,
+        default=DEFAULT_RETRY_BACKOFF_SECONDS,
+        metavar='SECONDI',
+        help=f'Fattore di backoff esponenziale tra i tentativi (default: {DEFAULT_RETRY_BACKOFF_SECONDS:g})',
+    )
+    parser.add_argument(
+        '--transport',
+        choices=('pooled', 'per-series'),
+        default='pooled',
+        help='pooled: un unico pool di connessioni keep-alive condiviso tra i worker (default); '
+        'per-series: una nuova sessione HTTP per ogni serie',
+    )
+    parser.add_argument(
+        '--engine',
+        choices=('threads', 'async'),
+        default='threads',
+        help='threads: pool di thread limitato da --workers (default); '
+        'async: client asyncio (httpx, extra opzionale "async") limitato da --max-in-flight',
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=positive_in_flight_count,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help=f'Richieste contemporanee con --engine async (default: {DEFAULT_MAX_IN_FLIGHT}, max: {MAX_IN_FLIGHT})',
+    )
+    parser.add_argument(
+        '--analysis-processes',
+        type=analysis_process_count,
+        default=0,
+        metavar='N',
+        help='Con --engine threads i worker scaricano soltanto le risposte e N processi le '
+        'analizzano su più core; auto usa un processo per core (default: 0, analisi nei worker)',
+    )
+    parser.add_argument(
+        '--order',
+        choices=('largest', 'recent', 'sonarr'),
+        default='largest',
+        help='Ordine in cui le serie vengono analizzate: largest prima quelle con più file ed episodi, '
+        'così una serie enorme non allunga la fine dell’analisi (default); recent prima quelle '
+        'andate in onda o aggiunte più di recente; sonarr nell’ordine restituito da Sonarr, '
+        'iniziando mentre l’elenco delle serie è ancora in download',
+    )
+    parser.add_argument(
+        '--fetch-mode',
+        choices=('auto', 'split', 'files'),
+        default='auto',
+        help='auto: una sola richiesta per serie se Sonarr incorpora i file in /episode, '
+        'altrimenti /episode + /episodefile (default); split: sempre due richieste; '
+        'files: solo /episodefile, contando gli episodi multipli dal nome del file',
+    )
+    parser.add_argument(
+        '--cache-file',
+        help='File SQLite con la cache delle serie già analizzate (può anche essere in .env come SCAN_CACHE_FILE)',
+    )
+    parser.add_argument('--no-cache', action='store_true', help='Non legge né aggiorna la cache delle serie')
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignora la cache e rianalizza tutte le serie, aggiornando la cache',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Rianalizza solo le serie con import/eliminazioni nella history di Sonarr '
+        'dall’ultima analisi completa, riusando la cache per le altre',
+    )
+    parser.add_argument(
+        '--incremental-max-age',
+        type=positive_timeout,
+        default=DEFAULT_INCREMENTAL_MAX_AGE_HOURS,
+        metavar='ORE',
+        help='Oltre questa età (in ore) dell’ultima analisi completa --incremental esegue '
+        f'un’analisi completa (default: {DEFAULT_INCREMENTAL_MAX_AGE_HOURS})',
+    )
+    parser.add_argument(
+        '--stats',
+        nargs='?',
+        const='table',
+        choices=('table', 'json'),
+        help='Stampa su stderr latenze p50/p95/p99 per endpoint, byte ricevuti, retry, tempi per serie '
+        'e utilizzo dei worker, come tabella (default) o JSON',
+    )
+    parser.add_argument(
+        '--config',
+        metavar='FILE',
+        help='File TOML con più istanze Sonarr da analizzare in parallelo '
+        '(sostituisce --apikey e --url)',
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Resta in ascolto dei webhook di Sonarr e mantiene il report aggiornato, '
+        'servendolo su GET /report',
+    )
+    parser.add_argument(
+        '--listen',
+        type=listen_address,
+        default=DEFAULT_LISTEN_ADDRESS,
+        metavar='HOST:PORTA',
+        help='Indirizzo del server webhook con --serve o delle metriche con --exporter '
+        f'(default: {DEFAULT_LISTEN_ADDRESS})',
+    )
+    parser.add_argument(
+        '--debounce',
+        type=positive_timeout,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        metavar='SECONDI',
+        help='Attesa dopo l’ultimo webhook di una serie prima di rianalizzarla '
+        f'(default: {DEFAULT_DEBOUNCE_SECONDS:g})',
+    )
+    parser.add_argument(
+        '--webhook-password',
+        help='Password HTTP Basic richiesta su POST /webhook (può anche essere in .env come WEBHOOK_PASSWORD)',
+    )
+    parser.add_argument(
+        '--exporter',
+        action='store_true',
+        help='Resta in esecuzione: ripete l’analisi ogni --scan-interval secondi, riusando la cache, '
+        'e serve le metriche Prometheus su GET /metrics',
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        '--scan-interval',
+        type=positive_timeout,
+        default=DEFAULT_SCAN_INTERVAL_SECONDS,
+        metavar='SECONDI',
+        help=f'Intervallo tra due analisi con --exporter (default: {DEFAULT_SCAN_INTERVAL_SECONDS:g})',
+    )
+    args = parser.parse_args(argv)
+    load_env_file(DOTENV_PATH)
+    for option, variable in ENV_DEFAULTS.items():
+        if getattr(args, option) is None:
+            setattr(args, option, getenv(variable))
+    args.cache_file = args.cache_file or str(DEFAULT_CACHE_FILE)
+    if args.exporter and (args.serve or args.output or args.stats):
+        parser.error("--exporter non è compatibile con --serve, --output e --stats: le metriche sono su GET /metrics")
+    if args.stream and (args.config or args.serve or args.exporter or args.engine == "async"):
+        parser.error("--stream è disponibile solo per un’analisi singola con --engine threads (senza --config)")
+    if (args.snapshot or args.diff_against) and (args.stream or args.serve or args.exporter):
+        parser.error("--snapshot e --diff-against non sono disponibili con --stream, --serve e --exporter")
+    if args.engine == "async":
+        from importlib.util import find_spec
+
+        if find_spec("httpx") is None:
+            parser.error("--engine async richiede il pacchetto opzionale httpx: installalo con uv sync --extra async")
+    if args.analysis_processes and (args.engine == "async" or args.serve):
+        parser.error("--analysis-processes è disponibile solo con --engine threads e senza --serve")
+    if args.serve and args.config:
+        parser.error("--serve supporta una sola istanza: usa --apikey e --url invece di --config")
+    if args.serve and args.stats:
+        parser.error("--stats riassume un’analisi singola e non è disponibile con --serve")
+    if args.serve and args.output:
+        parser.error("--serve non salva su file: il report è disponibile su GET /report")
+    if args.incremental and (args.no_cache or args.refresh):
+        parser.error("--incremental richiede la cache (incompatibile con --no-cache e --refresh)")
+    return args
+
+
+def load_env_file(path: Path):
+    """Load ``.env`` into the environment, without overriding variables already set."""
+    if path.exists():
+        from dotenv import load_dotenv
+
+        load_dotenv(path)
 
 
 def normalize_url(base_url: str) -> str:
@@ -90,23 +441,190 @@ def normalize_url(base_url: str) -> str:
     return base_url
 
 
-def get_series(session: requests.Session, base_url: str, timeout: Tuple[float, float]):
-    res = session.get(f'{base_url}/series', timeout=timeout)
+_MISSING = object()
+
+
+class SeriesRecord:
+    """The SERIES_FIELDS of a /series item, without images, seasons and alternate titles.
+
+    Reads like the item it came from (``get``, ``[]``, ``in``), so records
+    and raw items such as webhook payloads are interchangeable. Fields
+    missing from the item stay missing.
+    """
+
+    __slots__ = SERIES_FIELDS
+
+    def __init__(self, item: dict):
+        for field in SERIES_FIELDS:
+            if field in item:
+                setattr(self, field, item[field])
+        statistics = item.get("statistics")
+        if isinstance(statistics, dict):
+            self.statistics = {key: statistics[key] for key in SERIES_STATISTICS if key in statistics}
+
+    def get(self, field: str, default=None):
+        return getattr(self, field, default) if field in SERIES_FIELDS else default
+
+    def __getitem__(self, field: str):
+        value = self.get(field, _MISSING)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field) -> bool:
+        return self.get(field, _MISSING) is not _MISSING
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SeriesRecord):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        return f"SeriesRecord({self.as_dict()!r})"
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in SERIES_FIELDS if field in self}
+
+
+def iter_series(session: requests.Session, base_url: str, timeout: Tuple[float, float]):
+    """Stream /series, yielding a SeriesRecord as soon as each item is decoded.
+
+    The full items are dropped as they arrive, and a caller can start on the
+    first series while the rest of the listing is still being received.
+    """
+    try:
+        for index, item in enumerate(_iter_json_response(session, f'{base_url}/series', timeout)):
+            if not isinstance(item, dict):
+                raise ValueError(f"Sonarr /series returned an invalid payload: item {index} is not an object")
+            yield SeriesRecord(item)
+    except NotAJSONArray as error:
+        raise ValueError("Sonarr /series returned an invalid payload: expected a list") from error
+
+
+def get_series(session: requests.Session, base_url: str, timeout: Tuple[float, float]) -> List[SeriesRecord]:
+    return list(iter_series(session, base_url, timeout))
+
+def get_serie(session: requests.Session, base_url: str, series_id, timeout) -> Optional[SeriesRecord]:
+    """One /series/{id} item, or None when Sonarr no longer has the series."""
+    started = time.perf_counter()
+    res = session.get(f'{base_url}/series/{series_id}', timeout=timeout)
+    if res.status_code == 404:
+        return None
     res.raise_for_status()
-    payload = res.json()
-    if not isinstance(payload, list) or not all(isinstance(item, dict) for item in payload):
-        raise ValueError("Sonarr /series returned an invalid payload")
-    return payload
+    item = res.json()
+    _report_body(session, res, started)
+    if not isinstance(item, dict):
+        raise ValueError(f"Sonarr /series/{series_id} returned an invalid payload: expected an object")
+    return SeriesRecord(item)
 
-def get_episodes(session: requests.Session, series_id: int, base_url: str, timeout: Tuple[float, float]):
-    res = session.get(f'{base_url}/episode?seriesId={series_id}', timeout=timeout)
+def get_history_series_ids(session: requests.Session, base_url: str, since: datetime, timeout: Tuple[float, float]):
+    """Series ids with file imports, upgrades, deletions or renames since ``since``."""
+    from scan_cache import utc_timestamp
+
+    started = time.perf_counter()
+    res = session.get(
+        f'{base_url}/history/since',
+        params={"date": utc_timestamp(since)},
+        timeout=timeout,
+    )
     res.raise_for_status()
-    episodes = res.json()
-    if not isinstance(episodes, list):
-        raise ValueError(
-            f"Sonarr /episode returned an invalid payload for series {series_id}: expected a list"
-        )
-    for index, episode in enumerate(episodes):
+    events = res.json()
+    _report_body(session, res, started)
+    if not isinstance(events, list):
+        raise ValueError("Sonarr /history/since returned an invalid payload: expected a list")
+    series_ids = set()
+    for index, event in enumerate(events):
+        if not isinstance(event, dict) or "seriesId" not in event:
+            raise ValueError(
+                f"Sonarr /history/since returned an invalid item at index {index}"
+            )
+        if event.get("eventType") in FILE_HISTORY_EVENTS:
+            series_ids.add(event["seriesId"])
+    return series_ids
+
+def get_episodes(session: requests.Session, series_id: int, base_url: str, timeout: Tuple[float, float]):
+    return _get_json_items(
+        session, f'{base_url}/episode?seriesId={series_id}', timeout, validate_episodes, series_id
+    )
+
+def _get_json_items(session: requests.Session, url: str, timeout, validate, series_id: int):
+    """Stream a JSON array response through ``validate`` one item at a time."""
+    items = _iter_json_response(session, url, timeout)
+    try:
+        return validate(items, series_id)
+    finally:
+        items.close()
+
+
+def _iter_json_response(session: requests.Session, url: str, timeout):
+    """Yield the items of a JSON array response while it downloads, then report the body."""
+    started = time.perf_counter()
+    res = session.get(url, timeout=timeout, stream=True)
+    decoded_size = 0
+
+    def chunks():
+        nonlocal decoded_size
+        for chunk in res.iter_content(JSON_STREAM_CHUNK_SIZE):
+            decoded_size += len(chunk)
+            yield chunk
+
+    try:
+        res.raise_for_status()
+        yield from iter_json_array(chunks())
+        _report_body(session, res, started, decoded_size)
+    finally:
+        res.close()
+
+
+def _get_body(session: requests.Session, url: str, timeout) -> bytes:
+    """Read a whole response body, leaving parsing to an analysis process."""
+    started = time.perf_counter()
+    res = session.get(url, timeout=timeout, stream=True)
+    try:
+        res.raise_for_status()
+        body = res.content
+        _report_body(session, res, started)
+        return body
+    finally:
+        res.close()
+
+
+def _report_body(
+    session: requests.Session, response: requests.Response, started: float, decoded_size: Optional[int] = None
+):
+    """Pass a fully read body to the response hooks that measure transfers (ScanStats).
+
+    ``decoded_size`` is needed for streamed bodies; it defaults to the
+    length of the (already decompressed) ``response.content``.
+    """
+    hooks = getattr(session, "hooks", None)
+    if not isinstance(hooks, dict):
+        return
+    for hook in hooks.get("response", ()):
+        record_body = getattr(hook, "record_body", None)
+        if record_body is not None:
+            if decoded_size is None:
+                decoded_size = len(response.content)
+            record_body(response, time.perf_counter() - started, decoded_size)
+
+def _payload_items(payload, endpoint: str, series_id: int):
+    """Enumerate a decoded list or an iter_json_array stream, rejecting anything else."""
+    invalid = f"Sonarr {endpoint} returned an invalid payload for series {series_id}: expected a list"
+    if not isinstance(payload, (list, Iterator)):
+        raise ValueError(invalid)
+    try:
+        yield from enumerate(payload)
+    except NotAJSONArray as error:
+        raise ValueError(invalid) from error
+
+def validate_episodes(episodes, series_id: int):
+    """Check /episode items before they reach the analysis.
+
+    Accepts a decoded list or a stream of items and keeps only the fields
+    the analysis reads, so the full items can be dropped as they arrive.
+    """
+    validated = []
+    for index, episode in _payload_items(episodes, "/episode", series_id):
         if not isinstance(episode, dict):
             raise ValueError(
                 f"Sonarr /episode returned an invalid item for series {series_id} "
@@ -129,18 +647,21 @@ def get_episodes(session: requests.Session, series_id: int, base_url: str, timeo
                 f"Sonarr /episode returned an invalid item for series {series_id} "
                 f"at index {index}: episodeFileId must be a scalar value"
             ) from error
-    return episodes
+        slim = {key: episode[key] for key in EPISODE_FIELDS if key in episode}
+        if isinstance(slim.get("episodeFile"), dict):
+            slim["episodeFile"] = _slim_episode_file(slim["episodeFile"])
+        validated.append(slim)
+    return validated
 
 def get_episode_files(session: requests.Session, series_id: int, base_url: str, timeout: Tuple[float, float]):
-    res = session.get(f'{base_url}/episodefile?seriesId={series_id}', timeout=timeout)
-    res.raise_for_status()
-    files = res.json()
-    if not isinstance(files, list):
-        raise ValueError(
-            f"Sonarr /episodefile returned an invalid payload for series {series_id}: expected a list"
-        )
-    normalized_files = []
-    for index, episode_file in enumerate(files):
+    return _get_json_items(
+        session, f'{base_url}/episodefile?seriesId={series_id}', timeout, validate_episode_files, series_id
+    )
+
+def validate_episode_files(files, series_id: int):
+    """Check /episodefile items (decoded or streamed) and index them by file id."""
+    files_by_id = {}
+    for index, episode_file in _payload_items(files, "/episodefile", series_id):
         if not isinstance(episode_file, dict):
             raise ValueError(
                 f"Sonarr /episodefile returned an invalid item for series {series_id} "
@@ -164,10 +685,71 @@ def get_episode_files(session: requests.Session, series_id: int, base_url: str,
                 f"Sonarr /episodefile returned an invalid item for series {series_id} "
                 f"at index {index}: mediaInfo must be an object"
             )
-        if media_info is None:
-            episode_file = {**episode_file, "mediaInfo": {}}
-        normalized_files.append(episode_file)
-    return {file["id"]: file for file in normalized_files}
+        files_by_id[episode_file["id"]] = _slim_episode_file(episode_file)
+    return files_by_id
+
+def _slim_episode_file(episode_file: dict) -> dict:
+    slim = {key: episode_file[key] for key in EPISODE_FILE_FIELDS if key in episode_file}
+    media_info = episode_file.get("mediaInfo")
+    if media_info is None:
+        slim["mediaInfo"] = {}
+    elif isinstance(media_info, dict):
+        slim["mediaInfo"] = {key: media_info[key] for key in ("audioLanguages",) if key in media_info}
+    else:
+        slim["mediaInfo"] = media_info  # Left for validate_episode_files to reject.
+    return slim
+
+
+def get_episodes_with_files(session: requests.Session, series_id: int, base_url: str, timeout: Tuple[float, float]):
+    """Fetch episodes with their files embedded in a single /episode request.
+
+    Returns ``(episodes, files_by_id)``, or ``(episodes, None)`` when Sonarr
+    ignored includeEpisodeFile so the caller can fall back to /episodefile.
+    """
+    episodes = _get_json_items(
+        session,
+        f'{base_url}/episode?seriesId={series_id}&includeEpisodeFile=true',
+        timeout,
+        validate_episodes,
+        series_id,
+    )
+    return episodes, embedded_episode_files(episodes, series_id)
+
+
+def embedded_episode_files(episodes: List[dict], series_id: int):
+    """Collect the episodeFile objects embedded in validated /episode items."""
+    files = []
+    for episode in episodes:
+        if not episode.get("episodeFileId"):
+            continue
+        if episode.get("episodeFile") is None:
+            return None
+        files.append(episode["episodeFile"])
+    # Multi-episode files repeat; validate_episode_files indexes them by id.
+    return validate_episode_files(files, series_id)
+
+
+class EpisodeFileEmbedding:
+    """Whether this Sonarr honours includeEpisodeFile, learned during the scan.
+
+    ``supported`` stays None until a series with downloaded files answers.
+    """
+
+    def __init__(self):
+        self.supported = None
+
+
+class RequestCounter:
+    """Thread-safe count of HTTP responses, usable as a requests response hook."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, response=None, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+        return response
 
 
 def fsync_directory(directory):
@@ -188,6 +770,18 @@ def fsync_directory(directory):
 
 def write_json_atomic(data, filename):
     """Replace a JSON output only after its complete contents reach disk."""
+    with atomic_output(filename) as output_file:
+        json.dump(data, output_file, indent=2, ensure_ascii=False)
+        output_file.write("\n")
+
+
+@contextmanager
+def atomic_output(filename, binary: bool = False):
+    """Yield a temporary text (or ``binary``) file that replaces ``filename`` once complete and synced.
+
+    If the block raises, the temporary file is removed and any previous
+    output is left untouched.
+    """
     path = Path(filename)
     existing_mode = stat.S_IMODE(path.stat().st_mode) if path.exists() else None
     file_descriptor, temporary_name = tempfile.mkstemp(
@@ -197,11 +791,10 @@ def write_json_atomic(data, filename):
     )
     temporary_path = Path(temporary_name)
     try:
-        with os.fdopen(file_descriptor, "w", encoding="utf-8") as output_file:
+        with os.fdopen(file_descriptor, "wb" if binary else "w", encoding=None if binary else "utf-8") as output_file:
             if existing_mode is not None:
                 os.fchmod(output_file.fileno(), existing_mode)
-            json.dump(data, output_file, indent=2, ensure_ascii=False)
-            output_file.write("\n")
+            yield output_file
             output_file.flush()
             os.fsync(output_file.fileno())
         temporary_path.replace(path)
@@ -220,94 +813,223 @@ def validate_output_path(filename: str) -> Path:
     return path
 
 
-def build_session(apikey: str) -> requests.Session:
-    session = requests.Session()
-    session.headers.update({'X-Api-Key': apikey})
-    retry_policy = Retry(
-        total=DEFAULT_RETRY_COUNT,
-        connect=DEFAULT_RETRY_COUNT,
-        read=DEFAULT_RETRY_COUNT,
-        status=DEFAULT_RETRY_COUNT,
+def retry_policy(retries: int, backoff_factor: float):
+    """urllib3 Retry shared by both engines: network errors and RETRYABLE_STATUS_CODES, honouring Retry-After."""
+    from urllib3.util.retry import Retry
+
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
         other=0,
         allowed_methods=frozenset({"GET"}),
         status_forcelist=RETRYABLE_STATUS_CODES,
-        backoff_factor=DEFAULT_RETRY_BACKOFF_SECONDS,
+        backoff_factor=backoff_factor,
         respect_retry_after_header=True,
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry_policy)
+
+
+def build_session(
+    apikey: str,
+    pool_size: Optional[int] = None,
+    request_counter: Optional[RequestCounter] = None,
+    retries: int = DEFAULT_RETRY_COUNT,
+    backoff_factor: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+    response_store: Optional[ResponseStore] = None,
+) -> requests.Session:
+    """Build an authenticated session with the shared retry policy.
+
+    ``pool_size`` sizes the keep-alive connection pool when the session is
+    shared by several worker threads; ``request_counter`` sees every response.
+    ``retries`` and ``backoff_factor`` tune the policy for one instance. With
+    a ``response_store`` per-series requests are conditional and unchanged
+    responses reuse the seasons derived from them (see
+    _fetch_series_with_responses).
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    session = requests.Session()
+    # Every coding urllib3 can decode here: gzip and deflate, plus br and zstd
+    # when brotli and zstandard are installed.
+    session.headers.update({'X-Api-Key': apikey, 'Accept-Encoding': ACCEPT_ENCODING})
+    session.response_store = response_store
+    if request_counter is not None:
+        session.hooks["response"].append(request_counter)
+    retry = retry_policy(retries, backoff_factor)
+    if pool_size is None:
+        adapter = HTTPAdapter(max_retries=retry)
+    else:
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=retry,
+        )
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
 
-def get_flag(lang_code: str) -> str:
-    parts = lang_code.lower().split('/')
-    return ' '.join(LANGUAGE_FLAGS.get(code, '🏳️') for code in parts)
-
-def normalize_audio_languages(value: str) -> str:
-    """
-    Normalize Sonarr mediaInfo.audioLanguages values so that order does not matter.
-    Examples:
-    - "ita/eng" == "eng/ita" -> "eng/ita"
-    - Handles extra spaces and casing: "ENG / Ita" -> "eng/ita"
-    Keeps tokens as-is beyond lowercasing; does not attempt synonym mapping (e.g., en->eng).
-    """
-    if not value:
-        return "und"
-    # Lowercase and split on '/'; trim spaces; drop empties; deduplicate while sorting
-    tokens: List[str] = [t.strip() for t in str(value).lower().split('/') if t.strip()]
-    if not tokens:
-        return "und"
-    # Map common synonyms/aliases
-    alias = {
-        'en': 'eng', 'english': 'eng',
-        'it': 'ita', 'italian': 'ita',
-        'ja': 'jpn', 'jp': 'jpn', 'japanese': 'jpn',
-        'fr': 'fra', 'fre': 'fra', 'french': 'fra',
-        'de': 'deu', 'ger': 'deu', 'german': 'deu',
-        'pt': 'por', 'portuguese': 'por',
-        'ru': 'rus', 'russian': 'rus',
-        'zh': 'zho', 'chi': 'zho', 'chinese': 'zho',
-        'es': 'spa', 'spanish': 'spa',
-        'unknown': 'und', 'undetermined': 'und', 'unk': 'und', 'und': 'und',
-    }
-    mapped = [alias.get(t, t) for t in tokens]
-    # Remove duplicates, then sort for order-insensitivity
-    unique = sorted(set(mapped))
-    return "/".join(unique)
-
-
-def parse_wanted_langs(csv: str) -> List[str]:
-    if not csv:
-        return []
-    items = []
-    for part in csv.split(','):
-        token = normalize_audio_languages(part)
-        # normalize_audio_languages may return combined values if input had '/'
-        items.extend([t for t in token.split('/') if t])
-    # deduplicate while preserving order
-    seen = set()
-    result = []
-    for t in items:
-        if t not in seen:
-            seen.add(t)
-            result.append(t)
-    return result
-
-
 def analyze_language_distribution(series, episodes, files_by_id):
-    lang_summary = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    counts = defaultdict(lambda: defaultdict(int))
     for ep in episodes:
         ep_file_id = ep.get("episodeFileId")
         if not ep_file_id:
             continue
         file = files_by_id.get(ep_file_id, {})
         raw_lang = file.get("mediaInfo", {}).get("audioLanguages", "und")
-        lang = normalize_audio_languages(raw_lang)
-        season = ep["seasonNumber"]
-        lang_summary[series["title"]][season][lang] += 1
-    return lang_summary
+        counts[ep["seasonNumber"]][LANGUAGES.combo_id(normalize_audio_languages(raw_lang))] += 1
+    return _language_summary(series, counts)
+
+
+def _language_summary(series, counts):
+    """Pack per-season ``{combo id: count}`` tallies into one compact SeriesLanguages."""
+    return {series["title"]: SeriesLanguages(counts)}
+
+
+def episodes_in_file(episode_file: dict) -> int:
+    """Number of episodes stored in one file, read from its Sonarr file name.
+
+    Names such as ``S01E01E02``, ``S01E01-E02`` or ``S01E01-03`` count every
+    episode; anything else (daily or absolute numbering) counts as one.
+    """
+    name = episode_file.get("relativePath") or episode_file.get("path") or ""
+    match = MULTI_EPISODE_PATTERN.search(os.path.basename(str(name)))
+    if match is None or not match.group(2):
+        return 1
+    numbers = [int(match.group(1))] + [int(value) for value in re.findall(r"\d+", match.group(2))]
+    if len(numbers) == 2 and match.group(2).startswith("-") and 0 < numbers[1] - numbers[0] < 100:
+        # Two dash-joined numbers are a range (S01E01-03 or S01E01-E03).
+        return numbers[1] - numbers[0] + 1
+    return len(set(numbers))
+
+
+def summarize_episode_files(series, files_by_id):
+    """Build the analyze_language_distribution summary from /episodefile alone.
+
+    Returns None when a file has no usable seasonNumber, so the caller can
+    fall back to joining /episode items instead.
+    """
+    counts = defaultdict(lambda: defaultdict(int))
+    for file in files_by_id.values():
+        season = file.get("seasonNumber")
+        if not isinstance(season, int) or isinstance(season, bool):
+            return None
+        raw_lang = file.get("mediaInfo", {}).get("audioLanguages", "und")
+        counts[season][LANGUAGES.combo_id(normalize_audio_languages(raw_lang))] += episodes_in_file(file)
+    return _language_summary(series, counts)
+
+
+def _get_conditional_items(session: requests.Session, url: str, timeout, series_id: int, validator=None):
+    """GET ``url`` with If-None-Match/If-Modified-Since from a stored ``validator``.
+
+    ``validator`` is ``[etag, last_modified, digest]``. The body is streamed
+    through the validator of its endpoint and hashed on the way, so it is
+    never held whole. Returns ``(payload, validator, unchanged)``: after a
+    304 ``payload`` is None, otherwise a body whose digest matches the stored
+    one also counts as unchanged.
+    """
+    etag, last_modified, digest = validator if validator is not None else (None, None, None)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    validate = validate_episode_files if _payload_name(url) == "episodefile" else validate_episodes
+    started = time.perf_counter()
+    res = session.get(url, timeout=timeout, headers=headers, stream=True)
+    try:
+        if res.status_code == 304 and validator is not None:
+            _report_body(session, res, started)
+            return None, validator, True
+        res.raise_for_status()
+        body_digest = hashlib.blake2b(digest_size=16)
+        decoded_size = 0
+
+        def chunks():
+            nonlocal decoded_size
+            for chunk in res.iter_content(JSON_STREAM_CHUNK_SIZE):
+                decoded_size += len(chunk)
+                body_digest.update(chunk)
+                yield chunk
+
+        items = iter_json_array(chunks())
+        try:
+            payload = validate(items, series_id)
+        finally:
+            items.close()
+        _report_body(session, res, started, decoded_size)
+    finally:
+        res.close()
+    fresh = [res.headers.get("ETag"), res.headers.get("Last-Modified"), body_digest.hexdigest()]
+    return payload, fresh, fresh[2] == digest
+
+
+def _payload_name(url: str) -> str:
+    """``episode`` or ``episodefile``: the endpoint of a per-series URL."""
+    return "episodefile" if "/episodefile?" in url else "episode"
+
+
+def _fetch_series_with_responses(
+    serie: dict,
+    session: requests.Session,
+    base_url: str,
+    timeout,
+    fetch_mode: str,
+    embedding: EpisodeFileEmbedding,
+    responses: ResponseStore,
+):
+    """Seasons of one series, reusing the stored ones when Sonarr's responses did not change.
+
+    The URLs the series needed last time are requested conditionally; when
+    every one of them answers 304 or with an identical body, the stored
+    seasons are reused. Otherwise the changed payloads are summarized like
+    the pipelined engine does (fetching again the ones that answered 304)
+    and stored. Returns ``(seasons, analysis seconds)``.
+    """
+    series_id = serie["id"]
+    known = responses.lookup(series_id, fetch_mode)
+    payloads_by_url = {}
+    validators = {}
+    if known is not None:
+        stored_validators, seasons = known
+        unchanged = True
+        for url, validator in stored_validators.items():
+            payload, validators[url], same = _get_conditional_items(session, url, timeout, series_id, validator)
+            unchanged = unchanged and same
+            if payload is not None:
+                payloads_by_url[url] = payload
+        if unchanged:
+            responses.store(series_id, fetch_mode, validators, seasons, reused=True)
+            return seasons, 0.0
+    payloads = {}
+    used = {}
+    missing = None
+    analysis_seconds = 0.0
+    while True:
+        for name, url in _series_payload_urls(serie, base_url, fetch_mode, embedding, missing).items():
+            if url not in payloads_by_url:
+                payloads_by_url[url], validators[url], _ = _get_conditional_items(session, url, timeout, series_id)
+            payloads[name] = payloads_by_url[url]
+            used[url] = validators[url]
+        started = time.perf_counter()
+        seasons, missing, embedded = summarize_series_payloads(
+            serie, fetch_mode, payloads.get("episode"), payloads.get("episodefile")
+        )
+        analysis_seconds += time.perf_counter() - started
+        if embedded is not None:
+            embedding.supported = embedded
+        if missing is None:
+            break
+    responses.store(series_id, fetch_mode, used, seasons)
+    return seasons, analysis_seconds
+
+
+def _series_title(serie: dict) -> str:
+    return str(serie.get("title", f"ID {serie.get('id', 'sconosciuto')}"))
 
 
 def _fetch_series_language_data(
@@ -315,24 +1037,71 @@ def _fetch_series_language_data(
     session_factory: Callable[[], requests.Session],
     base_url: str,
     timeout: Tuple[float, float],
+    close_session: bool = True,
+    fetch_mode: str = "split",
+    embedding: Optional[EpisodeFileEmbedding] = None,
+    stats: Optional[ScanStats] = None,
 ):
-    """Fetch and analyze one series using a worker-local HTTP session."""
-    title = str(serie.get("title", f"ID {serie.get('id', 'sconosciuto')}"))
+    """Fetch and analyze one series using a session obtained from the factory.
+
+    The session is closed afterwards unless it is shared with other workers.
+    In ``auto`` fetch mode episode files are requested embedded in /episode
+    while ``embedding`` has not ruled that out; ``files`` mode skips /episode
+    unless a file lacks its season number. ``stats`` gets the series' wall
+    time and the part of it spent counting languages.
+    """
+    title = _series_title(serie)
     series_id = serie.get("id")
     session = None
+    started = time.perf_counter()
+    analysis_seconds = 0.0
     try:
         if series_id is None:
             raise ValueError("series id is missing")
         session = session_factory()
-        episodes = get_episodes(session, series_id, base_url, timeout)
-        files_by_id = get_episode_files(session, series_id, base_url, timeout)
-        lang_data = analyze_language_distribution(serie, episodes, files_by_id)
+        responses = getattr(session, "response_store", None)
+        if responses is not None:
+            seasons, analysis_seconds = _fetch_series_with_responses(
+                serie, session, base_url, timeout, fetch_mode, embedding or EpisodeFileEmbedding(), responses
+            )
+            return series_id, title, serie.get("year"), seasons, None
+        lang_data = None
+        if fetch_mode == "files":
+            files_by_id = get_episode_files(session, series_id, base_url, timeout)
+            analysis_started = time.perf_counter()
+            lang_data = summarize_episode_files(serie, files_by_id)
+            analysis_seconds = time.perf_counter() - analysis_started
+            if lang_data is None:
+                episodes = get_episodes(session, series_id, base_url, timeout)
+        elif fetch_mode == "auto" and (embedding is None or embedding.supported is not False):
+            episodes, files_by_id = get_episodes_with_files(session, series_id, base_url, timeout)
+            _learn_embedding(embedding, files_by_id)
+        else:
+            episodes = get_episodes(session, series_id, base_url, timeout)
+            files_by_id = None
+        if lang_data is None:
+            if files_by_id is None:
+                files_by_id = get_episode_files(session, series_id, base_url, timeout)
+            analysis_started = time.perf_counter()
+            lang_data = analyze_language_distribution(serie, episodes, files_by_id)
+            analysis_seconds += time.perf_counter() - analysis_started
         return series_id, title, serie.get("year"), lang_data.get(title, {}), None
     except (requests.RequestException, KeyError, TypeError, ValueError, RuntimeError) as exc:
         return series_id, title, serie.get("year"), {}, str(exc)
     finally:
-        if session is not None:
+        if session is not None and close_session:
             session.close()
+        if stats is not None:
+            stats.record_series(title, time.perf_counter() - started, analysis_seconds)
+
+
+def _learn_embedding(embedding: Optional[EpisodeFileEmbedding], files_by_id):
+    if embedding is None:
+        return
+    if files_by_id is None:
+        embedding.supported = False
+    elif files_by_id:
+        embedding.supported = True
 
 
 def fetch_all_series_language_data(
@@ -341,72 +1110,663 @@ def fetch_all_series_language_data(
     base_url: str,
     timeout: Tuple[float, float],
     workers: int,
+    cache: Optional[ScanCache] = None,
+    pooled: bool = False,
+    fetch_mode: str = "split",
+    limiter: Optional[AdaptiveConcurrency] = None,
+    stats: Optional[ScanStats] = None,
+    analysis_processes: int = 0,
+    progress: Optional[ScanProgress] = None,
+):
+    """Fetch series concurrently and merge results in deterministic title order.
+
+    Series whose summary is still valid in ``cache`` are not requested at all;
+    freshly fetched summaries are written back to it. See
+    iter_series_language_results for ``pooled``, ``fetch_mode`` and
+    ``analysis_processes``.
+    """
+    return _merge_fetched_series(
+        *collect_series_language_data(
+            series_list,
+            session_factory,
+            base_url,
+            timeout,
+            workers,
+            cache=cache,
+            pooled=pooled,
+            fetch_mode=fetch_mode,
+            limiter=limiter,
+            stats=stats,
+            analysis_processes=analysis_processes,
+            progress=progress,
+        )
+    )
+
+
+def collect_series_language_data(
+    series_list: List[dict],
+    session_factory: Callable[[], requests.Session],
+    base_url: str,
+    timeout: Tuple[float, float],
+    workers: int,
+    cache: Optional[ScanCache] = None,
+    pooled: bool = False,
+    fetch_mode: str = "split",
+    instance: Optional[str] = None,
+    limiter: Optional[AdaptiveConcurrency] = None,
+    stats: Optional[ScanStats] = None,
+    analysis_processes: int = 0,
+    progress: Optional[ScanProgress] = None,
 ):
-    """Fetch series concurrently and merge results in deterministic title order."""
+    """Unmerged fetch_all_series_language_data: ``(fetched entries, failures)``.
+
+    Entries and failures are tagged with ``instance`` so that the results of
+    several Sonarr instances can be merged into one report. ``progress`` is
+    advanced as each series completes.
+    """
     fetched = []
     failures = []
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = {
-            executor.submit(
-                _fetch_series_language_data,
-                serie,
-                session_factory,
-                base_url,
-                timeout,
-            ): str(serie.get("title", f"ID {serie.get('id', 'sconosciuto')}"))
-            for serie in series_list
-        }
-        for future in as_completed(futures):
-            fallback_title = futures[future]
-            try:
-                series_id, title, year, seasons, error = future.result()
-            except Exception as exc:  # Protect a partial scan from one failed worker.
-                failures.append({"serie": fallback_title, "errore": str(exc)})
-                continue
-            if error is None:
-                fetched.append((title.casefold(), title, str(series_id), year, seasons))
-            else:
-                failures.append({"serie": title, "errore": error})
-
-    all_lang_data: Dict[str, dict] = {}
-    title_counts = defaultdict(int)
-    for _, title, _, _, _ in fetched:
-        title_counts[title.casefold()] += 1
-    for _, title, series_id, year, seasons in sorted(
-        fetched, key=lambda item: (item[0], item[1], item[2])
+    for serie, result in iter_series_language_results(
+        _iter_uncached_series(series_list, cache, instance, fetched, progress),
+        session_factory,
+        base_url,
+        timeout,
+        workers,
+        pooled=pooled,
+        fetch_mode=fetch_mode,
+        limiter=limiter,
+        stats=stats,
+        analysis_processes=analysis_processes,
     ):
-        display_title = title
-        if title_counts[title.casefold()] > 1:
-            qualifier = (
-                f"{year}, ID {series_id}"
-                if year not in (None, "")
-                else f"ID {series_id}"
-            )
-            display_title = f"{title} ({qualifier})"
-        all_lang_data[display_title] = seasons
-    failures.sort(key=lambda item: (item["serie"].casefold(), item["serie"]))
-    return all_lang_data, failures
+        _record_series_result(serie, result, fetched, failures, cache, instance)
+        if progress is not None:
+            progress.advance(result[4] is not None)
+    return fetched, failures
 
 
-def detect_wanted_coverage(lang_summary, wanted: List[str], include_all=False, ignore_unknown=False):
-    issues = []
+def iter_series_language_results(
+    series_list: List[dict],
+    session_factory: Callable[[], requests.Session],
+    base_url: str,
+    timeout: Tuple[float, float],
+    workers: int,
+    pooled: bool = False,
+    fetch_mode: str = "split",
+    limiter: Optional[AdaptiveConcurrency] = None,
+    stats: Optional[ScanStats] = None,
+    analysis_processes: int = 0,
+):
+    """Fetch series concurrently, yielding ``(serie, result)`` as each one completes.
+
+    ``result`` is ``(series_id, title, year, seasons, error)`` and a failed
+    series carries its error message instead of raising. With ``pooled`` a
+    single session from ``session_factory`` is shared by every worker, so
+    keep-alive connections are reused across series instead of reopened per
+    series. ``fetch_mode="auto"`` uses one request per series when Sonarr
+    embeds episode files in /episode, and the /episode + /episodefile pair
+    otherwise; ``fetch_mode="files"`` counts languages from /episodefile only.
+    With a ``limiter``, at most ``limiter.limit`` of the ``workers`` threads
+    fetch at once and every response feeds back into that limit. With
+    ``analysis_processes`` the threads only download bodies and a process
+    pool parses and counts them (see _iter_pipelined_results).
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    embedding = EpisodeFileEmbedding()
+    shared_session = None
+    if limiter is not None:
+        session_factory = _observed_session_factory(session_factory, limiter)
+    if pooled and series_list:
+        try:
+            shared_session = session_factory()
+        except Exception as exc:  # Same partial-result contract as per-series sessions.
+            for serie in series_list:
+                yield serie, _failed_series_result(serie, exc)
+            return
+
+    def worker_session_factory():
+        return shared_session if shared_session is not None else session_factory()
+
+    fetch = _fetch_series_language_data
+    if limiter is not None:
+        def fetch(*args, **kwargs):
+            with limiter.slot():
+                return _fetch_series_language_data(*args, **kwargs)
+
+    try:
+        if analysis_processes:
+            yield from _iter_pipelined_results(
+                series_list,
+                worker_session_factory,
+                base_url,
+                timeout,
+                workers,
+                analysis_processes,
+                close_session=shared_session is None,
+                fetch_mode=fetch_mode,
+                limiter=limiter,
+                stats=stats,
+            )
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    fetch,
+                    serie,
+                    worker_session_factory,
+                    base_url,
+                    timeout,
+                    close_session=shared_session is None,
+                    fetch_mode=fetch_mode,
+                    embedding=embedding,
+                    stats=stats,
+                ): serie
+                for serie in series_list
+            }
+            for future in as_completed(futures):
+                serie = futures.pop(future)  # Drop each result once it has been yielded.
+                try:
+                    result = future.result()
+                except Exception as exc:  # Protect a partial scan from one failed worker.
+                    result = _failed_series_result(serie, exc)
+                yield serie, result
+    finally:
+        if shared_session is not None:
+            shared_session.close()
+
+
+def analyze_series_payloads(
+    serie: dict, fetch_mode: str, episodes_body: Optional[bytes], files_body: Optional[bytes]
+):
+    """Parse, validate and summarize the raw bodies of one series (analysis process side).
+
+    Returns ``(seasons, missing, embedded, seconds)``, see
+    summarize_series_payloads. Invalid payloads raise.
+    """
+    started = time.perf_counter()
+    series_id = serie["id"]
+    files_by_id = None
+    episodes = None
+    if files_body is not None:
+        files_by_id = validate_episode_files(iter_json_array((files_body,)), series_id)
+    if episodes_body is not None:
+        episodes = validate_episodes(iter_json_array((episodes_body,)), series_id)
+    seasons, missing, embedded = summarize_series_payloads(serie, fetch_mode, episodes, files_by_id)
+    return seasons, missing, embedded, time.perf_counter() - started
+
+
+def summarize_series_payloads(serie: dict, fetch_mode: str, episodes, files_by_id):
+    """Summarize the validated /episode items and /episodefile index of one series.
+
+    Returns ``(seasons, missing, embedded)``. ``missing`` names the endpoint
+    whose payload is still needed, following the same fallbacks as
+    _fetch_series_language_data, and ``seasons`` is None until it arrives.
+    ``embedded`` tells whether Sonarr honoured includeEpisodeFile, or is None
+    when this series cannot tell.
+    """
+    series_id = serie["id"]
+    title = _series_title(serie)
+    if files_by_id is not None and episodes is None:
+        lang_data = summarize_episode_files(serie, files_by_id) if fetch_mode == "files" else None
+        if lang_data is None:
+            return None, "episode", None
+        return lang_data.get(title, {}), None, None
+    embedded = None
+    if files_by_id is None:
+        files_by_id = embedded_episode_files(episodes, series_id)
+        if files_by_id is None:
+            return None, "episodefile", False
+        embedded = True if files_by_id else None
+    lang_data = analyze_language_distribution(serie, episodes, files_by_id)
+    return lang_data.get(title, {}), None, embedded
+
+
+def _series_payload_urls(serie: dict, base_url: str, fetch_mode: str, embedding: EpisodeFileEmbedding, missing=None):
+    """URLs of the bodies summarize_series_payloads needs next for one series."""
+    series_id = serie.get("id")
+    if series_id is None:
+        raise ValueError("series id is missing")
+    episodes_url = f'{base_url}/episode?seriesId={series_id}'
+    files_url = f'{base_url}/episodefile?seriesId={series_id}'
+    if missing == "episode":
+        return {"episode": episodes_url}
+    if missing == "episodefile":
+        return {"episodefile": files_url}
+    if fetch_mode == "files":
+        return {"episodefile": files_url}
+    if fetch_mode == "auto" and embedding.supported is not False:
+        return {"episode": f"{episodes_url}&includeEpisodeFile=true"}
+    return {"episode": episodes_url, "episodefile": files_url}
+
+
+def _analysis_context():
+    """Start analysis processes without forking a process that runs I/O threads."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _iter_pipelined_results(
+    series_list: List[dict],
+    session_factory: Callable[[], requests.Session],
+    base_url: str,
+    timeout: Tuple[float, float],
+    workers: int,
+    processes: int,
+    close_session: bool = True,
+    fetch_mode: str = "split",
+    limiter: Optional[AdaptiveConcurrency] = None,
+    stats: Optional[ScanStats] = None,
+):
+    """Two-stage scan: I/O threads download raw bodies, analysis processes count them.
+
+    At most ``ANALYSIS_QUEUE_PER_PROCESS`` bodies per process wait for
+    analysis; beyond that the I/O workers block, so a slow analysis stage
+    throttles the downloads instead of piling bodies up in memory. A series
+    that needs one more body (embedding not honoured, files without season
+    numbers) goes back to the I/O stage with the bodies it already has.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+    embedding = EpisodeFileEmbedding()
+    queue_slots = threading.BoundedSemaphore(processes * ANALYSIS_QUEUE_PER_PROCESS)
+
+    def download(serie, bodies, urls, analysis):
+        started = time.perf_counter()
+        session = session_factory()
+        try:
+            if limiter is not None:
+                with limiter.slot():
+                    bodies.update((name, _get_body(session, url, timeout)) for name, url in urls.items())
+            else:
+                bodies.update((name, _get_body(session, url, timeout)) for name, url in urls.items())
+        finally:
+            if close_session:
+                session.close()
+        fetch_seconds = time.perf_counter() - started
+        queue_slots.acquire()
+        try:
+            future = analysis.submit(
+                analyze_series_payloads, serie, fetch_mode, bodies.get("episode"), bodies.get("episodefile")
+            )
+        except BaseException:
+            queue_slots.release()
+            raise
+        future.add_done_callback(lambda _: queue_slots.release())
+        return future, fetch_seconds
+
+    busy = {}
+    with ProcessPoolExecutor(max_workers=processes, mp_context=_analysis_context()) as analysis, ThreadPoolExecutor(
+        max_workers=workers
+    ) as io:
+        downloading = {}
+        analyzing = {}
+
+        def schedule(serie, bodies, missing=None):
+            try:
+                urls = _series_payload_urls(serie, base_url, fetch_mode, embedding, missing)
+            except ValueError as exc:
+                return exc
+            downloading[io.submit(download, serie, bodies, urls, analysis)] = (serie, bodies)
+            return None
+
+        for serie in series_list:
+            error = schedule(serie, {})
+            if error is not None:
+                yield serie, _failed_series_result(serie, error)
+        while downloading or analyzing:
+            done, _ = wait(set(downloading) | set(analyzing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in downloading:
+                    serie, bodies = downloading.pop(future)
+                    try:
+                        analysis_future, fetch_seconds = future.result()
+                    except Exception as exc:  # Same partial-result contract as the thread engine.
+                        yield serie, _failed_series_result(serie, exc)
+                        continue
+                    busy[id(serie)] = busy.get(id(serie), 0.0) + fetch_seconds
+                    analyzing[analysis_future] = (serie, bodies)
+                    continue
+                serie, bodies = analyzing.pop(future)
+                try:
+                    seasons, missing, embedded, analysis_seconds = future.result()
+                except Exception as exc:
+                    yield serie, _failed_series_result(serie, exc)
+                    continue
+                if embedded is not None:
+                    embedding.supported = embedded
+                if missing is not None:
+                    schedule(serie, bodies, missing)
+                    continue
+                if stats is not None:
+                    seconds = busy.pop(id(serie), 0.0) + analysis_seconds
+                    stats.record_series(_series_title(serie), seconds, analysis_seconds)
+                yield serie, (serie.get("id"), _series_title(serie), serie.get("year"), seasons, None)
+
+
+def _observed_session_factory(session_factory, limiter: AdaptiveConcurrency):
+    def factory():
+        session = session_factory()
+        session.hooks["response"].append(limiter.observe)
+        return session
+
+    return factory
+
+
+def worker_budget(workers: Union[int, str]) -> Tuple[int, Optional[AdaptiveConcurrency]]:
+    """Thread count and optional adaptive limiter for a --workers value."""
+    if workers != AUTO_WORKERS:
+        return workers, None
+    limiter = AdaptiveConcurrency(
+        DEFAULT_WORKERS, MIN_ADAPTIVE_WORKERS, MAX_WORKERS, overload_statuses=RETRYABLE_STATUS_CODES
+    )
+    return limiter.maximum, limiter
+
+
+def print_concurrency(
+    limiter: Optional[AdaptiveConcurrency],
+    label: str = "",
+    stats: Optional[ScanStats] = None,
+    instance: Optional[str] = None,
+):
+    """Print the adaptive limits of a scan and add them to ``stats`` for --stats."""
+    if limiter is None:
+        return
+    summary = limiter.summary()
+    if stats is not None:
+        stats.record_concurrency(summary, instance)
+    print(
+        f"📈 {label}Concorrenza adattiva: {summary['min']}–{summary['max']} worker, "
+        f"finale {summary['final']} ({format_timeline(limiter.timeline)})"
+    )
+
+
+def _failed_series_result(serie: dict, error: BaseException):
+    return serie.get("id"), _series_title(serie), serie.get("year"), {}, str(error)
+
+
+async def _fetch_series_language_data_async(
+    serie: dict,
+    client: AsyncSonarrClient,
+    base_url: str,
+    fetch_mode: str = "split",
+    embedding: Optional[EpisodeFileEmbedding] = None,
+):
+    """Async counterpart of _fetch_series_language_data sharing its result contract."""
+    from async_http import AsyncHTTPError
+
+    title = _series_title(serie)
+    series_id = serie.get("id")
+    try:
+        if series_id is None:
+            raise ValueError("series id is missing")
+        lang_data = None
+        if fetch_mode == "files":
+            files_body = await client.get(f'{base_url}/episodefile?seriesId={series_id}')
+            files_by_id = validate_episode_files(iter_json_array((files_body,)), series_id)
+            lang_data = summarize_episode_files(serie, files_by_id)
+            if lang_data is None:
+                episodes_body = await client.get(f'{base_url}/episode?seriesId={series_id}')
+                episodes = validate_episodes(iter_json_array((episodes_body,)), series_id)
+        elif fetch_mode == "auto" and (embedding is None or embedding.supported is not False):
+            episodes_body = await client.get(
+                f'{base_url}/episode?seriesId={series_id}&includeEpisodeFile=true'
+            )
+            episodes = validate_episodes(iter_json_array((episodes_body,)), series_id)
+            files_by_id = embedded_episode_files(episodes, series_id)
+            _learn_embedding(embedding, files_by_id)
+            if files_by_id is None:
+                files_body = await client.get(f'{base_url}/episodefile?seriesId={series_id}')
+                files_by_id = validate_episode_files(iter_json_array((files_body,)), series_id)
+        else:
+            bodies = await asyncio.gather(
+                client.get(f'{base_url}/episode?seriesId={series_id}'),
+                client.get(f'{base_url}/episodefile?seriesId={series_id}'),
+                return_exceptions=True,
+            )
+            # Report the /episode error first, as the sequential thread engine does.
+            for body in bodies:
+                if isinstance(body, BaseException):
+                    raise body
+            episodes_body, files_body = bodies
+            episodes = validate_episodes(iter_json_array((episodes_body,)), series_id)
+            files_by_id = validate_episode_files(iter_json_array((files_body,)), series_id)
+        if lang_data is None:
+            lang_data = analyze_language_distribution(serie, episodes, files_by_id)
+        return series_id, title, serie.get("year"), lang_data.get(title, {}), None
+    except (AsyncHTTPError, OSError, KeyError, TypeError, ValueError, RuntimeError) as exc:
+        # AsyncProtocolError is a ConnectionError: malformed responses read like requests' ConnectionError.
+        return series_id, title, serie.get("year"), {}, str(exc) or type(exc).__name__
+
+
+async def _gather_series_language_data_async(
+    pending: List[dict],
+    apikey: str,
+    base_url: str,
+    timeout,
+    max_in_flight,
+    fetch_mode: str,
+    request_counter: Optional[RequestCounter],
+    retries: int = DEFAULT_RETRY_COUNT,
+    backoff_factor: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+    progress: Optional[ScanProgress] = None,
+):
+    from async_http import AsyncSonarrClient
+
+    client = AsyncSonarrClient(
+        apikey,
+        max_in_flight,
+        timeout,
+        retry_policy(retries, backoff_factor),
+        on_response=request_counter,
+    )
+    embedding = EpisodeFileEmbedding()
+
+    async def fetch(serie):
+        result = await _fetch_series_language_data_async(serie, client, base_url, fetch_mode, embedding)
+        if progress is not None:
+            progress.advance(result[4] is not None)
+        return result
+
+    try:
+        return await asyncio.gather(*(fetch(serie) for serie in pending), return_exceptions=True)
+    finally:
+        await client.close()
+
+
+def fetch_all_series_language_data_async(
+    series_list: List[dict],
+    apikey: str,
+    base_url: str,
+    timeout: Tuple[float, float],
+    max_in_flight: int,
+    cache: Optional[ScanCache] = None,
+    fetch_mode: str = "split",
+    request_counter: Optional[RequestCounter] = None,
+    retries: int = DEFAULT_RETRY_COUNT,
+    backoff_factor: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+    progress: Optional[ScanProgress] = None,
+):
+    """Asyncio variant of fetch_all_series_language_data.
+
+    Up to ``max_in_flight`` requests share one keep-alive connection pool on a
+    single thread; results, duplicate-title handling and failures are merged
+    exactly like the thread engine does.
+    """
+    return _merge_fetched_series(
+        *collect_series_language_data_async(
+            series_list,
+            apikey,
+            base_url,
+            timeout,
+            max_in_flight,
+            cache=cache,
+            fetch_mode=fetch_mode,
+            request_counter=request_counter,
+            retries=retries,
+            backoff_factor=backoff_factor,
+            progress=progress,
+        )
+    )
+
+
+def collect_series_language_data_async(
+    series_list: List[dict],
+    apikey: str,
+    base_url: str,
+    timeout: Tuple[float, float],
+    max_in_flight: int,
+    cache: Optional[ScanCache] = None,
+    fetch_mode: str = "split",
+    request_counter: Optional[RequestCounter] = None,
+    retries: int = DEFAULT_RETRY_COUNT,
+    backoff_factor: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+    instance: Optional[str] = None,
+    progress: Optional[ScanProgress] = None,
+):
+    """Unmerged fetch_all_series_language_data_async, like collect_series_language_data."""
+    fetched, pending = _split_cached_series(series_list, cache, instance)
+    failures = []
+    if progress is not None:
+        progress.add_cached(len(fetched))
+    results = []
+    if pending:
+        results = asyncio.run(
+            _gather_series_language_data_async(
+                pending,
+                apikey,
+                base_url,
+                timeout,
+                max_in_flight,
+                fetch_mode,
+                request_counter,
+                retries=retries,
+                backoff_factor=backoff_factor,
+                progress=progress,
+            )
+        )
+    for serie, result in zip(pending, results):
+        if isinstance(result, BaseException):  # Protect a partial scan from one failed task.
+            result = _failed_series_result(serie, result)
+        _record_series_result(serie, result, fetched, failures, cache, instance)
+    return fetched, failures
+
+
+def _split_cached_series(series_list: List[dict], cache: Optional[ScanCache], instance: Optional[str] = None):
+    """Separate series served from the cache from the ones that must be fetched."""
+    fetched = []
+    pending = list(_iter_uncached_series(series_list, cache, instance, fetched))
+    return fetched, pending
+
+
+def _iter_uncached_series(
+    series_list,
+    cache: Optional[ScanCache],
+    instance: Optional[str],
+    fetched: list,
+    progress: Optional[ScanProgress] = None,
+):
+    """Yield the series that must be fetched, adding cached ones to ``fetched`` on the way.
+
+    Lazy, so that fetching starts while ``series_list`` (e.g. a
+    SeriesListing) is still being received.
+    """
+    for serie in series_list:
+        seasons = cache.lookup(serie) if cache is not None else None
+        if seasons is None:
+            yield serie
+            continue
+        title = _series_title(serie)
+        fetched.append((title.casefold(), title, str(serie.get("id")), serie.get("year"), seasons, instance))
+        if progress is not None:
+            progress.add_cached(1)
+
+
+def _record_series_result(
+    serie: dict,
+    result,
+    fetched: list,
+    failures: list,
+    cache: Optional[ScanCache],
+    instance: Optional[str] = None,
+):
+    series_id, title, year, seasons, error = result
+    if error is None:
+        fetched.append((title.casefold(), title, str(series_id), year, seasons, instance))
+        if cache is not None:
+            cache.store(serie, seasons)
+    else:
+        failures.append(_series_failure(title, error, instance))
+
+
+def _series_failure(title: Optional[str], error: str, instance: Optional[str] = None) -> dict:
+    """Failure record; ``title`` is None when a whole instance could not be scanned."""
+    if instance is None:
+        return {"serie": title, "errore": error}
+    return {"istanza": instance, "serie": title, "errore": error}
+
+
+def _qualified_title_pattern(title: str, instance: Optional[str] = None) -> re.Pattern:
+    """The display titles _merge_fetched_series can give a series ``title`` of ``instance``.
+
+    Either the title itself or the title with the qualifiers added to
+    duplicates, so "Foo (2019)" is not mistaken for a qualified "Foo".
+    """
+    qualifiers = [r"(?:[^()]*, )?ID \d+"]
+    if instance is not None:
+        qualifiers += [re.escape(instance), rf"{re.escape(instance)}, (?:[^()]*, )?ID \d+"]
+    return re.compile(rf"{re.escape(title)}(?: \((?:{'|'.join(qualifiers)})\))?")
+
+
+def _merge_fetched_series(fetched: list, failures: list):
+    """Disambiguate duplicate titles and sort results and failures by title.
+
+    A title found on several instances is qualified with the instance name,
+    and a title repeated within one instance with its year and series id.
+    """
+    all_lang_data: Dict[str, dict] = {}
+    title_instances = defaultdict(set)
+    title_counts = defaultdict(int)
+    for folded, _, _, _, _, instance in fetched:
+        title_instances[folded].add(instance)
+        title_counts[folded, instance] += 1
+    for folded, title, series_id, year, seasons, instance in sorted(
+        fetched, key=lambda item: (item[0], item[1], item[5] or "", item[2])
+    ):
+        qualifiers = []
+        if len(title_instances[folded]) > 1:
+            qualifiers.append(instance)
+        if title_counts[folded, instance] > 1:
+            qualifiers.append(
+                f"{year}, ID {series_id}"
+                if year not in (None, "")
+                else f"ID {series_id}"
+            )
+        display_title = f"{title} ({', '.join(qualifiers)})" if qualifiers else title
+        all_lang_data[display_title] = seasons
+    failures.sort(
+        key=lambda item: (
+            (item["serie"] or "").casefold(),
+            item["serie"] or "",
+            item.get("istanza") or "",
+        )
+    )
+    return all_lang_data, failures
+
+
+def detect_wanted_coverage(lang_summary, wanted: List[str], include_all=False, ignore_unknown=False):
+    issues = []
     if not wanted:
         return issues
     wanted_set = set(wanted)
     wanted_sorted = sorted(wanted_set)
+    wanted_mask = LANGUAGES.mask(wanted_set)
     for serie in sorted(lang_summary, key=lambda value: (value.casefold(), value)):
         seasons = lang_summary[serie]
-        for season_num in sorted(seasons):
-            langs = seasons[season_num]
+        for season_num, langs in sorted(seasons.items(), key=lambda item: item[0]):
             # Optionally drop unknowns from consideration
-            if ignore_unknown:
-                langs = {k: v for k, v in langs.items() if k != 'und'}
-            total = sum(langs.values())
-            supported = 0
-            for combo, count in langs.items():
-                tokens = combo.split('/')
-                if any(t in wanted_set for t in tokens):
-                    supported += count
+            total, supported = SeasonLanguages.from_mapping(langs).coverage(
+                wanted_mask, ignore_unknown=ignore_unknown
+            )
             if total == 0:
                 # nothing to evaluate after ignoring unknowns
                 continue
@@ -446,8 +1806,8 @@ def detect_mismatches(lang_summary, include_all=False, ignore_unknown=False):
     for serie in sorted(lang_summary, key=lambda value: (value.casefold(), value)):
         seasons = lang_summary[serie]
         series_langs = set()
-        for season_num in sorted(seasons):
-            langs = seasons[season_num]
+        for season_num, season_langs in sorted(seasons.items(), key=lambda item: item[0]):
+            langs = dict(season_langs.items())  # Unpack compact SeasonLanguages once.
             sorted_langs = dict(sorted(langs.items()))
             if ignore_unknown:
                 known_langs = {k: v for k, v in langs.items() if k != 'und'}
@@ -490,70 +1850,1145 @@ def detect_mismatches(lang_summary, include_all=False, ignore_unknown=False):
     return issues
 
 
-def main(argv=None) -> int:
-    args = parse_args(argv)
-    if not args.apikey or not args.url:
-        print("❌ Devi specificare sia l'API Key che l'URL base (via CLI o .env)")
-        return EXIT_FATAL
-    if args.output:
+def detect_issues(lang_summary, wanted: List[str], include_all=False, ignore_unknown=False):
+    if wanted:
+        return detect_wanted_coverage(lang_summary, wanted, include_all=include_all, ignore_unknown=ignore_unknown)
+    return detect_mismatches(lang_summary, include_all=include_all, ignore_unknown=ignore_unknown)
+
+
+def build_series_filter(args) -> SeriesFilter:
+    """Pre-filter from --include/--exclude/--ignore-anime, skipping provably trivial series.
+
+    Without episode files a series has no seasons to report; with a single
+    file every season has one language combination, so the mismatch report
+    is empty too (but a wanted-language report is not). --show-all lists
+    those series as well, so nothing is skipped then. Neither are they when
+    the scan feeds more than the report: --exporter publishes series and
+    episode counts, and snapshots keep the counts for any later detection.
+    """
+    exclude = list(args.exclude)
+    if args.ignore_anime:
+        exclude.append(Condition("type", ("anime",)))
+    trivial_files = None
+    if not (args.scan_trivial or args.show_all or args.exporter or args.snapshot or args.diff_against):
+        trivial_files = 0 if args.wanted_langs else 1
+    return SeriesFilter(args.include, exclude, trivial_files)
+
+
+def resolve_series_filter(series_filter: SeriesFilter, session: requests.Session, base_url: str, timeout, label=""):
+    """Resolve tag and profile names of ``series_filter`` against one Sonarr instance."""
+    items_by_field = {}
+    for field, endpoint in series_filter.lookups().items():
+        started = time.perf_counter()
+        res = session.get(f'{base_url}/{endpoint}', timeout=timeout)
+        res.raise_for_status()
+        payload = res.json()
+        _report_body(session, res, started)
+        if not isinstance(payload, list):
+            raise ValueError(f"Sonarr /{endpoint} returned an invalid payload: expected a list")
+        items_by_field[field] = payload
+    series_filter, unknown = series_filter.resolved(items_by_field)
+    if unknown:
+        print(f"⚠️ {label}Filtri senza corrispondenze in Sonarr: {', '.join(unknown)}", file=sys.stderr)
+    return series_filter
+
+
+def select_series(series_list: List[dict], series_filter: SeriesFilter, label: str = "") -> List[dict]:
+    """Series that pass ``series_filter``, reporting how many were skipped."""
+    selected, excluded, trivial = series_filter.split(series_list)
+    print_selection(len(selected), len(series_list), excluded, trivial, label)
+    return selected
+
+
+def print_selection(selected: int, total: int, excluded: int, trivial: int, label: str = ""):
+    if excluded or trivial:
+        print(
+            f"⏭️ {label}{selected}/{total} serie da analizzare: {excluded} escluse dai filtri, "
+            f"{trivial} saltate perché non possono dare risultati"
+        )
+
+
+class SeriesListingError(Exception):
+    """/series could not be read while a SeriesListing was being scanned."""
+
+
+class SeriesListing:
+    """/series streamed through a SeriesFilter, so the scan starts on the first decoded series.
+
+    Iterate it once, in place of a list of series. Afterwards ``ids`` holds
+    every listed series and the counters describe the selection; each
+    selected series grows the total of ``progress``. Errors of the listing
+    are raised as SeriesListingError, not reported as a failed series.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        base_url: str,
+        timeout: Tuple[float, float],
+        series_filter: SeriesFilter,
+        progress: Optional[ScanProgress] = None,
+    ):
+        self.session = session
+        self.base_url = base_url
+        self.timeout = timeout
+        self.series_filter = series_filter
+        self.progress = progress
+        self.ids = []
+        self.selected = self.excluded = self.trivial = 0
+
+    def __iter__(self):
         try:
-            validate_output_path(args.output)
-        except ValueError as error:
-            print(f"❌ Percorso di output non valido: {error}", file=sys.stderr)
-            return EXIT_FATAL
+            for serie in iter_series(self.session, self.base_url, self.timeout):
+                self.ids.append(serie.get("id"))
+                if self.series_filter.excludes(serie):
+                    self.excluded += 1
+                elif self.series_filter.is_trivial(serie):
+                    self.trivial += 1
+                else:
+                    self.selected += 1
+                    if self.progress is not None:
+                        self.progress.add_total(1)
+                    yield serie
+        except (requests.RequestException, ValueError) as error:
+            raise SeriesListingError(error) from error
 
-    # Prepare HTTP session and timeouts
-    session = build_session(args.apikey)
-    timeout = (
-        DEFAULT_CONNECT_TIMEOUT,
-        args.timeout if args.timeout is not None else DEFAULT_READ_TIMEOUT,
-    )
-    base_url = normalize_url(args.url)
+    def print_selection(self, label: str = ""):
+        print_selection(self.selected, len(self.ids), self.excluded, self.trivial, label)
+
+
+def expected_series_cost(serie: dict) -> Tuple[int, int]:
+    """Relative cost of scanning a series: its episode files, then its episodes."""
+    statistics = serie.get("statistics")
+    if not isinstance(statistics, dict):
+        return (0, 0)
+    counts = []
+    for key in ("episodeFileCount", "totalEpisodeCount"):
+        value = statistics.get(key)
+        counts.append(value if isinstance(value, int) and not isinstance(value, bool) else 0)
+    return tuple(counts)
+
+
+def last_change(serie: dict) -> datetime:
+    """Most recent of airing and addition dates of a series, or the epoch when unknown."""
+    latest = datetime.min.replace(tzinfo=timezone.utc)
+    for key in ("lastAired", "previousAiring", "added"):
+        value = serie.get(key)
+        if not isinstance(value, str):
+            continue
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        latest = max(latest, moment)
+    return latest
 
-    print(f"📡 Recupero dati da Sonarr @ {base_url} ...")
+
+def order_series(series_list: List[dict], order: str = "largest") -> List[dict]:
+    """Order in which series are submitted to the workers.
+
+    ``largest`` schedules the most expensive series first (longest processing
+    time first), so one huge show does not start last and become the tail of
+    the scan; ``recent`` starts with the series that aired or were added most
+    recently; ``sonarr`` keeps the /series order. Ties keep the /series order
+    and the report is sorted by title regardless.
+    """
+    if order == "largest":
+        return sorted(series_list, key=expected_series_cost, reverse=True)
+    if order == "recent":
+        return sorted(series_list, key=last_change, reverse=True)
+    return list(series_list)
+
+
+def prepare_incremental_scan(cache: ScanCache, session, base_url: str, timeout, max_age_hours: float):
+    """Limit the scan to series changed since the last complete one.
+
+    Falls back to a normal scan, which still reuses unchanged series and
+    stored responses, when the stored state is missing, unreadable or older
+    than ``max_age_hours``, or when history is unavailable.
+    """
+    from scan_cache import utc_timestamp
+
+    since = cache.last_complete_scan()
+    now = datetime.now(timezone.utc)
+    if since is None or not timedelta(0) <= now - since <= timedelta(hours=max_age_hours):
+        print("ℹ️ Nessuna analisi completa recente: analisi incrementale non possibile, eseguo un’analisi normale")
+        return
     try:
-        series_list = get_series(session, base_url, timeout)
-    except (requests.RequestException, ValueError) as e:
-        print(f"❌ Errore nella connessione a Sonarr: {e}")
-        return EXIT_FATAL
+        changed_ids = get_history_series_ids(session, base_url, since, timeout)
+    except (requests.RequestException, ValueError) as error:
+        print(f"⚠️ History di Sonarr non disponibile ({error}): eseguo un’analisi normale", file=sys.stderr)
+        return
+    cache.start_incremental(changed_ids)
+    print(f"🕑 Analisi incrementale: {len(changed_ids)} serie modificate dal {utc_timestamp(since)}")
+
+
+def scan_series_entries(
+    series_list: List[dict],
+    session_factory: Callable[[], requests.Session],
+    base_url: str,
+    timeout: Tuple[float, float],
+    workers: int,
+    cache: Optional[ScanCache] = None,
+    pooled: bool = False,
+    fetch_mode: str = "split",
+    limiter: Optional[AdaptiveConcurrency] = None,
+):
+    """Scan series into the per-id entries and failures kept by ReportState."""
+    fetched, pending = _split_cached_series(series_list, cache)
+    entries = {item[2]: item for item in fetched}
+    failures = {}
+    for serie, result in iter_series_language_results(
+        pending,
+        session_factory,
+        base_url,
+        timeout,
+        workers,
+        pooled=pooled,
+        fetch_mode=fetch_mode,
+        limiter=limiter,
+    ):
+        series_id, title, year, seasons, error = result
+        if error is None:
+            entries[str(series_id)] = (title.casefold(), title, str(series_id), year, seasons, None)
+            if cache is not None:
+                cache.store(serie, seasons)
+        else:
+            failures[str(series_id)] = {"serie": title, "errore": error}
+    return entries, failures
+
+
+def iter_scanned_series(
+    series_list: List[dict],
+    session_factory: Callable[[], requests.Session],
+    base_url: str,
+    timeout: Tuple[float, float],
+    workers: int,
+    cache: Optional[ScanCache] = None,
+    progress: Optional[ScanProgress] = None,
+    **options,
+):
+    """Yield ``(serie, result)`` for cached series first, then as each fetch completes.
+
+    Fresh summaries are stored in ``cache`` as they arrive and nothing is
+    kept once yielded. ``options`` are passed to iter_series_language_results.
+    """
+    pending = []
+    for serie in series_list:
+        seasons = cache.lookup(serie) if cache is not None else None
+        if seasons is None:
+            pending.append(serie)
+        else:
+            if progress is not None:
+                progress.add_cached(1)
+            yield serie, (serie.get("id"), _series_title(serie), serie.get("year"), seasons, None)
+    for serie, result in iter_series_language_results(pending, session_factory, base_url, timeout, workers, **options):
+        if result[4] is None and cache is not None:
+            cache.store(serie, result[3])
+        if progress is not None:
+            progress.advance(result[4] is not None)
+        yield serie, result
+
+
+def stream_report(scanned, output, as_json: bool, wanted_list: List[str], include_all=False, ignore_unknown=False):
+    """Write the issues of each series as soon as it is analyzed.
+
+    JSON output is NDJSON: one issue object per line with the series ``id``
+    added, since duplicate titles are only disambiguated in the sorted
+    report, and ``{"type": "errore", ...}`` lines for failed series. Text
+    output prints one block per series. Returns ``(failures, series count)``.
+    """
+    failures = []
+    analyzed = 0
+    issues_found = False
+    if not as_json:
+        print("\n📊 Risultati (man mano che le serie vengono analizzate):", file=output)
+    for _, (series_id, title, _, seasons, error) in scanned:
+        if error is not None:
+            failure = _series_failure(title, error)
+            failures.append(failure)
+            print_failures([failure])
+            if as_json:
+                output.write(json.dumps({"type": "errore", "id": series_id, **failure}, ensure_ascii=False) + "\n")
+            continue
+        analyzed += 1
+        items = detect_issues({title: seasons}, wanted_list, include_all=include_all, ignore_unknown=ignore_unknown)
+        if as_json:
+            for item in items:
+                output.write(json.dumps({**item, "id": series_id}, ensure_ascii=False) + "\n")
+        elif items:
+            with redirect_stdout(output):
+                for item in items:
+                    print_issue(item)
+                print()
+            issues_found = True
+        output.flush()
+    if not as_json and not issues_found:
+        print("    ✅ Nessuna discrepanza linguistica rilevata.", file=output)
+    return failures, analyzed
+
+
+def create_webhook_server(
+    args,
+    base_url: str,
+    timeout,
+    series_list: List[dict],
+    cache=None,
+    request_counter=None,
+    series_filter: Optional[SeriesFilter] = None,
+):
+    """Scan the library once, then return a server that keeps the report current.
+
+    Webhooks only name the series that changed: after ``args.debounce``
+    seconds without further events for them, those series are fetched again
+    (bypassing the cache) and the report is rebuilt from the stored results.
+    """
+    from webhook_server import ReportState, SeriesDebouncer, WebhookServer
+
+    wanted_list = parse_wanted_langs(args.wanted_langs) if args.wanted_langs else []
+    if series_filter is None:
+        series_filter = build_series_filter(args)
+
+    def render(entries, failures):
+        all_lang_data, failure_list = _merge_fetched_series(entries, failures)
+        results = detect_issues(
+            all_lang_data, wanted_list, include_all=args.show_all, ignore_unknown=args.ignore_unknown
+        )
+        return results, failure_list
+
+    workers, limiter = worker_budget(args.workers)
+
+    def session_factory():
+        return build_session(
+            args.apikey,
+            pool_size=workers,
+            request_counter=request_counter,
+            retries=args.retries,
+            backoff_factor=args.retry_backoff,
+        )
+
+    def scan(series):
+        return scan_series_entries(
+            series,
+            session_factory,
+            base_url,
+            timeout,
+            workers,
+            cache=cache,
+            pooled=args.transport == "pooled",
+            fetch_mode=args.fetch_mode,
+            limiter=limiter,
+        )
+
+    state = ReportState(render)
+    try:
+        entries, failures = scan(order_series(select_series(series_list, series_filter), args.order))
+        if cache is not None:
+            cache.retain(serie.get("id") for serie in series_list)
+            if not failures:
+                cache.mark_complete()
+    finally:
+        if cache is not None:
+            close_scan_cache(cache)
+            print(f"🗃️ Cache: {cache.hits} serie riutilizzate, {cache.misses} da analizzare")
+    # The cache connection belongs to this thread; webhook refreshes always refetch.
+    cache = None
+    state.update(entries, failures)
+    print_failures(failures.values())
+
+    def refresh(batch):
+        events = list(batch.values())
+        # Webhooks carry only id, title, year and type: the filters need the /series item.
+        listed = []
+        unchanged = set()
+        session = session_factory()
+        try:
+            for action, serie in events:
+                if action != "refresh":
+                    continue
+                try:
+                    details = get_serie(session, base_url, serie["id"], timeout)
+                except (requests.RequestException, ValueError) as error:
+                    print(
+                        f"⚠️ Webhook: serie {serie['id']} non letta da Sonarr, report invariato: {error}",
+                        file=sys.stderr,
+                    )
+                    unchanged.add(str(serie["id"]))
+                    continue
+                if details is not None:
+                    listed.append(details)
+        finally:
+            session.close()
+        refreshed, _, _ = series_filter.split(listed)
+        kept_ids = {str(serie["id"]) for serie in refreshed} | unchanged
+        removed = [str(serie["id"]) for _, serie in events if str(serie["id"]) not in kept_ids]
+        entries, failures = scan(refreshed)
+        state.update(entries, failures, removed)
+        print(f"🔄 Webhook: {len(refreshed)} serie rianalizzate, {len(removed)} rimosse dal report")
+        print_failures(failures.values())
+
+    debouncer = SeriesDebouncer(args.debounce, refresh)
+    try:
+        return WebhookServer(args.listen, state, debouncer, password=args.webhook_password)
+    except OSError:
+        debouncer.close()
+        raise
+
+
+def open_scan_cache(args, cache_file, base_url: str, label: str = "") -> Optional[ScanCache]:
+    if args.no_cache:
+        return None
+    from scan_cache import ScanCache
+
+    try:
+        return ScanCache.open(cache_file, base_url, refresh=args.refresh)
+    except sqlite3.Error as error:
+        print(f"⚠️ {label}Cache non disponibile, analisi completa: {error}", file=sys.stderr)
+        return None
+
+
+def close_scan_cache(cache: ScanCache, label: str = ""):
+    try:
+        cache.close()
+    except sqlite3.Error as error:
+        print(f"⚠️ {label}Impossibile aggiornare la cache: {error}", file=sys.stderr)
+
+
+def scan_instance(
+    instance: SonarrInstance,
+    args,
+    request_counter: RequestCounter,
+    stats: Optional[ScanStats] = None,
+    progress: Optional[ScanProgress] = None,
+):
+    """Scan one configured instance into unmerged ``(fetched, failures, selected count)``.
+
+    Uses the instance's own worker budget, retry policy and cache file;
+    errors while listing its series propagate to the caller. The selected
+    series are added to the total of the shared ``progress``.
+    """
+    label = f"[{instance.name}] "
+    timeout = (DEFAULT_CONNECT_TIMEOUT, instance.timeout)
+
+    def session_factory(pool_size=None):
+        return build_session(
+            instance.apikey,
+            pool_size=pool_size,
+            request_counter=request_counter,
+            retries=instance.retries,
+            backoff_factor=instance.backoff_factor,
+            response_store=cache.responses if cache is not None else None,
+        )
+
+    cache = open_scan_cache(args, instance.cache_file, instance.url, label)
+    print(f"📡 {label}Recupero dati da Sonarr @ {instance.url} ...")
+    session = session_factory()
+    try:
+        series_list = get_series(session, instance.url, timeout)
+        series_filter = resolve_series_filter(build_series_filter(args), session, instance.url, timeout, label)
+        if args.incremental and cache is not None:
+            prepare_incremental_scan(cache, session, instance.url, timeout, args.incremental_max_age)
+    except BaseException:
+        if cache is not None:
+            cache.close()
+        raise
     finally:
         session.close()
 
-    print("📦 Analisi episodi in corso...")
-    selected_series = [
-        serie
-        for serie in series_list
-        if not (
-            args.ignore_anime
-            and str(serie.get('seriesType', '')).lower() == 'anime'
+    selected_series = order_series(select_series(series_list, series_filter, label), args.order)
+    workers, limiter = worker_budget(instance.workers)
+    if progress is not None:
+        progress.add_total(len(selected_series))
+    try:
+        if args.engine == "async":
+            fetched, failures = collect_series_language_data_async(
+                selected_series,
+                instance.apikey,
+                instance.url,
+                timeout,
+                instance.max_in_flight,
+                cache=cache,
+                fetch_mode=args.fetch_mode,
+                request_counter=request_counter,
+                retries=instance.retries,
+                backoff_factor=instance.backoff_factor,
+                instance=instance.name,
+                progress=progress,
+            )
+        else:
+            fetched, failures = collect_series_language_data(
+                selected_series,
+                lambda: session_factory(pool_size=workers),
+                instance.url,
+                timeout,
+                workers,
+                cache=cache,
+                pooled=args.transport == "pooled",
+                fetch_mode=args.fetch_mode,
+                instance=instance.name,
+                limiter=limiter,
+                stats=stats,
+                analysis_processes=args.analysis_processes,
+                progress=progress,
+            )
+        if cache is not None:
+            cache.retain(serie.get("id") for serie in series_list)
+            if not failures:
+                cache.mark_complete()
+    finally:
+        if cache is not None:
+            close_scan_cache(cache, label)
+    if cache is not None:
+        print(f"🗃️ {label}Cache: {cache.hits} serie riutilizzate, {cache.misses} da analizzare")
+        print_unchanged_responses(cache, label)
+    print_concurrency(limiter, label, stats, instance.name)
+    return fetched, failures, len(selected_series)
+
+
+def scan_instances(
+    instances: List[SonarrInstance],
+    args,
+    request_counter: RequestCounter,
+    stats: Optional[ScanStats] = None,
+    progress: Optional[ScanProgress] = None,
+):
+    """Scan every instance at once and merge their results into one report.
+
+    Each instance runs on its own thread with its own worker pool, so the
+    wall time follows the slowest instance rather than the sum of all of
+    them. Returns ``(all_lang_data, failures, selected count, unreachable)``
+    where ``unreachable`` counts instances whose series list was unavailable.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    fetched = []
+    failures = []
+    selected_count = 0
+    unreachable = 0
+    with ThreadPoolExecutor(max_workers=len(instances)) as executor:
+        futures = {
+            executor.submit(scan_instance, instance, args, request_counter, stats, progress): instance
+            for instance in instances
+        }
+        for future in as_completed(futures):
+            instance = futures[future]
+            try:
+                instance_fetched, instance_failures, instance_selected = future.result()
+            except (requests.RequestException, ValueError) as error:
+                print(f"❌ [{instance.name}] Errore nella connessione a Sonarr: {error}", file=sys.stderr)
+                failures.append(_series_failure(None, str(error), instance.name))
+                unreachable += 1
+                continue
+            fetched.extend(instance_fetched)
+            failures.extend(instance_failures)
+            selected_count += instance_selected
+    if stats is not None and args.engine == "threads":
+        stats.capacity = sum(worker_budget(instance.workers)[0] for instance in instances)
+    all_lang_data, failures = _merge_fetched_series(fetched, failures)
+    return all_lang_data, failures, selected_count, unreachable
+
+
+def print_failures(failures):
+    for failure in failures:
+        if failure["serie"] is None:
+            continue  # Already reported when the instance failed.
+        instance = f"[{failure['istanza']}] " if failure.get("istanza") else ""
+        print(
+            f"⚠️ {instance}Errore durante l'elaborazione della serie "
+            f"'{failure['serie']}': {failure['errore']}",
+            file=sys.stderr,
+        )
+
+
+def print_report(results):
+    """Print the detected issues as the human-readable text report."""
+    print("\n📊 Risultati:")
+    if results:
+        last_serie = None
+        for item in results:
+            if last_serie and item['serie'] != last_serie:
+                print()
+            last_serie = item['serie']
+            print_issue(item)
+    else:
+        print("    ✅ Nessuna discrepanza linguistica rilevata.")
+
+
+def print_issue(item):
+    """Print one line of the text report."""
+    label = None
+    pad = 24
+    if item["type"] == "stagione_mista":
+        # nota: abbiamo due spazi con "⚠️" per la stampa corretta nel terminale in uso, valutiamo se cambiare
+        label = "⚠️  STAGIONE MISTA"
+        pad = PADDING_WIDTH
+    elif item["type"] == "stagione_ok":
+        label = "✅ STAGIONE OK"
+        pad = PADDING_WIDTH - 2
+    elif item["type"] == "serie_mista":
+        # nota: abbiamo due spazi con "⚠️" per la stampa corretta nel terminale in uso, valutiamo se cambiare
+        label = "⚠️  SERIE MISTA"
+        pad = PADDING_WIDTH
+    elif item["type"] == "serie_ok":
+        label = "✅ SERIE OK"
+        pad = PADDING_WIDTH - 2
+    if item["type"] in ("stagione_mista", "stagione_ok"):
+        lang_display = {f"{get_flag(k)} {k}": v for k, v in item['lingue'].items()}
+        print(f"  [{label}]".ljust(pad) + f" {item['serie']} - Stagione {item['stagione']}: {lang_display}")
+    elif item["type"] == "serie_mista":
+        langs = ', '.join(f"{get_flag(k)} {k}" for k in item['lingue'])
+        print(f"  [{label}]".ljust(pad) + f" {item['serie']}: Lingue usate: [{langs}]")
+    elif item["type"] == "serie_ok":
+        langs = ', '.join(f"{get_flag(k)} {k}" for k in item['lingue'])
+        print(f"  [{label}]".ljust(pad) + f" {item['serie']}: Lingua unica: [{langs}]")
+    elif item["type"] in ("stagione_non_supportata", "stagione_parzialmente_supportata", "stagione_supportata"):
+        if item["type"] == "stagione_non_supportata":
+            label = "🚫 NESSUNA LINGUA DESIDERATA"
+            pad = PADDING_WIDTH - 1
+        elif item["type"] == "stagione_parzialmente_supportata":
+            label = "🟡 PARZIALMENTE SUPPORTATA"
+            pad = PADDING_WIDTH
+        elif item["type"] == "stagione_supportata":
+            label = "✅ STAGIONE OK (desiderata)"
+            pad = PADDING_WIDTH - 2
+        wanted_disp = ', '.join(f"{get_flag(k)} {k}" for k in item['lingue_desiderate'])
+        print(
+            f"  [{label}]".ljust(pad)
+            + f" {item['serie']} - Stagione {item['stagione']}: "
+            + f"{item['supportati']}/{item['totale']} episodi con lingue desiderate [{wanted_disp}]"
         )
+
+
+def print_diff(diff: dict):
+    """Print the issues that changed since the --diff-against snapshot."""
+    print("\n📊 Differenze rispetto allo snapshot:")
+    if not any(diff.values()):
+        print("    ✅ Nessuna differenza.")
+        return
+    for key, heading in (("new", "🆕 Nuovi"), ("resolved", "✔️ Risolti"), ("changed", "🔄 Modificati")):
+        if not diff[key]:
+            continue
+        print(f"\n  {heading} ({len(diff[key])}):")
+        for item in diff[key]:
+            if key == "changed":
+                print_issue(item["before"])
+                print("    ↳ ora:")
+                item = item["after"]
+            print_issue(item)
+
+
+def open_snapshot(filename: str):
+    """The snapshot in ``filename``, or an empty one on the first run (no file yet)."""
+    if not Path(filename).exists():
+        return EMPTY_SNAPSHOT
+    return Snapshot(filename)
+
+
+def update_snapshots(args, all_lang_data, failures, detect) -> Optional[dict]:
+    """Diff this run against --diff-against and save it to --snapshot.
+
+    Returns the diff, or None without --diff-against. Series that failed in
+    this run are left out of the diff, and their previous counts are carried
+    into the new snapshot so the next diff does not report them as new.
+    """
+    if not args.diff_against and not args.snapshot:
+        return None
+    failed = [
+        _qualified_title_pattern(failure["serie"], failure.get("istanza"))
+        for failure in failures
+        if failure["serie"] is not None
     ]
-    all_lang_data, failures = fetch_all_series_language_data(
+    # Series of an instance that could not be scanned at all are not known by title.
+    instance_failed = any(failure["serie"] is None for failure in failures)
+
+    def failed_now(title: str) -> bool:
+        if instance_failed and title not in all_lang_data:
+            return True
+        return any(pattern.fullmatch(title) for pattern in failed)
+
+    current = ScanIndex(all_lang_data, complete=not failures)
+    diff = None
+    carried = {}
+    if args.diff_against:
+        with open_snapshot(args.diff_against) as previous:
+            diff = diff_snapshots(previous, current, detect, skip=failed_now)
+            if failed or instance_failed:
+                carried = {
+                    title: previous.seasons(title)
+                    for title in previous.titles
+                    if title not in all_lang_data and failed_now(title)
+                }
+    if args.snapshot:
+        if carried:
+            current = ScanIndex({**all_lang_data, **carried}, complete=False)
+        with atomic_output(args.snapshot, binary=True) as output_file:
+            output_file.write(current.encode())
+        print(f"🗂️ Snapshot salvato in: {args.snapshot} ({len(current.titles)} serie)")
+    return diff
+
+
+def scan_exit_code(failures, selected_count: int) -> int:
+    """EXIT_PARTIAL with a summary on stderr when some series failed, else EXIT_OK."""
+    if not failures:
+        return EXIT_OK
+    failed_series = sum(1 for failure in failures if failure["serie"] is not None)
+    failed_instances = len(failures) - failed_series
+    succeeded = selected_count - failed_series
+    instances_note = f", {failed_instances} istanze non raggiungibili" if failed_instances else ""
+    print(
+        f"⚠️ Analisi incompleta: {succeeded}/{selected_count} serie "
+        f"analizzate, {failed_series} non riuscite{instances_note}. Exit code {EXIT_PARTIAL}.",
+        file=sys.stderr,
+    )
+    return EXIT_PARTIAL
+
+
+def print_unchanged_responses(cache: ScanCache, label: str = ""):
+    if cache.responses.reused:
+        print(f"♻️ {label}Risposte di Sonarr invariate per {cache.responses.reused} serie: analisi riutilizzata")
+
+
+def start_progress(args, request_counter, total: int = 0, concurrency=None) -> Optional[ScanProgress]:
+    """Progress reporting on stderr for one scan, unless --quiet."""
+    if args.quiet:
+        return None
+    return ScanProgress(total, requests=request_counter, concurrency=concurrency)
+
+
+def finish_progress(progress: Optional[ScanProgress]):
+    if progress is not None:
+        progress.finish()
+
+
+def worker_gauge(workers: int, limiter: Optional[AdaptiveConcurrency]):
+    """Current worker count for ScanProgress: the adaptive limit, else the fixed pool size."""
+    if limiter is not None:
+        return lambda: limiter.limit
+    return lambda: workers
+
+
+def record_phase(stats: Optional[ScanStats], name: str, started: float):
+    if stats is not None:
+        stats.add_phase(name, time.perf_counter() - started)
+
+
+def print_stats(stats: Optional[ScanStats], output_format: str):
+    if stats is None:
+        return
+    summary = stats.summary()
+    if output_format == "json":
+        print(json.dumps(summary, indent=2, ensure_ascii=False), file=sys.stderr)
+    else:
+        print(format_stats_table(summary), file=sys.stderr)
+
+
+def serve_webhooks(server: WebhookServer) -> int:
+    host, port = server.server_address[:2]
+    print(f"🪝 Webhook in ascolto su http://{host}:{port}/webhook, report su http://{host}:{port}/report")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.debouncer.close()
+    return EXIT_OK
+
+
+def episodes_per_language(lang_summary) -> Dict[str, int]:
+    """Episodes carrying each audio language; multi-language combos count once per language."""
+    totals = defaultdict(int)
+    for seasons in lang_summary.values():
+        for langs in seasons.values():
+            for combo, count in langs.items():
+                for lang in combo.split("/"):
+                    totals[lang] += count
+    return dict(totals)
+
+
+def export_instance_metrics(instance: SonarrInstance, args, metrics: ExporterMetrics):
+    """Scan one instance and publish its issue counts and request figures.
+
+    Any error marks the instance down and keeps its last successful figures
+    exported, so one broken scan never stops the exporter.
+    """
+    stats = ScanStats()
+    started = time.perf_counter()
+    try:
+        fetched, failures, _ = scan_instance(instance, args, stats, stats)
+        all_lang_data, failures = _merge_fetched_series(fetched, failures)
+        print_failures(failures)
+        wanted_list = parse_wanted_langs(args.wanted_langs) if args.wanted_langs else []
+        results = detect_issues(all_lang_data, wanted_list, ignore_unknown=args.ignore_unknown)
+    except (requests.RequestException, ValueError) as error:
+        print(f"❌ [{instance.name}] Errore nella connessione a Sonarr: {error}", file=sys.stderr)
+        metrics.record_scan(instance.name, time.perf_counter() - started, stats.summary())
+        return
+    except Exception as error:  # E.g. sqlite3.Error from the cache: report it and retry on the next scan.
+        print(f"❌ [{instance.name}] Analisi non riuscita: {type(error).__name__}: {error}", file=sys.stderr)
+        metrics.record_scan(instance.name, time.perf_counter() - started, stats.summary())
+        return
+    issues = defaultdict(int)
+    for item in results:
+        issues[item["type"]] += 1
+    metrics.record_scan(
+        instance.name,
+        time.perf_counter() - started,
+        stats.summary(),
+        issues=issues,
+        episodes=episodes_per_language(all_lang_data),
+        series=len(all_lang_data),
+        failures=len(failures),
+    )
+
+
+def run_exporter_scans(instances: List[SonarrInstance], args, metrics: ExporterMetrics, stop: threading.Event):
+    """Scan every instance every ``args.scan_interval`` seconds until ``stop`` is set.
+
+    The per-series cache keeps repeated scans down to the /series list plus
+    the series whose files changed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    while True:
+        with ThreadPoolExecutor(max_workers=len(instances)) as executor:
+            for future in [
+                executor.submit(export_instance_metrics, instance, args, metrics) for instance in instances
+            ]:
+                future.result()
+        print(f"📈 Metriche aggiornate, prossima analisi tra {args.scan_interval:g} s")
+        if stop.wait(args.scan_interval):
+            return
+
+
+def serve_metrics(server: MetricsServer, instances: List[SonarrInstance], args) -> int:
+    host, port = server.server_address[:2]
+    print(f"📈 Metriche Prometheus su http://{host}:{port}/metrics")
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    try:
+        run_exporter_scans(instances, args, server.metrics, threading.Event())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+    return EXIT_OK
+
+
+def start_exporter(instances: List[SonarrInstance], args) -> int:
+    from metrics_exporter import ExporterMetrics, MetricsServer
+
+    try:
+        server = MetricsServer(args.listen, ExporterMetrics())
+    except OSError as error:
+        print(f"❌ Impossibile avviare il server delle metriche: {error}", file=sys.stderr)
+        return EXIT_FATAL
+    return serve_metrics(server, instances, args)
+
+
+def stream_scan(
+    args,
+    series_list: List[dict],
+    selected_series: List[dict],
+    base_url: str,
+    timeout,
+    cache: Optional[ScanCache],
+    request_counter: RequestCounter,
+    stats: Optional[ScanStats] = None,
+) -> int:
+    """--stream: scan and write every series' issues as it completes, see stream_report."""
+    workers, limiter = worker_budget(args.workers)
+    wanted_list = parse_wanted_langs(args.wanted_langs) if args.wanted_langs else []
+    as_json = bool(args.output or args.json or args.structured_json)
+    progress = None
+    if args.output:  # On a terminal the status line would interleave with the streamed report.
+        progress = start_progress(args, request_counter, len(selected_series), worker_gauge(workers, limiter))
+    scanned = iter_scanned_series(
         selected_series,
-        lambda: build_session(args.apikey),
+        lambda: build_session(
+            args.apikey,
+            pool_size=workers,
+            request_counter=request_counter,
+            retries=args.retries,
+            backoff_factor=args.retry_backoff,
+            response_store=cache.responses if cache is not None else None,
+        ),
         base_url,
         timeout,
-        args.workers,
+        workers,
+        cache=cache,
+        progress=progress,
+        pooled=args.transport == "pooled",
+        fetch_mode=args.fetch_mode,
+        limiter=limiter,
+        stats=stats,
+        analysis_processes=args.analysis_processes,
     )
-    for failure in failures:
+    phase_started = time.perf_counter()
+    try:
+        with atomic_output(args.output) if args.output else nullcontext(sys.stdout) as output:
+            failures, analyzed = stream_report(
+                scanned, output, as_json, wanted_list, include_all=args.show_all, ignore_unknown=args.ignore_unknown
+            )
+            if args.structured_json:
+                summary = {
+                    "type": "riepilogo",
+                    "serie": analyzed,
+                    "non_riuscite": len(failures),
+                    "complete": not failures,
+                }
+                output.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        if cache is not None:
+            cache.retain(serie.get("id") for serie in series_list)
+            if not failures:
+                cache.mark_complete()
+    except OSError as error:
+        print(f"❌ Impossibile salvare l'output: {error}", file=sys.stderr)
+        return EXIT_FATAL
+    finally:
+        scanned.close()
+        finish_progress(progress)
+        if cache is not None:
+            close_scan_cache(cache)
+    record_phase(stats, "scan", phase_started)
+    if stats is not None:
+        stats.capacity = workers
+    if args.output:
+        print(f"💾 Risultati salvati in: {args.output}")
+    if cache is not None:
+        print(f"🗃️ Cache: {cache.hits} serie riutilizzate, {cache.misses} da analizzare")
+        print_unchanged_responses(cache)
+    print_concurrency(limiter, stats=stats)
+    print(f"📈 Richieste HTTP verso Sonarr: {request_counter.count}")
+    print_stats(stats, args.stats)
+    return scan_exit_code(failures, len(selected_series))
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.config and (not args.apikey or not args.url):
+        print("❌ Devi specificare sia l'API Key che l'URL base (via CLI o .env)")
+        return EXIT_FATAL
+    if not (args.no_cache or args.refresh) and (args.engine == "async" or args.analysis_processes):
+        option = "--engine async" if args.engine == "async" else "--analysis-processes"
         print(
-            f"⚠️ Errore durante l'elaborazione della serie "
-            f"'{failure['serie']}': {failure['errore']}",
+            f"⚠️ Con {option} la cache riusa solo le serie con statistiche invariate: "
+            "le richieste condizionali (ETag, Last-Modified) richiedono --engine threads",
             file=sys.stderr,
         )
+    for filename in (args.output, args.snapshot):
+        if filename:
+            try:
+                validate_output_path(filename)
+            except ValueError as error:
+                print(f"❌ Percorso di output non valido: {error}", file=sys.stderr)
+                return EXIT_FATAL
+    if args.diff_against:
+        try:
+            open_snapshot(args.diff_against).close()
+        except (OSError, SnapshotError) as error:
+            print(f"❌ Snapshot non leggibile: {args.diff_against}: {error}", file=sys.stderr)
+            return EXIT_FATAL
 
-    wanted_list = parse_wanted_langs(args.wanted_langs) if args.wanted_langs else []
-    if wanted_list:
-        results = detect_wanted_coverage(all_lang_data, wanted_list, include_all=args.show_all, ignore_unknown=args.ignore_unknown)
+    from instances import ConfigError, SonarrInstance, load_instances
+
+    # Prepare HTTP session and timeouts
+    stats = ScanStats() if args.stats else None
+    request_counter = stats if stats is not None else RequestCounter()
+    if args.config:
+        try:
+            instances = load_instances(
+                args.config,
+                {
+                    "workers": args.workers,
+                    "max_in_flight": args.max_in_flight,
+                    "timeout": args.timeout if args.timeout is not None else DEFAULT_READ_TIMEOUT,
+                    "retries": args.retries,
+                    "backoff_factor": args.retry_backoff,
+                    "cache_file": args.cache_file,
+                },
+                INSTANCE_SETTING_TYPES,
+                normalize_url,
+            )
+        except (OSError, ConfigError) as error:
+            print(f"❌ Configurazione delle istanze non valida: {error}", file=sys.stderr)
+            return EXIT_FATAL
+        if args.exporter:
+            return start_exporter(instances, args)
+        print(f"📦 Analisi di {len(instances)} istanze in corso...")
+        phase_started = time.perf_counter()
+        progress = start_progress(args, request_counter)
+        try:
+            all_lang_data, failures, selected_count, unreachable = scan_instances(
+                instances, args, request_counter, stats, progress
+            )
+        finally:
+            finish_progress(progress)
+        record_phase(stats, "scan", phase_started)
+        if unreachable == len(instances):
+            return EXIT_FATAL
+    elif args.exporter:
+        instance = SonarrInstance(
+            EXPORTER_INSTANCE_NAME,
+            normalize_url(args.url),
+            args.apikey,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            timeout=args.timeout if args.timeout is not None else DEFAULT_READ_TIMEOUT,
+            retries=args.retries,
+            backoff_factor=args.retry_backoff,
+            cache_file=args.cache_file,
+        )
+        return start_exporter([instance], args)
     else:
-        results = detect_mismatches(all_lang_data, include_all=args.show_all, ignore_unknown=args.ignore_unknown)
+        session = build_session(
+            args.apikey, request_counter=request_counter, retries=args.retries, backoff_factor=args.retry_backoff
+        )
+        timeout = (
+            DEFAULT_CONNECT_TIMEOUT,
+            args.timeout if args.timeout is not None else DEFAULT_READ_TIMEOUT,
+        )
+        base_url = normalize_url(args.url)
 
-    json_output = (
-        {"results": results, "failures": failures, "complete": not failures}
-        if args.structured_json
-        else results
-    )
+        cache = open_scan_cache(args, args.cache_file, base_url)
+
+        # Without an order to compute, /series is scanned while it downloads.
+        overlap_listing = args.order == "sonarr" and args.engine == "threads" and not (args.serve or args.stream)
+        print(f"📡 Recupero dati da Sonarr @ {base_url} ...")
+        phase_started = time.perf_counter()
+        try:
+            series_filter = resolve_series_filter(build_series_filter(args), session, base_url, timeout)
+            if args.incremental and cache is not None:
+                prepare_incremental_scan(cache, session, base_url, timeout, args.incremental_max_age)
+            series_list = None if overlap_listing else get_series(session, base_url, timeout)
+        except (requests.RequestException, ValueError) as e:
+            session.close()
+            print(f"❌ Errore nella connessione a Sonarr: {e}")
+            if cache is not None:
+                cache.close()
+            return EXIT_FATAL
+        if not overlap_listing:
+            session.close()
+        record_phase(stats, "series_list", phase_started)
+
+        print("📦 Analisi episodi in corso...")
+        if args.serve:
+            try:
+                server = create_webhook_server(
+                    args, base_url, timeout, series_list, cache, request_counter, series_filter
+                )
+            except OSError as error:
+                print(f"❌ Impossibile avviare il server webhook: {error}", file=sys.stderr)
+                return EXIT_FATAL
+            print(f"📈 Richieste HTTP verso Sonarr: {request_counter.count}")
+            return serve_webhooks(server)
+        if overlap_listing:
+            series_list = selected_series = None
+            selected_count = 0
+        else:
+            selected_series = order_series(select_series(series_list, series_filter), args.order)
+            selected_count = len(selected_series)
+        if args.stream:
+            return stream_scan(
+                args, series_list, selected_series, base_url, timeout, cache, request_counter, stats
+            )
+        workers, limiter = worker_budget(args.workers)
+        if args.engine == "async":
+            progress = start_progress(args, request_counter, selected_count, lambda: args.max_in_flight)
+        else:
+            progress = start_progress(args, request_counter, selected_count, worker_gauge(workers, limiter))
+        phase_started = time.perf_counter()
+        try:
+            if args.engine == "async":
+                all_lang_data, failures = fetch_all_series_language_data_async(
+                    selected_series,
+                    args.apikey,
+                    base_url,
+                    timeout,
+                    args.max_in_flight,
+                    cache=cache,
+                    fetch_mode=args.fetch_mode,
+                    request_counter=request_counter,
+                    retries=args.retries,
+                    backoff_factor=args.retry_backoff,
+                    progress=progress,
+                )
+            else:
+                if overlap_listing:
+                    selected_series = series_list = SeriesListing(session, base_url, timeout, series_filter, progress)
+                all_lang_data, failures = fetch_all_series_language_data(
+                    selected_series,
+                    lambda: build_session(
+                        args.apikey,
+                        pool_size=workers,
+                        request_counter=request_counter,
+                        retries=args.retries,
+                        backoff_factor=args.retry_backoff,
+                        response_store=cache.responses if cache is not None else None,
+                    ),
+                    base_url,
+                    timeout,
+                    workers,
+                    cache=cache,
+                    pooled=args.transport == "pooled",
+                    fetch_mode=args.fetch_mode,
+                    limiter=limiter,
+                    stats=stats,
+                    analysis_processes=args.analysis_processes,
+                    progress=progress,
+                )
+                if stats is not None:
+                    stats.capacity = workers
+                if overlap_listing:
+                    selected_count = series_list.selected
+            if cache is not None:
+                cache.retain(series_list.ids if overlap_listing else (serie.get("id") for serie in series_list))
+                if not failures:
+                    cache.mark_complete()
+        except SeriesListingError as error:
+            print(f"❌ Errore nella connessione a Sonarr: {error}")
+            return EXIT_FATAL
+        finally:
+            finish_progress(progress)
+            if overlap_listing:
+                session.close()
+            if cache is not None:
+                close_scan_cache(cache)
+        record_phase(stats, "scan", phase_started)
+        if overlap_listing:
+            series_list.print_selection()
+        if cache is not None:
+            print(f"🗃️ Cache: {cache.hits} serie riutilizzate, {cache.misses} da analizzare")
+            print_unchanged_responses(cache)
+        print_concurrency(limiter, stats=stats)
+    print(f"📈 Richieste HTTP verso Sonarr: {request_counter.count}")
+    print_failures(failures)
 
+    phase_started = time.perf_counter()
+    wanted_list = parse_wanted_langs(args.wanted_langs) if args.wanted_langs else []
+
+    def detect(lang_summary):
+        return detect_issues(lang_summary, wanted_list, include_all=args.show_all, ignore_unknown=args.ignore_unknown)
+
+    try:
+        diff = update_snapshots(args, all_lang_data, failures, detect)
+    except (OSError, SnapshotError) as error:
+        print(f"❌ Snapshot non aggiornato: {error}", file=sys.stderr)
+        return EXIT_FATAL
+    results = detect(all_lang_data) if diff is None else None
+    record_phase(stats, "detection", phase_started)
+
+    if diff is not None:
+        json_output = {**diff, "failures": failures, "complete": not failures} if args.structured_json else diff
+    elif args.structured_json:
+        json_output = {"results": results, "failures": failures, "complete": not failures}
+    else:
+        json_output = results
+
+    phase_started = time.perf_counter()
     if args.output:
         try:
             write_json_atomic(json_output, args.output)
@@ -563,69 +2998,13 @@ def main(argv=None) -> int:
         print(f"💾 Risultati salvati in: {args.output}")
     elif args.json or args.structured_json:
         print(json.dumps(json_output, indent=2, ensure_ascii=False))
+    elif diff is not None:
+        print_diff(diff)
     else:
-        print("\n📊 Risultati:")
-        if results:
-            last_serie = None
-            for item in results:
-                if last_serie and item['serie'] != last_serie:
-                    print()
-                last_serie = item['serie']
-
-                label = None
-                pad = 24
-                if item["type"] == "stagione_mista":
-                    # nota: abbiamo due spazi con "⚠️" per la stampa corretta nel terminale in uso, valutiamo se cambiare
-                    label = "⚠️  STAGIONE MISTA"
-                    pad = PADDING_WIDTH
-                elif item["type"] == "stagione_ok":
-                    label = "✅ STAGIONE OK"
-                    pad = PADDING_WIDTH - 2
-                elif item["type"] == "serie_mista":
-                    # nota: abbiamo due spazi con "⚠️" per la stampa corretta nel terminale in uso, valutiamo se cambiare
-                    label = "⚠️  SERIE MISTA"
-                    pad = PADDING_WIDTH
-                elif item["type"] == "serie_ok":
-                    label = "✅ SERIE OK"
-                    pad = PADDING_WIDTH - 2
-                if item["type"] in ("stagione_mista", "stagione_ok"):
-                    lang_display = {f"{get_flag(k)} {k}": v for k, v in item['lingue'].items()}
-                    print(f"  [{label}]".ljust(pad) + f" {item['serie']} - Stagione {item['stagione']}: {lang_display}")
-                elif item["type"] == "serie_mista":
-                    langs = ', '.join(f"{get_flag(k)} {k}" for k in item['lingue'])
-                    print(f"  [{label}]".ljust(pad) + f" {item['serie']}: Lingue usate: [{langs}]")
-                elif item["type"] == "serie_ok":
-                    langs = ', '.join(f"{get_flag(k)} {k}" for k in item['lingue'])
-                    print(f"  [{label}]".ljust(pad) + f" {item['serie']}: Lingua unica: [{langs}]")
-                elif item["type"] in ("stagione_non_supportata", "stagione_parzialmente_supportata", "stagione_supportata"):
-                    if item["type"] == "stagione_non_supportata":
-                        label = "🚫 NESSUNA LINGUA DESIDERATA"
-                        pad = PADDING_WIDTH - 1
-                    elif item["type"] == "stagione_parzialmente_supportata":
-                        label = "🟡 PARZIALMENTE SUPPORTATA"
-                        pad = PADDING_WIDTH
-                    elif item["type"] == "stagione_supportata":
-                        label = "✅ STAGIONE OK (desiderata)"
-                        pad = PADDING_WIDTH - 2
-                    wanted_disp = ', '.join(f"{get_flag(k)} {k}" for k in item['lingue_desiderate'])
-                    print(
-                        f"  [{label}]".ljust(pad)
-                        + f" {item['serie']} - Stagione {item['stagione']}: "
-                        + f"{item['supportati']}/{item['totale']} episodi con lingue desiderate [{wanted_disp}]"
-                    )
-        else:
-            print("    ✅ Nessuna discrepanza linguistica rilevata.")
-
-    if failures:
-        succeeded = len(selected_series) - len(failures)
-        print(
-            f"⚠️ Analisi incompleta: {succeeded}/{len(selected_series)} serie "
-            f"analizzate, {len(failures)} non riuscite. Exit code {EXIT_PARTIAL}.",
-            file=sys.stderr,
-        )
-        return EXIT_PARTIAL
-
-    return EXIT_OK
+        print_report(results)
+    record_phase(stats, "output", phase_started)
+    print_stats(stats, args.stats)
+    return scan_exit_code(failures, selected_count)
 
 
 if __name__ == "__main__":
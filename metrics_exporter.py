@@ -0,0 +1,194 @@
+"""Prometheus text-format exporter of scan results and scan performance (``--exporter``).
+
+Scans run on their own schedule and publish into ExporterMetrics, which
+renders the exposition text once per scan: scrapes are served from memory
+and never reach Sonarr.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC_PREFIX = "sonarr_lang_checker_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Always exported, at 0 when absent, so alert rules never see a missing series.
+ISSUE_TYPES = ("stagione_mista", "serie_mista", "stagione_non_supportata", "stagione_parzialmente_supportata")
+QUANTILES = (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _family(lines, name, kind, description, samples):
+    lines.append(f"# HELP {METRIC_PREFIX}{name} {description}")
+    lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{escape_label_value(item)}"' for key, item in labels.items())
+        lines.append(f"{METRIC_PREFIX}{name}{{{label_text}}} {_format_value(value)}")
+
+
+class ExporterMetrics:
+    """Latest scan of each Sonarr instance plus counters accumulated across scans.
+
+    Instances are labelled ``sonarr`` rather than ``instance``, which
+    Prometheus reserves for the scrape target.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scans = {}
+        self._scans_total = defaultdict(int)
+        self._requests_total = defaultdict(int)
+        self._retries_total = defaultdict(int)
+        self._bytes_total = defaultdict(int)
+        self._decoded_bytes_total = defaultdict(int)
+        self._failures_total = defaultdict(int)
+        self._body = self._render()
+
+    def record_scan(
+        self,
+        instance: str,
+        duration: float,
+        stats: dict,
+        issues=None,
+        episodes=None,
+        series: int = 0,
+        failures: int = 0,
+    ):
+        """Publish one finished scan; ``issues`` is None when Sonarr was unreachable.
+
+        ``stats`` is a ScanStats.summary() of that scan alone. Results of the
+        previous successful scan stay exported while an instance is down.
+        """
+        with self._lock:
+            previous = self._scans.get(instance, {})
+            scan = {
+                "up": issues is not None,
+                "duration": duration,
+                "finished_at": time.time(),
+                "latency": {
+                    endpoint: data["latency"] for endpoint, data in stats["endpoints"].items() if data["requests"]
+                },
+            }
+            if issues is None:
+                for key in ("issues", "episodes", "series", "failures"):
+                    if key in previous:
+                        scan[key] = previous[key]
+            else:
+                scan.update(
+                    issues={issue_type: issues.get(issue_type, 0) for issue_type in ISSUE_TYPES},
+                    episodes=dict(sorted(episodes.items())),
+                    series=series,
+                    failures=failures,
+                )
+                self._failures_total[instance] += failures
+            self._scans[instance] = scan
+            self._scans_total[instance] += 1
+            for status, count in stats["statuses"].items():
+                self._requests_total[instance, status] += count
+            self._retries_total[instance] += stats["retries"]
+            self._bytes_total[instance] += stats["bytes"]
+            self._decoded_bytes_total[instance] += stats["decoded_bytes"]
+            self._body = self._render()
+
+    def render(self) -> bytes:
+        with self._lock:
+            return self._body
+
+    def _render(self) -> bytes:
+        scans = sorted(self._scans.items())
+        lines = []
+        _family(lines, "up", "gauge", "Whether the last scan could list the series of the instance.", [
+            ({"sonarr": name}, scan["up"]) for name, scan in scans
+        ])
+        _family(lines, "issues", "gauge", "Language issues found by the last successful scan, by type.", [
+            ({"sonarr": name, "type": issue_type}, count)
+            for name, scan in scans
+            for issue_type, count in scan.get("issues", {}).items()
+        ])
+        _family(lines, "episodes", "gauge", "Episodes with each audio language in the last successful scan.", [
+            ({"sonarr": name, "language": language}, count)
+            for name, scan in scans
+            for language, count in scan.get("episodes", {}).items()
+        ])
+        _family(lines, "series", "gauge", "Series analyzed by the last successful scan.", [
+            ({"sonarr": name}, scan["series"]) for name, scan in scans if "series" in scan
+        ])
+        _family(lines, "series_failures", "gauge", "Series the last successful scan could not analyze.", [
+            ({"sonarr": name}, scan["failures"]) for name, scan in scans if "failures" in scan
+        ])
+        _family(lines, "scan_duration_seconds", "gauge", "Wall time of the last scan.", [
+            ({"sonarr": name}, scan["duration"]) for name, scan in scans
+        ])
+        _family(lines, "last_scan_timestamp_seconds", "gauge", "Unix time at which the last scan finished.", [
+            ({"sonarr": name}, scan["finished_at"]) for name, scan in scans
+        ])
+        _family(lines, "request_latency_seconds", "gauge", "Time to response headers in the last scan, by endpoint.", [
+            ({"sonarr": name, "endpoint": endpoint, "quantile": quantile}, latency[key])
+            for name, scan in scans
+            for endpoint, latency in sorted(scan["latency"].items())
+            for quantile, key in QUANTILES
+        ])
+        _family(lines, "scans_total", "counter", "Scans run since the exporter started.", [
+            ({"sonarr": name}, count) for name, count in sorted(self._scans_total.items())
+        ])
+        _family(lines, "http_requests_total", "counter", "HTTP responses received from Sonarr, by status.", [
+            ({"sonarr": name, "status": status}, count)
+            for (name, status), count in sorted(self._requests_total.items())
+        ])
+        _family(lines, "http_retries_total", "counter", "HTTP requests retried by the retry policy.", [
+            ({"sonarr": name}, count) for name, count in sorted(self._retries_total.items())
+        ])
+        _family(lines, "http_received_bytes_total", "counter", "Response bytes received from Sonarr.", [
+            ({"sonarr": name}, count) for name, count in sorted(self._bytes_total.items())
+        ])
+        _family(lines, "http_decoded_bytes_total", "counter", "Response bytes after decompression.", [
+            ({"sonarr": name}, count) for name, count in sorted(self._decoded_bytes_total.items())
+        ])
+        _family(lines, "series_failures_total", "counter", "Series that could not be analyzed, summed over scans.", [
+            ({"sonarr": name}, count) for name, count in sorted(self._failures_total.items())
+        ])
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "sonarr-lang-checker"
+
+    def log_message(self, format, *args):
+        return None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send(200, self.server.metrics.render(), CONTENT_TYPE)
+        elif path == "/health":
+            self._send(200, b'{"status": "ok"}', "application/json; charset=utf-8")
+        else:
+            self._send(404, b'{"errore": "not found"}', "application/json; charset=utf-8")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """GET /metrics serves the text rendered after the latest scan."""
+
+    daemon_threads = True
+
+    def __init__(self, address, metrics: ExporterMetrics):
+        super().__init__(address, _MetricsHandler)
+        self.metrics = metrics
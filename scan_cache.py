@@ -0,0 +1,265 @@
+"""Persistent per-series cache of season/language summaries."""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from language_codes import SeriesLanguages
+
+CACHE_SCHEMA_VERSION = 3
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+FINGERPRINT_STATISTICS = ("episodeFileCount", "episodeCount", "totalEpisodeCount", "sizeOnDisk")
+
+
+def series_fingerprint(serie: dict):
+    """Summarize the /series fields that change whenever the episode files change.
+
+    Returns None when Sonarr did not send statistics, so such series are never
+    served from the cache.
+    """
+    statistics = serie.get("statistics")
+    if not isinstance(statistics, dict):
+        return None
+    values = [statistics.get(field) for field in FINGERPRINT_STATISTICS]
+    if all(value is None for value in values):
+        return None
+    return json.dumps(values, separators=(",", ":"), default=str)
+
+
+def utc_timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def encode_seasons(seasons) -> str:
+    return json.dumps(
+        {str(season): dict(langs) for season, langs in seasons.items()},
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+
+
+def decode_seasons(payload: str) -> SeriesLanguages:
+    decoded = json.loads(payload)
+    if not isinstance(decoded, dict):
+        raise ValueError("cached summary must be an object")
+    seasons = {}
+    for season, langs in decoded.items():
+        if not isinstance(langs, dict) or not all(
+            isinstance(count, int) and count >= 0 for count in langs.values()
+        ):
+            raise ValueError("cached season must map languages to counts")
+        seasons[int(season)] = langs
+    return SeriesLanguages.from_mapping(seasons)
+
+
+class ResponseStore:
+    """Validators of the per-series responses of earlier scans, with the seasons derived from them.
+
+    Entries are keyed by series id and hold, for every URL the series
+    needed, ``[etag, last_modified, digest]`` as sent by Sonarr and hashed
+    locally, plus the seasons those bodies produced. Thread-safe, so it can
+    be shared by the sessions of every worker; ``changed_rows`` lists what
+    the current scan stored. With ``refresh`` earlier entries are ignored.
+    """
+
+    def __init__(self, rows=(), refresh: bool = False):
+        self._entries = {}
+        for series_id, fetch_mode, validators, summary in rows:
+            self._entries[series_id] = (fetch_mode, validators, summary)
+        self._changed = set()
+        self._lock = threading.Lock()
+        self.refresh = refresh
+        self.reused = 0
+
+    def lookup(self, series_id, fetch_mode: str):
+        """``(validators by URL, seasons)`` stored for the series in this fetch mode, or None."""
+        if self.refresh:
+            return None
+        with self._lock:
+            entry = self._entries.get(str(series_id))
+        if entry is None or entry[0] != fetch_mode:
+            return None
+        try:
+            validators = json.loads(entry[1])
+            seasons = decode_seasons(entry[2])
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(validators, dict) or not validators:
+            return None
+        return validators, seasons
+
+    def store(self, series_id, fetch_mode: str, validators: dict, seasons, reused: bool = False):
+        entry = (fetch_mode, json.dumps(validators, separators=(",", ":")), encode_seasons(seasons))
+        with self._lock:
+            self._entries[str(series_id)] = entry
+            self._changed.add(str(series_id))
+            self.reused += reused
+
+    def changed_rows(self):
+        with self._lock:
+            return [(series_id, *self._entries[series_id]) for series_id in sorted(self._changed)]
+
+
+class ScanCache:
+    """SQLite store of analyze_language_distribution results, one row per series.
+
+    Rows are keyed by Sonarr base URL and series id and are only reused while
+    the series fingerprint returned by /series is unchanged.
+    ``responses`` keeps the validators of the series that had to be fetched
+    again (see ResponseStore) and is saved on ``close``.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, base_url: str, refresh: bool = False):
+        self.connection = connection
+        self.base_url = base_url
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.scan_started = utc_timestamp(datetime.now(timezone.utc))
+        self.changed_ids = set()
+        self.responses = ResponseStore(
+            connection.execute(
+                "SELECT series_id, fetch_mode, validators, summary FROM responses WHERE base_url = ?",
+                (base_url,),
+            ),
+            refresh=refresh,
+        )
+
+    @classmethod
+    def open(cls, path, base_url: str, refresh: bool = False) -> "ScanCache":
+        connection = sqlite3.connect(Path(path))
+        try:
+            cls._prepare_schema(connection)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return cls(connection, base_url, refresh=refresh)
+
+    @staticmethod
+    def _prepare_schema(connection: sqlite3.Connection):
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            if row is None or row[0] != str(CACHE_SCHEMA_VERSION):
+                connection.execute("DROP TABLE IF EXISTS series")
+                connection.execute("DROP TABLE IF EXISTS responses")
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (str(CACHE_SCHEMA_VERSION),),
+                )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS series ("
+                " base_url TEXT NOT NULL,"
+                " series_id TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " summary TEXT NOT NULL,"
+                " PRIMARY KEY (base_url, series_id))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " base_url TEXT NOT NULL,"
+                " series_id TEXT NOT NULL,"
+                " fetch_mode TEXT NOT NULL,"
+                " validators TEXT NOT NULL,"
+                " summary TEXT NOT NULL,"
+                " PRIMARY KEY (base_url, series_id))"
+            )
+
+    def lookup(self, serie: dict):
+        """Return the cached seasons for an unchanged series, or None on a miss."""
+        fingerprint = series_fingerprint(serie)
+        series_id = serie.get("id")
+        row = None
+        if (
+            not self.refresh
+            and fingerprint is not None
+            and series_id is not None
+            and str(series_id) not in self.changed_ids
+        ):
+            row = self.connection.execute(
+                "SELECT fingerprint, summary FROM series WHERE base_url = ? AND series_id = ?",
+                (self.base_url, str(series_id)),
+            ).fetchone()
+        if row is not None and row[0] == fingerprint:
+            try:
+                seasons = decode_seasons(row[1])
+            except (TypeError, ValueError):
+                seasons = None
+            if seasons is not None:
+                self.hits += 1
+                return seasons
+        self.misses += 1
+        return None
+
+    def store(self, serie: dict, seasons):
+        fingerprint = series_fingerprint(serie)
+        series_id = serie.get("id")
+        if fingerprint is None or series_id is None:
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO series (base_url, series_id, fingerprint, summary) VALUES (?, ?, ?, ?)",
+            (self.base_url, str(series_id), fingerprint, encode_seasons(seasons)),
+        )
+
+    def last_complete_scan(self):
+        """Start time of the last scan of this instance that had no failures."""
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (f"last_scan:{self.base_url}",)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return datetime.strptime(row[0], TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+        except (TypeError, ValueError):
+            return None
+
+    def mark_complete(self):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (f"last_scan:{self.base_url}", self.scan_started),
+        )
+
+    def start_incremental(self, changed_ids):
+        """Refetch the series Sonarr history reported as changed, even if their statistics match."""
+        self.changed_ids = {str(series_id) for series_id in changed_ids}
+
+    def retain(self, series_ids):
+        """Drop rows for series that no longer exist in this Sonarr instance."""
+        keep = {str(series_id) for series_id in series_ids}
+        stale = [
+            (self.base_url, series_id)
+            for (series_id,) in self.connection.execute(
+                "SELECT series_id FROM series WHERE base_url = ?", (self.base_url,)
+            )
+            if series_id not in keep
+        ]
+        self.connection.executemany(
+            "DELETE FROM series WHERE base_url = ? AND series_id = ?", stale
+        )
+        stale_responses = [
+            (self.base_url, series_id)
+            for (series_id,) in self.connection.execute(
+                "SELECT series_id FROM responses WHERE base_url = ?", (self.base_url,)
+            )
+            if series_id not in keep
+        ]
+        self.connection.executemany(
+            "DELETE FROM responses WHERE base_url = ? AND series_id = ?", stale_responses
+        )
+
+    def close(self):
+        try:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO responses (base_url, series_id, fetch_mode, validators, summary)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(self.base_url, *row) for row in self.responses.changed_rows()],
+            )
+            self.connection.commit()
+        finally:
+            self.connection.close()
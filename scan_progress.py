@@ -0,0 +1,137 @@
+"""Live progress of a scan on stderr: series done, request rate, concurrency, failures, ETA.
+
+On a terminal one status line is redrawn in place; otherwise (cron, log
+collectors) a ``key=value`` line is written every few seconds.
+"""
+
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+TTY_INTERVAL = 0.2
+LOG_INTERVAL = 10.0
+
+
+def format_duration(seconds: float) -> str:
+    """``1h02m``, ``4m12s`` or ``12s``."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ScanProgress:
+    """Thread-safe progress of the series of one scan, rendered at most once per interval.
+
+    ``requests`` is a RequestCounter (or anything with ``count``) and
+    ``concurrency`` returns the current number of workers. Series served
+    from the cache are counted with ``add_cached`` and left out of the rate
+    the ETA is computed from.
+    """
+
+    def __init__(
+        self,
+        total: int = 0,
+        requests=None,
+        concurrency: Optional[Callable[[], int]] = None,
+        stream=None,
+        interactive: Optional[bool] = None,
+        interval: Optional[float] = None,
+        clock=time.monotonic,
+    ):
+        self.stream = stream if stream is not None else sys.stderr
+        if interactive is None:
+            isatty = getattr(self.stream, "isatty", None)
+            interactive = bool(isatty and isatty())
+        self.interactive = interactive
+        self.interval = interval if interval is not None else (TTY_INTERVAL if interactive else LOG_INTERVAL)
+        self.total = total
+        self.done = 0
+        self.cached = 0
+        self.failures = 0
+        self._requests = requests
+        self._concurrency = concurrency
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started = clock()
+        self._first_request_count = requests.count if requests is not None else 0
+        self._last_render = self._started
+        self._line_width = 0
+
+    def add_total(self, count: int):
+        with self._lock:
+            self.total += count
+
+    def add_cached(self, count: int):
+        with self._lock:
+            self.done += count
+            self.cached += count
+
+    def advance(self, failed: bool = False):
+        with self._lock:
+            self.done += 1
+            self.failures += failed
+            now = self._clock()
+            if now - self._last_render >= self.interval:
+                self._last_render = now
+                self._render(now)
+
+    def finish(self):
+        """Draw the final state on a terminal and end its line."""
+        with self._lock:
+            if self.interactive and self.total:
+                self._render(self._clock())
+                self.stream.write("\n")
+                self.stream.flush()
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        now = self._clock() if now is None else now
+        elapsed = max(now - self._started, 1e-9)
+        fetched = self.done - self.cached
+        remaining = max(self.total - self.done, 0)
+        requests = (self._requests.count - self._first_request_count) if self._requests is not None else None
+        return {
+            "done": self.done,
+            "total": self.total,
+            "failures": self.failures,
+            "requests_per_second": requests / elapsed if requests is not None else None,
+            "concurrency": self._concurrency() if self._concurrency is not None else None,
+            "eta": remaining * elapsed / fetched if fetched else None,
+        }
+
+    def _render(self, now: float):
+        state = self.snapshot(now)
+        if self.interactive:
+            line = self._status_line(state)
+            padding = " " * max(self._line_width - len(line), 0)
+            self._line_width = len(line)
+            self.stream.write(f"\r{line}{padding}")
+        else:
+            self.stream.write(self._log_line(state) + "\n")
+        self.stream.flush()
+
+    @staticmethod
+    def _status_line(state: dict) -> str:
+        percent = state["done"] / state["total"] if state["total"] else 0
+        parts = [f"⏳ {state['done']}/{state['total']} serie ({percent:.0%})"]
+        if state["requests_per_second"] is not None:
+            parts.append(f"{state['requests_per_second']:.1f} richieste/s")
+        if state["concurrency"] is not None:
+            parts.append(f"{state['concurrency']} worker")
+        parts.append(f"{state['failures']} errori")
+        parts.append(f"ETA {format_duration(state['eta'])}" if state["eta"] is not None else "ETA ?")
+        return " · ".join(parts)
+
+    @staticmethod
+    def _log_line(state: dict) -> str:
+        fields = [f"serie={state['done']}", f"totale={state['total']}", f"errori={state['failures']}"]
+        if state["requests_per_second"] is not None:
+            fields.append(f"richieste_al_secondo={state['requests_per_second']:.1f}")
+        if state["concurrency"] is not None:
+            fields.append(f"concorrenza={state['concurrency']}")
+        if state["eta"] is not None:
+            fields.append(f"eta_secondi={state['eta']:.0f}")
+        return "avanzamento " + " ".join(fields)
@@ -0,0 +1,259 @@
+"""Compact binary snapshots of the season language counts of a scan, and their diff.
+
+A snapshot keeps the per-series ``{season: {combo: count}}`` summaries, not
+the rendered report, so it can be compared under any detection option.
+Layout (little-endian), version 1:
+
+- header: magic, version, flags (bit 0: scan complete), series count,
+  combo count, digest of the whole index;
+- combo table: ``u16`` length + UTF-8 text of every language combo;
+- index, sorted by title: series digest, first row, row count, ``u16``
+  length + UTF-8 title;
+- rows: ``i32`` triples ``(season, combo index, count)``.
+
+Files are memory-mapped: opening one reads the header, combos and index,
+and only the rows of series whose digest changed are decoded.
+"""
+
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SNAPSHOT_MAGIC = b"SLCSNAP\0"
+SNAPSHOT_VERSION = 1
+FLAG_COMPLETE = 1
+DIGEST_SIZE = 16
+HEADER = struct.Struct(f"<8sHHII{DIGEST_SIZE}s")
+COMBO = struct.Struct("<H")
+INDEX_ENTRY = struct.Struct(f"<{DIGEST_SIZE}sIIH")
+ROW_SIZE = 12
+
+
+class SnapshotError(ValueError):
+    """A snapshot file is not one this version can read."""
+
+
+def series_digest(seasons) -> bytes:
+    """Digest of one series' season counts, independent of combo ids and ordering."""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for season in sorted(seasons):
+        for combo, count in sorted(seasons[season].items()):
+            digest.update(f"{season}\t{combo}\t{count}\n".encode())
+    return digest.digest()
+
+
+def _index_digest(entries: Iterable[Tuple[str, bytes]]) -> bytes:
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for title, series in entries:
+        digest.update(title.encode())
+        digest.update(b"\0")
+        digest.update(series)
+    return digest.digest()
+
+
+class SnapshotIndex:
+    """Series titles, sorted, with their digests: one side of a diff.
+
+    ScanIndex and Snapshot add ``seasons(title)``, the ``{season: {combo: count}}``
+    mapping of a title.
+    """
+
+    def __init__(self, titles: List[str], digests: List[bytes], complete: bool = True):
+        self.titles = titles
+        self.digests = digests
+        self.complete = complete
+
+    @property
+    def digest(self) -> bytes:
+        return _index_digest(zip(self.titles, self.digests))
+
+    def position(self, title: str) -> Optional[int]:
+        index = bisect_left(self.titles, title)
+        return index if index < len(self.titles) and self.titles[index] == title else None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ScanIndex(SnapshotIndex):
+    """SnapshotIndex over the results of this run, ``{title: seasons}``."""
+
+    def __init__(self, lang_data: Dict[str, object], complete: bool = True):
+        titles = sorted(lang_data)
+        super().__init__(titles, [series_digest(lang_data[title]) for title in titles], complete)
+        self.lang_data = lang_data
+
+    def seasons(self, title: str):
+        return self.lang_data[title]
+
+    def encode(self) -> bytes:
+        """The version 1 snapshot of these results."""
+        combo_ids: Dict[str, int] = {}
+        rows = array("i")
+        index = []
+        for title, digest in zip(self.titles, self.digests):
+            first = len(rows) // 3
+            seasons = self.lang_data[title]
+            for season in sorted(seasons):
+                for combo, count in sorted(seasons[season].items()):
+                    rows.extend((season, combo_ids.setdefault(combo, len(combo_ids)), count))
+            encoded_title = title.encode()
+            index.append(INDEX_ENTRY.pack(digest, first, len(rows) // 3 - first, len(encoded_title)) + encoded_title)
+        if sys.byteorder == "big":
+            rows.byteswap()
+        header = HEADER.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            FLAG_COMPLETE if self.complete else 0,
+            len(self.titles),
+            len(combo_ids),
+            self.digest,
+        )
+        combos = b"".join(COMBO.pack(len(encoded)) + encoded for encoded in (combo.encode() for combo in combo_ids))
+        return b"".join((header, combos, *index, rows.tobytes()))
+
+
+class Snapshot(SnapshotIndex):
+    """A snapshot file, memory-mapped; close it (or use ``with``) when done."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file cannot be mapped.
+            self._file.close()
+            raise SnapshotError("file vuoto") from None
+        try:
+            self._read_index()
+        except (struct.error, UnicodeDecodeError) as error:
+            self.close()
+            raise SnapshotError(f"file troncato o danneggiato ({error})") from None
+        except SnapshotError:
+            self.close()
+            raise
+
+    def _read_index(self):
+        data = self._map
+        magic, version, flags, series_count, combo_count, digest = HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("non è uno snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"versione {version} non supportata (attesa {SNAPSHOT_VERSION})")
+        offset = HEADER.size
+        self.combos = []
+        for _ in range(combo_count):
+            (length,) = COMBO.unpack_from(data, offset)
+            offset += COMBO.size
+            self.combos.append(data[offset:offset + length].decode())
+            offset += length
+        titles, digests, self._rows = [], [], []
+        for _ in range(series_count):
+            series, first, count, length = INDEX_ENTRY.unpack_from(data, offset)
+            offset += INDEX_ENTRY.size
+            titles.append(data[offset:offset + length].decode())
+            offset += length
+            digests.append(series)
+            self._rows.append((first, count))
+        self._rows_offset = offset
+        super().__init__(titles, digests, complete=bool(flags & FLAG_COMPLETE))
+        self._stored_digest = digest
+
+    @property
+    def digest(self) -> bytes:
+        return self._stored_digest
+
+    def seasons(self, title: str):
+        first, count = self._rows[self.position(title)]
+        start = self._rows_offset + first * ROW_SIZE
+        rows = array("i", self._map[start:start + count * ROW_SIZE])
+        if len(rows) != count * 3:
+            raise SnapshotError("file troncato o danneggiato")
+        if sys.byteorder == "big":
+            rows.byteswap()
+        seasons: Dict[int, Dict[str, int]] = {}
+        try:
+            for index in range(0, len(rows), 3):
+                seasons.setdefault(rows[index], {})[self.combos[rows[index + 1]]] = rows[index + 2]
+        except IndexError:
+            raise SnapshotError("file troncato o danneggiato") from None
+        return seasons
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+EMPTY_SNAPSHOT = ScanIndex({})
+
+
+def changed_titles(previous: SnapshotIndex, current: SnapshotIndex) -> Tuple[List[str], List[str]]:
+    """Titles whose counts differ, ``(in previous, in current)``, by a merge of the sorted indexes.
+
+    Identical snapshots are settled by their root digests; otherwise every
+    title is visited once, so the walk is O(N) in the library size even when
+    few series changed. Only the changed titles are decoded afterwards.
+    """
+    if previous.digest == current.digest:
+        return [], []
+    before, after = [], []
+    old, new = previous.titles, current.titles
+    i = j = 0
+    while i < len(old) or j < len(new):
+        if j == len(new) or (i < len(old) and old[i] < new[j]):
+            before.append(old[i])
+            i += 1
+        elif i == len(old) or new[j] < old[i]:
+            after.append(new[j])
+            j += 1
+        else:
+            if previous.digests[i] != current.digests[j]:
+                before.append(old[i])
+                after.append(new[j])
+            i += 1
+            j += 1
+    return before, after
+
+
+def issue_key(issue: dict) -> Tuple[str, object]:
+    """Identity of an issue across runs: its series and season (None for the whole series)."""
+    return issue["serie"], issue.get("stagione")
+
+
+def diff_snapshots(
+    previous: SnapshotIndex,
+    current: SnapshotIndex,
+    detect: Callable[[dict], List[dict]],
+    skip: Callable[[str], bool] = lambda title: False,
+) -> dict:
+    """``{"new", "resolved", "changed"}`` issues between two snapshots.
+
+    ``detect`` turns ``{title: seasons}`` into issues, as detect_issues
+    does; only the series whose digest differs are decoded and checked.
+    Titles for which ``skip`` is true (e.g. series that failed in this run)
+    are left out.
+    """
+    before, after = changed_titles(previous, current)
+    old_issues = {
+        issue_key(issue): issue
+        for issue in detect({title: previous.seasons(title) for title in before if not skip(title)})
+    }
+    new_issues = detect({title: current.seasons(title) for title in after if not skip(title)})
+    diff = {"new": [], "resolved": [], "changed": []}
+    for issue in new_issues:
+        old = old_issues.pop(issue_key(issue), None)
+        if old is None:
+            diff["new"].append(issue)
+        elif old != issue:
+            diff["changed"].append({"before": old, "after": issue})
+    diff["resolved"] = list(old_issues.values())
+    return diff
@@ -0,0 +1,225 @@
+"""Timing and throughput figures of one scan, for ``--stats``.
+
+Collected from requests response hooks (or the equivalent callback of the
+async client), per-series timings and named phases, then rendered as a
+table or as JSON.
+"""
+
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+PERCENTILES = (50, 95, 99)
+SLOWEST_SERIES_SHOWN = 5
+PHASE_LABELS = {
+    "series_list": "Elenco serie",
+    "scan": "Analisi episodi",
+    "detection": "Rilevamento",
+    "output": "Output",
+}
+
+
+def percentile(sorted_values, percent: float):
+    """Nearest-rank percentile of an already sorted list, None when empty."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def endpoint_name(url: str) -> str:
+    """``/episode`` for ``http://host/api/v3/episode?seriesId=1``."""
+    path = urlsplit(url).path
+    marker = "/api/v3/"
+    return "/" + path.split(marker, 1)[1] if marker in path else path or "/"
+
+
+class ScanStats:
+    """Thread-safe scan instrumentation, usable wherever a RequestCounter is.
+
+    ``count`` matches RequestCounter. Latencies are times to the response
+    headers; ``record_body`` adds the time and size of the whole transfer
+    once a body has been read. Sizes are counted twice: as transferred
+    (compressed when Sonarr compressed the response) and as decoded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.retries = 0
+        self.statuses = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.transfers = defaultdict(list)
+        self.bytes_received = defaultdict(int)
+        self.bytes_decoded = defaultdict(int)
+        self.phases = {}
+        self.series = []
+        self.analysis_seconds = 0.0
+        # Worker threads sharing the scan phase, when known.
+        self.capacity = None
+        self.concurrency = []
+
+    def __call__(
+        self,
+        response=None,
+        *args,
+        url=None,
+        status=None,
+        elapsed=None,
+        retries=0,
+        size=None,
+        decoded_size=None,
+        **kwargs,
+    ):
+        """requests response hook, or async client callback with keyword details."""
+        if response is not None:
+            url = response.url
+            status = response.status_code
+            elapsed = response.elapsed.total_seconds()
+            history = getattr(getattr(getattr(response, "raw", None), "retries", None), "history", ())
+            retries = len(history)
+        endpoint = endpoint_name(url or "")
+        with self._lock:
+            self.count += 1
+            self.retries += retries
+            if status is not None:
+                self.statuses[status] += 1
+            if elapsed is not None:
+                self.latencies[endpoint].append(elapsed)
+            if size is not None:
+                self.bytes_received[endpoint] += size
+                self.bytes_decoded[endpoint] += decoded_size if decoded_size is not None else size
+        return response
+
+    def record_body(self, response, seconds: float, decoded_size=None):
+        """Add the bytes read off the wire for a consumed body, its decoded size and its total time."""
+        raw = getattr(response, "raw", None)
+        size = raw.tell() if raw is not None and hasattr(raw, "tell") else len(response.content)
+        endpoint = endpoint_name(response.url)
+        with self._lock:
+            self.bytes_received[endpoint] += size
+            self.bytes_decoded[endpoint] += decoded_size if decoded_size is not None else size
+            self.transfers[endpoint].append(seconds)
+
+    def record_series(self, title: str, seconds: float, analysis_seconds: float = 0.0):
+        with self._lock:
+            self.series.append((seconds, title))
+            self.analysis_seconds += analysis_seconds
+
+    def record_concurrency(self, summary: dict, instance=None):
+        """Keep an AdaptiveConcurrency.summary() of the scan (of ``instance`` with --config)."""
+        with self._lock:
+            self.concurrency.append({"instance": instance, **summary})
+
+    def add_phase(self, name: str, seconds: float):
+        """Add wall time to a named phase; ``scan`` is the one workers share."""
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def summary(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint in sorted(set(self.latencies) | set(self.bytes_received)):
+                latencies = sorted(self.latencies.get(endpoint, ()))
+                transfers = sorted(self.transfers.get(endpoint, ()))
+                endpoints[endpoint] = {
+                    "requests": len(latencies),
+                    "bytes": self.bytes_received.get(endpoint, 0),
+                    "decoded_bytes": self.bytes_decoded.get(endpoint, 0),
+                    "latency": {f"p{p}": percentile(latencies, p) for p in PERCENTILES},
+                    "latency_max": latencies[-1] if latencies else None,
+                    "transfer": {f"p{p}": percentile(transfers, p) for p in PERCENTILES},
+                }
+            series_times = sorted(self.series, reverse=True)
+            busy = sum(seconds for seconds, _ in series_times)
+            scan_seconds = self.phases.get("scan")
+            utilization = None
+            if self.capacity and scan_seconds:
+                utilization = busy / (self.capacity * scan_seconds)
+            wall = sorted(seconds for seconds, _ in series_times)
+            return {
+                "requests": self.count,
+                "retries": self.retries,
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+                "bytes": sum(self.bytes_received.values()),
+                "decoded_bytes": sum(self.bytes_decoded.values()),
+                "endpoints": endpoints,
+                "phases": dict(self.phases),
+                "series": {
+                    "count": len(series_times),
+                    "wall": {f"p{p}": percentile(wall, p) for p in PERCENTILES},
+                    "analysis_seconds": self.analysis_seconds,
+                    "slowest": [
+                        {"serie": title, "seconds": seconds}
+                        for seconds, title in series_times[:SLOWEST_SERIES_SHOWN]
+                    ],
+                },
+                "workers": self.capacity,
+                "utilization": utilization,
+                "concurrency": list(self.concurrency),
+            }
+
+
+def _ms(seconds) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def _size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 ** 2:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / 1024 ** 2:.1f} MiB"
+
+
+def _ratio(summary: dict) -> str:
+    """Decoded size over transferred size, ``-`` when nothing was transferred."""
+    if not summary["bytes"]:
+        return "-"
+    return f"{summary['decoded_bytes'] / summary['bytes']:.1f}x"
+
+
+def format_stats_table(summary: dict) -> str:
+    """Human-readable rendering of ScanStats.summary()."""
+    lines = ["📊 Statistiche dell'analisi"]
+    for name, seconds in summary["phases"].items():
+        lines.append(f"  {PHASE_LABELS.get(name, name):<20} {seconds:>8.2f} s")
+    lines.append("")
+    lines.append(
+        f"  {'endpoint':<20} {'richieste':>9} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+        f"{'max ms':>7} {'dati':>10} {'decodificati':>12} {'compr.':>6}"
+    )
+    for endpoint, data in summary["endpoints"].items():
+        latency = data["latency"]
+        lines.append(
+            f"  {endpoint:<20} {data['requests']:>9} {_ms(latency['p50']):>7} {_ms(latency['p95']):>7} "
+            f"{_ms(latency['p99']):>7} {_ms(data['latency_max']):>7} {_size(data['bytes']):>10} "
+            f"{_size(data['decoded_bytes']):>12} {_ratio(data):>6}"
+        )
+    lines.append("")
+    lines.append(
+        f"  Richieste: {summary['requests']}, retry: {summary['retries']}, "
+        f"dati ricevuti: {_size(summary['bytes'])} ({_size(summary['decoded_bytes'])} decodificati)"
+    )
+    series = summary["series"]
+    if series["count"]:
+        wall = series["wall"]
+        lines.append(
+            f"  Serie analizzate: {series['count']} (p50 {_ms(wall['p50'])} ms, p95 {_ms(wall['p95'])} ms, "
+            f"p99 {_ms(wall['p99'])} ms; analisi lingue {series['analysis_seconds']:.2f} s)"
+        )
+    if summary["utilization"] is not None:
+        lines.append(
+            f"  Utilizzo dei worker: {summary['utilization']:.0%} di {summary['workers']}"
+        )
+    for limits in summary["concurrency"]:
+        prefix = f"[{limits['instance']}] " if limits["instance"] else ""
+        lines.append(
+            f"  {prefix}Concorrenza adattiva: {limits['min']}–{limits['max']} worker, "
+            f"finale {limits['final']}, {limits['changes']} variazioni"
+        )
+    if series["slowest"]:
+        lines.append("  Serie più lente:")
+        for item in series["slowest"]:
+            lines.append(f"    {_ms(item['seconds']):>7} ms  {item['serie']}")
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+"""Pre-filters evaluated on the /series payload, before any per-series request.
+
+Conditions are ``FIELD=VALUE[,VALUE...]``: the values of one condition are
+alternatives, ``--include`` conditions must all match and a series matching
+any ``--exclude`` condition is skipped. Tags and profiles may be given by id
+or by name; names are resolved once per instance against Sonarr.
+"""
+
+import argparse
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Fields whose values may be names, with the Sonarr endpoint and attribute that resolve them.
+NAMED_FIELDS = {
+    "tag": ("tag", "label"),
+    "quality-profile": ("qualityprofile", "name"),
+    "language-profile": ("languageprofile", "name"),
+}
+FILTER_FIELDS = (*NAMED_FIELDS, "root-folder", "type", "monitored", "path", "min-files", "max-files")
+BOOLEAN_VALUES = {"true": True, "yes": True, "sì": True, "si": True, "false": False, "no": False}
+
+
+class FilterError(ValueError):
+    """A filter cannot be evaluated against this Sonarr."""
+
+
+class Condition:
+    """One ``FIELD=VALUES`` condition; named values wait for ``resolve``."""
+
+    def __init__(self, field: str, values: tuple, names: tuple = ()):
+        self.field = field
+        self.values = values
+        self.names = names
+
+    def __repr__(self) -> str:
+        return f"Condition({self.field!r}, {self.values!r}, names={self.names!r})"
+
+    def matches(self, serie: dict) -> bool:
+        field = self.field
+        if field == "tag":
+            tags = serie.get("tags")
+            return isinstance(tags, list) and not set(self.values).isdisjoint(tags)
+        if field == "quality-profile":
+            return serie.get("qualityProfileId") in self.values
+        if field == "language-profile":
+            return serie.get("languageProfileId") in self.values
+        if field == "root-folder":
+            root = serie.get("rootFolderPath")
+            return isinstance(root, str) and _strip_separator(root) in self.values
+        if field == "type":
+            return str(serie.get("seriesType", "")).casefold() in self.values
+        if field == "monitored":
+            return bool(serie.get("monitored")) in self.values
+        if field == "path":
+            path = serie.get("path")
+            return isinstance(path, str) and any(fnmatchcase(path, pattern) for pattern in self.values)
+        files = episode_file_count(serie)
+        if files is None:
+            return False
+        if field == "min-files":
+            return files >= self.values[0]
+        return files <= self.values[0]
+
+
+def _strip_separator(path: str) -> str:
+    return path.rstrip("/\\") or path
+
+
+def episode_file_count(serie: dict) -> Optional[int]:
+    """``statistics.episodeFileCount`` of a /series item, None when Sonarr left it out."""
+    statistics = serie.get("statistics")
+    if not isinstance(statistics, dict):
+        return None
+    count = statistics.get("episodeFileCount")
+    return count if isinstance(count, int) and not isinstance(count, bool) else None
+
+
+def series_condition(text: str) -> Condition:
+    """argparse type for ``FIELD=VALUE[,VALUE...]``."""
+    field, separator, raw_values = text.partition("=")
+    field = field.strip().casefold()
+    values = [value.strip() for value in raw_values.split(",") if value.strip()]
+    if not separator or field not in FILTER_FIELDS:
+        raise argparse.ArgumentTypeError(
+            f"atteso CAMPO=VALORE con CAMPO tra {', '.join(FILTER_FIELDS)}, ricevuto {text!r}"
+        )
+    if not values:
+        raise argparse.ArgumentTypeError(f"{field}: serve almeno un valore")
+    if field in NAMED_FIELDS:
+        ids = tuple(int(value) for value in values if value.isdigit())
+        names = tuple(value.casefold() for value in values if not value.isdigit())
+        return Condition(field, ids, names)
+    if field in ("min-files", "max-files"):
+        if len(values) != 1 or not values[0].isdigit():
+            raise argparse.ArgumentTypeError(f"{field}: atteso un numero intero non negativo")
+        return Condition(field, (int(values[0]),))
+    if field == "monitored":
+        try:
+            return Condition(field, tuple({BOOLEAN_VALUES[value.casefold()] for value in values}))
+        except KeyError:
+            raise argparse.ArgumentTypeError("monitored: atteso true o false") from None
+    if field == "root-folder":
+        return Condition(field, tuple(_strip_separator(value) for value in values))
+    if field == "type":
+        return Condition(field, tuple(value.casefold() for value in values))
+    return Condition(field, tuple(values))
+
+
+class SeriesFilter:
+    """Include/exclude conditions plus the skipping of series that cannot produce findings.
+
+    ``trivial_files`` is the largest episode file count whose result is
+    known without fetching (no findings at all), or None to fetch every
+    series that passes the conditions.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[Condition] = (),
+        exclude: Iterable[Condition] = (),
+        trivial_files: Optional[int] = None,
+    ):
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.trivial_files = trivial_files
+
+    def lookups(self) -> Dict[str, str]:
+        """Sonarr endpoints to query, by field, before names can be matched."""
+        return {
+            condition.field: NAMED_FIELDS[condition.field][0]
+            for condition in self.include + self.exclude
+            if condition.names
+        }
+
+    def resolved(self, items_by_field: Dict[str, List[dict]]) -> Tuple["SeriesFilter", List[str]]:
+        """Copy with names replaced by ids, plus the names Sonarr does not know.
+
+        ``items_by_field`` holds the payload of the endpoint named by
+        ``lookups`` for each field. Unknown names match no series.
+        """
+        unknown = []
+
+        def resolve(condition: Condition) -> Condition:
+            if not condition.names:
+                return condition
+            attribute = NAMED_FIELDS[condition.field][1]
+            ids_by_name: Dict[str, Set[int]] = {}
+            for item in items_by_field.get(condition.field, ()):
+                if isinstance(item, dict) and isinstance(item.get(attribute), str):
+                    ids_by_name.setdefault(item[attribute].casefold(), set()).add(item.get("id"))
+            ids = set(condition.values)
+            for name in condition.names:
+                if name in ids_by_name:
+                    ids |= ids_by_name[name]
+                else:
+                    unknown.append(f"{condition.field}={name}")
+            return Condition(condition.field, tuple(sorted(ids)))
+
+        series_filter = SeriesFilter(
+            [resolve(condition) for condition in self.include],
+            [resolve(condition) for condition in self.exclude],
+            self.trivial_files,
+        )
+        return series_filter, unknown
+
+    def excludes(self, serie: dict) -> bool:
+        if any(condition.names for condition in self.include + self.exclude):
+            raise FilterError("i nomi di tag e profili vanno risolti prima di filtrare")
+        return not all(condition.matches(serie) for condition in self.include) or any(
+            condition.matches(serie) for condition in self.exclude
+        )
+
+    def is_trivial(self, serie: dict) -> bool:
+        if self.trivial_files is None:
+            return False
+        files = episode_file_count(serie)
+        return files is not None and files <= self.trivial_files
+
+    def split(self, series_list: List[dict]) -> Tuple[List[dict], int, int]:
+        """``(series to fetch, excluded by the conditions, skipped as trivial)``."""
+        selected = []
+        excluded = trivial = 0
+        for serie in series_list:
+            if self.excludes(serie):
+                excluded += 1
+            elif self.is_trivial(serie):
+                trivial += 1
+            else:
+                selected.append(serie)
+        return selected, excluded, trivial
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_scan_cache(tmp_path, monkeypatch):
+    """Keep CLI tests from reading or writing the cache next to main.py."""
+    monkeypatch.setenv("SCAN_CACHE_FILE", str(tmp_path / "scan-cache.sqlite3"))
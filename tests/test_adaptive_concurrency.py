@@ -0,0 +1,158 @@
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from urllib3.util.retry import RequestHistory
+
+from adaptive_concurrency import AdaptiveConcurrency, format_timeline
+from benchmarks.fake_sonarr import FakeSonarr
+from main import (
+    AUTO_WORKERS,
+    MAX_WORKERS,
+    build_session,
+    fetch_all_series_language_data,
+    normalize_url,
+    parse_args,
+    worker_budget,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def limiter(initial=4, minimum=1, maximum=16):
+    return AdaptiveConcurrency(initial, minimum, maximum, clock=FakeClock())
+
+
+def test_limit_grows_by_one_per_window_of_healthy_responses():
+    adaptive = limiter(initial=2)
+
+    for _ in range(2):
+        adaptive.record(0.1)
+    assert adaptive.limit == 3
+    for _ in range(3):
+        adaptive.record(0.1)
+    assert adaptive.limit == 4
+
+
+def test_overload_halves_the_limit_once_per_window():
+    adaptive = limiter(initial=8)
+
+    adaptive.record(0.1, overloaded=True)
+    assert adaptive.limit == 4
+    # Requests that were already in flight report the same overload.
+    for _ in range(3):
+        adaptive.record(0.1, overloaded=True)
+    assert adaptive.limit == 4
+    adaptive.record(0.1, overloaded=True)
+    assert adaptive.limit == 2
+
+
+def test_latency_spike_shrinks_the_limit():
+    adaptive = limiter(initial=8)
+    for _ in range(4):
+        adaptive.record(0.1)
+
+    for _ in range(3):
+        adaptive.record(2.0)
+
+    assert adaptive.limit < 8
+
+
+def test_limit_stays_within_bounds():
+    adaptive = limiter(initial=2, minimum=2, maximum=3)
+
+    for _ in range(20):
+        adaptive.record(0.1)
+    assert adaptive.limit == 3
+    for _ in range(20):
+        adaptive.record(0.1, overloaded=True)
+    assert adaptive.limit == 2
+
+
+def test_timeline_records_each_change():
+    clock = FakeClock()
+    adaptive = AdaptiveConcurrency(1, 1, 4, clock=clock)
+    clock.now = 1.5
+    adaptive.record(0.1)
+    clock.now = 2.0
+    adaptive.record(0.1, overloaded=True)
+
+    assert adaptive.timeline == [(0.0, 1), (1.5, 2), (2.0, 1)]
+    assert adaptive.summary()["changes"] == 2
+    assert format_timeline(adaptive.timeline) == "0.0s→1, 1.5s→2, 2.0s→1"
+
+
+def test_format_timeline_elides_the_middle_of_long_timelines():
+    text = format_timeline([(float(second), second) for second in range(30)], shown=6)
+
+    assert text == "0.0s→0, 1.0s→1, 2.0s→2, …, 28.0s→28, 29.0s→29"
+
+
+def test_observe_counts_retried_overloads():
+    adaptive = limiter(initial=8)
+    history = (RequestHistory("GET", "/episode", None, 503, None),)
+    response = SimpleNamespace(
+        status_code=200,
+        elapsed=timedelta(milliseconds=50),
+        raw=SimpleNamespace(retries=SimpleNamespace(history=history)),
+    )
+
+    assert adaptive.observe(response) is response
+    assert adaptive.limit == 4
+
+
+def test_slot_blocks_above_the_current_limit():
+    adaptive = limiter(initial=1)
+    entered = threading.Event()
+
+    def worker():
+        with adaptive.slot():
+            entered.set()
+
+    with adaptive.slot():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not entered.wait(0.05)
+    assert entered.wait(1)
+    thread.join()
+
+
+def test_workers_auto_parses_and_builds_a_limiter():
+    assert parse_args(["--workers", "auto"]).workers == AUTO_WORKERS
+    workers, adaptive = worker_budget(AUTO_WORKERS)
+    assert workers == MAX_WORKERS and isinstance(adaptive, AdaptiveConcurrency)
+    assert worker_budget(3) == (3, None)
+
+
+def test_adaptive_scan_matches_fixed_workers():
+    with FakeSonarr(series_count=12, episodes_per_series=6) as fake:
+        base_url = normalize_url(fake.base_url)
+        workers, adaptive = worker_budget(AUTO_WORKERS)
+        expected = fetch_all_series_language_data(
+            fake.series, lambda: build_session("test", pool_size=4), base_url, (3.0, 5.0), 4, pooled=True
+        )
+        actual = fetch_all_series_language_data(
+            fake.series,
+            lambda: build_session("test", pool_size=workers),
+            base_url,
+            (3.0, 5.0),
+            workers,
+            pooled=True,
+            limiter=adaptive,
+        )
+
+    assert actual == expected
+    assert adaptive.summary()["max"] > 4
+
+
+@pytest.mark.parametrize("arguments", [(0, 1, 2), (1, 2, 4), (5, 1, 4)])
+def test_invalid_bounds_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(*arguments)
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import (
+    analysis_process_count,
+    analyze_series_payloads,
+    build_session,
+    fetch_all_series_language_data,
+    main,
+    parse_args,
+)
+from scan_stats import ScanStats
+
+
+def fetch(fake, fetch_mode, **kwargs):
+    return fetch_all_series_language_data(
+        fake.series,
+        lambda: build_session("key", pool_size=4),
+        fake.base_url,
+        (3.0, 20.0),
+        4,
+        pooled=True,
+        fetch_mode=fetch_mode,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "fetch_mode, embed", [("split", True), ("auto", True), ("auto", False), ("files", True)]
+)
+def test_process_pool_matches_thread_analysis(fetch_mode, embed):
+    with FakeSonarr(series_count=12, episodes_per_series=15, embed_episode_files=embed) as fake:
+        expected = fetch(fake, fetch_mode)
+        stats = ScanStats()
+        actual = fetch(fake, fetch_mode, analysis_processes=2, stats=stats)
+
+    assert actual == expected
+    assert stats.summary()["series"]["count"] == 12
+
+
+def test_process_pool_reports_invalid_payloads_as_failures():
+    with FakeSonarr(series_count=3, episodes_per_series=4) as fake:
+        fake.files[2] = {"not": "a list"}
+        data, failures = fetch(fake, "split", analysis_processes=1)
+
+    assert len(data) == 2
+    assert failures == [
+        {
+            "serie": "Series 00002",
+            "errore": "Sonarr /episodefile returned an invalid payload for series 2: expected a list",
+        }
+    ]
+
+
+def test_analyze_series_payloads_asks_for_missing_bodies():
+    serie = {"id": 1, "title": "Show"}
+    files = json.dumps([{"id": 10, "relativePath": "Show - S01E01.mkv", "mediaInfo": {"audioLanguages": "ita"}}])
+    episodes = json.dumps([{"seasonNumber": 1, "episodeFileId": 10}]).encode()
+
+    assert analyze_series_payloads(serie, "files", None, files.encode())[:3] == (None, "episode", None)
+    assert analyze_series_payloads(serie, "auto", episodes, None)[:3] == (None, "episodefile", False)
+    seasons, missing, _, _ = analyze_series_payloads(serie, "files", episodes, files.encode())
+    assert missing is None and dict(seasons[1]) == {"ita": 1}
+
+
+def test_analysis_processes_option():
+    assert analysis_process_count("0") == 0
+    assert analysis_process_count("auto") >= 1
+    assert parse_args(["--analysis-processes", "3"]).analysis_processes == 3
+    with pytest.raises(SystemExit):
+        parse_args(["--analysis-processes", "2", "--engine", "async"])
+
+
+def test_main_with_analysis_processes_writes_the_same_report(tmp_path):
+    outputs = []
+    with FakeSonarr(series_count=5, episodes_per_series=12) as fake:
+        for extra in ([], ["--analysis-processes", "2"]):
+            output = tmp_path / f"report{len(outputs)}.json"
+            argv = ["--apikey", "k", "--url", fake.base_url, "--no-cache", "--output", str(output), *extra]
+            assert main(argv) == 0
+            outputs.append(json.loads(output.read_text(encoding="utf-8")))
+
+    assert outputs[0] == outputs[1]
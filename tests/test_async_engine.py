@@ -0,0 +1,251 @@
+import asyncio
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from async_http import AsyncHTTPError, AsyncProtocolError, AsyncSonarrClient
+from benchmarks.fake_sonarr import FakeSonarr
+from main import (
+    RequestCounter,
+    build_session,
+    fetch_all_series_language_data,
+    fetch_all_series_language_data_async,
+    parse_args,
+    retry_policy,
+)
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        return None
+
+    def do_GET(self):
+        server = self.server
+        server.paths.append(self.path)
+        server.api_keys.append(self.headers.get("X-Api-Key"))
+        response = server.responses.pop(0)
+        if isinstance(response, bytes):  # Sent as is, e.g. a malformed response.
+            self.wfile.write(response)
+            self.close_connection = True
+            return
+        status, body, chunked, *extra_headers = response
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (extra_headers[0] if extra_headers else {}).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 3):
+                piece = body[start:start + 3]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            # With a pace, the body trickles in 3-byte writes, like a large body on a slow link.
+            try:
+                for start in range(0, len(body), 3 if server.pace else max(len(body), 1)):
+                    time.sleep(server.pace)
+                    self.wfile.write(body[start:start + 3] if server.pace else body)
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # The client gave up, e.g. on its read timeout.
+
+
+@pytest.fixture
+def scripted_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.daemon_threads = True
+    server.paths = []
+    server.api_keys = []
+    server.responses = []
+    server.pace = 0.0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def client_get(url, retries=3, read_timeout=5.0, **options):
+    async def run():
+        client = AsyncSonarrClient("secret", 4, (3.0, read_timeout), retry_policy(retries, 0.0), **options)
+        try:
+            return await client.get(url)
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def test_async_client_reads_chunked_bodies_and_sends_api_key(scripted_server):
+    scripted_server.responses.append((200, b'[{"id": 1}]', True))
+    host, port = scripted_server.server_address[:2]
+
+    assert client_get(f"http://{host}:{port}/api/v3/series") == b'[{"id": 1}]'
+    assert scripted_server.api_keys == ["secret"]
+
+
+def test_async_client_retries_transient_statuses(scripted_server):
+    scripted_server.responses.extend([(503, b"{}", False), (200, b"[]", False)])
+    host, port = scripted_server.server_address[:2]
+
+    assert client_get(f"http://{host}:{port}/api/v3/series") == b"[]"
+    assert len(scripted_server.paths) == 2
+
+
+def test_async_client_raises_requests_style_errors(scripted_server):
+    scripted_server.responses.append((404, b"{}", False))
+    host, port = scripted_server.server_address[:2]
+    url = f"http://{host}:{port}/api/v3/series"
+
+    with pytest.raises(AsyncHTTPError, match=f"404 Client Error: Not Found for url: {url}"):
+        client_get(url)
+
+
+def test_async_client_follows_redirects(scripted_server):
+    scripted_server.responses.extend([(301, b"", False, {"Location": "/api/v3/series/"}), (200, b"[]", False)])
+    host, port = scripted_server.server_address[:2]
+
+    assert client_get(f"http://{host}:{port}/api/v3/series") == b"[]"
+    assert scripted_server.paths == ["/api/v3/series", "/api/v3/series/"]
+
+
+def test_async_client_rejects_redirects_it_cannot_follow(scripted_server):
+    scripted_server.responses.append((302, b"", False))
+    host, port = scripted_server.server_address[:2]
+
+    with pytest.raises(AsyncHTTPError, match="302 Redirect Error: Found"):
+        client_get(f"http://{host}:{port}/api/v3/series")
+
+
+def test_async_client_read_timeout_applies_to_each_read(scripted_server):
+    body = b"[" + b" " * 28 + b"]"
+    scripted_server.responses.append((200, body, False))
+    scripted_server.pace = 0.05
+    host, port = scripted_server.server_address[:2]
+    url = f"http://{host}:{port}/api/v3/series"
+
+    # About 0.5 s in total, but never 0.3 s without data.
+    assert client_get(url, read_timeout=0.3) == body
+
+    scripted_server.responses.append((200, body, False))
+    scripted_server.pace = 0.5
+    with pytest.raises(TimeoutError, match="read timeout=0.3"):
+        client_get(url, retries=0, read_timeout=0.3)
+
+
+def test_async_engine_matches_thread_engine_including_failures():
+    with FakeSonarr(series_count=30, episodes_per_series=12) as fake:
+        series = [*fake.series, {"id": 999, "title": "Missing"}, {"id": 998, "title": fake.series[0]["title"]}]
+
+        expected = fetch_all_series_language_data(
+            series, lambda: build_session("secret"), fake.base_url, (3.0, 20.0), 4
+        )
+        actual = fetch_all_series_language_data_async(
+            series, "secret", fake.base_url, (3.0, 20.0), 16
+        )
+
+    assert actual == expected
+    assert [failure["serie"] for failure in actual[1]] == ["Missing", fake.series[0]["title"]]
+
+
+def test_async_engine_files_fetch_mode_matches_split_results():
+    with FakeSonarr(series_count=10, episodes_per_series=8) as fake:
+        expected = fetch_all_series_language_data_async(
+            fake.series, "secret", fake.base_url, (3.0, 20.0), 8
+        )
+        counter = RequestCounter()
+        actual = fetch_all_series_language_data_async(
+            fake.series, "secret", fake.base_url, (3.0, 20.0), 8,
+            fetch_mode="files", request_counter=counter,
+        )
+
+    assert actual == expected
+    assert counter.count == len(fake.series)
+
+
+def test_async_engine_auto_fetch_mode_uses_embedded_files():
+    with FakeSonarr(series_count=10, episodes_per_series=8) as fake:
+        expected = fetch_all_series_language_data_async(
+            fake.series, "secret", fake.base_url, (3.0, 20.0), 8
+        )
+        counter = RequestCounter()
+        actual = fetch_all_series_language_data_async(
+            fake.series, "secret", fake.base_url, (3.0, 20.0), 8,
+            fetch_mode="auto", request_counter=counter,
+        )
+
+    assert actual == expected
+    assert counter.count == len(fake.series)
+
+
+def test_async_client_decodes_compressed_bodies_and_caps_their_size(scripted_server):
+    body = b'[{"id": 1}]' * 100
+    host, port = scripted_server.server_address[:2]
+    url = f"http://{host}:{port}/api/v3/series"
+    seen = []
+    scripted_server.responses.append((200, gzip.compress(body), False, {"Content-Encoding": "gzip"}))
+
+    assert client_get(url, on_response=lambda **response: seen.append(response)) == body
+    assert seen[0]["size"] < seen[0]["decoded_size"] == len(body)
+
+    scripted_server.responses.append((200, gzip.compress(body), False, {"Content-Encoding": "gzip"}))
+    with pytest.raises(ValueError, match="over 1000 bytes once decoded"):
+        client_get(url, max_body_size=1000)
+
+
+def test_async_client_skips_informational_responses(scripted_server):
+    scripted_server.responses.append(
+        b"HTTP/1.1 103 Early Hints\r\nLink: </style.css>\r\n\r\n"
+        b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\n[]"
+    )
+    host, port = scripted_server.server_address[:2]
+
+    assert client_get(f"http://{host}:{port}/api/v3/series") == b"[]"
+
+
+def test_async_client_raises_protocol_errors_for_malformed_responses(scripted_server):
+    host, port = scripted_server.server_address[:2]
+    url = f"http://{host}:{port}/api/v3/series"
+    scripted_server.responses.append(
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n[]\r\n0\r\n\r\n"
+    )
+
+    with pytest.raises(AsyncProtocolError, match=r"url: /api/v3/series \(Caused by ProtocolError\('Connection aborted"):
+        client_get(url, retries=0)
+
+
+def test_malformed_responses_fail_the_series_like_a_connection_error(scripted_server):
+    host, port = scripted_server.server_address[:2]
+    base_url = f"http://{host}:{port}/api/v3"
+    series = [{"id": 1, "title": "Broken"}]
+    scripted_server.responses.extend([b"garbage\r\n\r\n"] * 2)
+
+    _, (thread_failure,) = fetch_all_series_language_data(
+        series, lambda: build_session("secret", retries=0), base_url, (3.0, 5.0), 1
+    )
+    scripted_server.responses[:] = [b"garbage\r\n\r\n"] * 2
+    _, (async_failure,) = fetch_all_series_language_data_async(
+        series, "secret", base_url, (3.0, 5.0), 4, retries=0
+    )
+
+    pool = f"HTTPConnectionPool(host='{host}', port={port})"
+    expected = f"{pool}: Max retries exceeded with url: /api/v3/episode?seriesId=1 (Caused by ProtocolError("
+    for failure in (thread_failure, async_failure):
+        assert failure["serie"] == "Broken"
+        assert failure["errore"].startswith(f"{expected}'Connection aborted.', ")
+
+
+def test_async_engine_requires_the_optional_extra(capsys):
+    with patch("importlib.util.find_spec", return_value=None), pytest.raises(SystemExit):
+        parse_args(["--apikey", "k", "--url", "https://sonarr", "--engine", "async"])
+    assert "uv sync --extra async" in capsys.readouterr().err
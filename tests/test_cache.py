@@ -0,0 +1,255 @@
+import hashlib
+import json
+import sqlite3
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import (
+    EXIT_OK,
+    build_session,
+    fetch_all_series_language_data,
+    main,
+    summarize_series_payloads,
+    validate_episodes,
+)
+from scan_cache import ResponseStore, ScanCache, series_fingerprint
+
+BASE_URL = "https://sonarr.example.org/api/v3"
+
+
+def make_series(series_id=1, title="Example", files=2, size=1000):
+    return {
+        "id": series_id,
+        "title": title,
+        "lastInfoSync": "2026-01-01T00:00:00Z",
+        "statistics": {"episodeFileCount": files, "sizeOnDisk": size},
+    }
+
+
+def test_fingerprint_requires_statistics():
+    assert series_fingerprint({"id": 1, "title": "No stats"}) is None
+    assert series_fingerprint(make_series()) != series_fingerprint(make_series(size=1001))
+
+
+def test_fingerprint_ignores_metadata_refreshes():
+    refreshed = {**make_series(), "lastInfoSync": "2026-02-01T00:00:00Z"}
+    assert series_fingerprint(refreshed) == series_fingerprint(make_series())
+
+
+def test_cache_round_trips_integer_seasons_and_invalidates_on_changes(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.store(make_series(), {1: {"ita": 2}, 2: {"eng": 1}})
+    cache.close()
+
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    assert cache.lookup(make_series()) == {1: {"ita": 2}, 2: {"eng": 1}}
+    assert cache.lookup(make_series(files=3)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_cache_is_scoped_to_the_sonarr_instance(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.store(make_series(), {1: {"ita": 2}})
+    cache.close()
+
+    other = ScanCache.open(tmp_path / "cache.sqlite3", "https://other.example.org/api/v3")
+    assert other.lookup(make_series()) is None
+    other.close()
+
+
+def test_refresh_ignores_cached_rows(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.store(make_series(), {1: {"ita": 2}})
+    cache.close()
+
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL, refresh=True)
+    assert cache.lookup(make_series()) is None
+    cache.close()
+
+
+def test_retain_drops_deleted_series(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.store(make_series(1), {1: {"ita": 2}})
+    cache.store(make_series(2, "Gone"), {1: {"ita": 2}})
+    cache.retain([1])
+    assert cache.lookup(make_series(2, "Gone")) is None
+    assert cache.lookup(make_series(1)) == {1: {"ita": 2}}
+    cache.close()
+
+
+def test_corrupt_cache_file_is_rejected(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    path.write_bytes(b"definitely not sqlite" * 100)
+
+    with pytest.raises(sqlite3.DatabaseError):
+        ScanCache.open(path, BASE_URL)
+
+
+def test_schema_change_drops_series_and_stored_responses(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ScanCache.open(path, BASE_URL)
+    cache.store(make_series(), {1: {"ita": 2}})
+    cache.responses.store(1, "split", {f"{BASE_URL}/episode?seriesId=1": ["e1", None, "d1"]}, {1: {"ita": 2}})
+    cache.close()
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'schema_version'")
+    connection.close()
+
+    cache = ScanCache.open(path, BASE_URL)
+    assert cache.lookup(make_series()) is None
+    assert cache.responses.lookup(1, "split") is None
+    cache.close()
+
+
+def test_fetch_all_skips_cached_series_and_stores_new_ones(tmp_path):
+    class FakeResponse:
+        def __init__(self, payload):
+            self.payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def iter_content(self, chunk_size):
+            yield json.dumps(self.payload).encode()
+
+        def close(self):
+            return None
+
+    requested = []
+
+    class RecordingSession:
+        def get(self, url, timeout, stream=False):
+            requested.append(url)
+            if "/episode?" in url:
+                return FakeResponse([{"seasonNumber": 1, "episodeFileId": 7}])
+            return FakeResponse([{"id": 7, "mediaInfo": {"audioLanguages": "eng"}}])
+
+        def close(self):
+            return None
+
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.store(make_series(1, "Cached"), {1: {"ita": 3}})
+
+    data, failures = fetch_all_series_language_data(
+        [make_series(1, "Cached"), make_series(2, "Fresh")],
+        RecordingSession,
+        BASE_URL,
+        (3.0, 20.0),
+        workers=2,
+        cache=cache,
+    )
+
+    assert failures == []
+    assert data == {"Cached": {1: {"ita": 3}}, "Fresh": {1: {"eng": 1}}}
+    assert all("seriesId=2" in url for url in requested)
+    assert cache.lookup(make_series(2, "Fresh")) == {1: {"eng": 1}}
+    cache.close()
+
+
+@patch("main.fetch_all_series_language_data", return_value=({}, []))
+@patch("main.get_series", return_value=[])
+@patch("main.build_session")
+def test_main_reports_cache_counters_and_honours_no_cache(
+    build_session, _get_series, fetch_all, capsys
+):
+    build_session.return_value = Mock()
+
+    assert main(["--apikey", "secret", "--url", "https://sonarr"]) == EXIT_OK
+    assert isinstance(fetch_all.call_args.kwargs["cache"], ScanCache)
+    assert "Cache: 0 serie riutilizzate, 0 da analizzare" in capsys.readouterr().out
+
+    assert main(["--apikey", "secret", "--url", "https://sonarr", "--no-cache"]) == EXIT_OK
+    assert fetch_all.call_args.kwargs["cache"] is None
+
+
+@pytest.mark.parametrize(
+    "extra, warned",
+    [
+        (["--engine", "async"], True),
+        (["--analysis-processes", "2"], True),
+        (["--analysis-processes", "2", "--no-cache"], False),
+        (["--analysis-processes", "2", "--refresh"], False),
+        ([], False),
+    ],
+)
+@patch("main.fetch_all_series_language_data_async", return_value=({}, []))
+@patch("main.fetch_all_series_language_data", return_value=({}, []))
+@patch("main.get_series", return_value=[])
+@patch("main.build_session")
+def test_engines_without_conditional_requests_warn_at_startup(
+    build_session, _get_series, _fetch_all, _fetch_all_async, capsys, extra, warned
+):
+    build_session.return_value = Mock()
+    assert main(["--apikey", "secret", "--url", "https://sonarr", *extra]) == EXIT_OK
+    assert ("richiedono --engine threads" in capsys.readouterr().err) is warned
+
+
+def run_main(fake, tmp_path, *extra):
+    output = tmp_path / "report.json"
+    argv = ["--apikey", "k", "--url", fake.base_url, "--output", str(output), "--show-all", *extra]
+    assert main(argv) == EXIT_OK
+    return json.loads(output.read_text(encoding="utf-8"))
+
+
+def touch_statistics(fake):
+    """A disk rescan: the /series fingerprint changes but no episode file does."""
+    for serie in fake.series:
+        serie["statistics"]["sizeOnDisk"] += 1
+
+
+@pytest.mark.parametrize("etags", [True, False])
+def test_unchanged_responses_reuse_the_stored_seasons(tmp_path, capsys, etags):
+    with FakeSonarr(series_count=4, episodes_per_series=6, etags=etags) as fake:
+        first = run_main(fake, tmp_path, "--fetch-mode", "split")
+        touch_statistics(fake)
+        fake.files[2][0]["mediaInfo"]["audioLanguages"] = "jpn"
+        fake.reset_counters()
+        with patch("main.summarize_series_payloads", wraps=summarize_series_payloads) as summarize:
+            second = run_main(fake, tmp_path, "--fetch-mode", "split")
+
+        # Series 2 changed its /episodefile body; after a 304 its /episode body is fetched again.
+        assert fake.requests == 1 + 4 * 2 + etags
+        assert fake.not_modified == (7 if etags else 0)
+        assert [call.args[0]["id"] for call in summarize.call_args_list] == [2]
+
+    assert "Risposte di Sonarr invariate per 3 serie" in capsys.readouterr().out
+    changed = [item for item in second if item["serie"] == "Series 00002"]
+    assert changed != [item for item in first if item["serie"] == "Series 00002"]
+    assert [item for item in second if item["serie"] != "Series 00002"] == [
+        item for item in first if item["serie"] != "Series 00002"
+    ]
+
+
+def test_refresh_ignores_stored_responses(tmp_path):
+    with FakeSonarr(series_count=2, episodes_per_series=3, etags=True) as fake:
+        run_main(fake, tmp_path)
+        fake.reset_counters()
+        run_main(fake, tmp_path, "--refresh")
+        assert fake.not_modified == 0
+
+
+def test_stored_responses_are_streamed_and_hashed_whole():
+    with FakeSonarr(series_count=1, episodes_per_series=50) as fake:
+        store = ResponseStore()
+        with patch("main.validate_episodes", wraps=validate_episodes) as validate:
+            _, failures = fetch_all_series_language_data(
+                fake.series,
+                lambda: build_session("k", response_store=store),
+                fake.base_url,
+                (3.0, 20.0),
+                workers=1,
+                fetch_mode="split",
+            )
+        url = f"{fake.base_url}/episode?seriesId=1"
+        body = requests.get(url, timeout=5).content
+
+    assert not failures
+    # Items reach the validator as they are decoded, not as a list built from the whole body.
+    assert validate.call_args_list
+    assert not any(isinstance(call.args[0], list) for call in validate.call_args_list)
+    validators, _ = store.lookup(1, "split")
+    assert validators[url][2] == hashlib.blake2b(body, digest_size=16).hexdigest()
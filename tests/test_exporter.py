@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from benchmarks.fake_sonarr import FakeSonarr
+from instances import SonarrInstance
+from language_codes import normalize_audio_languages
+from main import episodes_per_language, export_instance_metrics, normalize_url, parse_args, run_exporter_scans
+from metrics_exporter import ExporterMetrics, MetricsServer, escape_label_value
+from scan_stats import ScanStats
+
+
+def instance(name, url, cache_file=None):
+    return SonarrInstance(name, normalize_url(url), "test", 4, 64, 5.0, 0, 0.0, cache_file=cache_file)
+
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def episode_samples(values):
+    prefix = 'sonarr_lang_checker_episodes{sonarr="main",language="'
+    return {key[len(prefix):-2]: int(value) for key, value in values.items() if key.startswith(prefix)}
+
+
+def language_totals(fake):
+    totals = {}
+    for files in fake.files.values():
+        for item in files:
+            for lang in normalize_audio_languages(item["mediaInfo"]["audioLanguages"]).split("/"):
+                totals[lang] = totals.get(lang, 0) + 1
+    return totals
+
+
+def test_episodes_per_language_splits_combos():
+    summary = {"A": {1: {"eng/ita": 2, "ita": 1}}, "B": {2: {"eng/jpn": 4}}}
+    assert episodes_per_language(summary) == {"eng": 6, "ita": 3, "jpn": 4}
+
+
+def test_escape_label_value():
+    assert escape_label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_record_scan_renders_issue_counts_and_counters():
+    metrics = ExporterMetrics()
+    stats = ScanStats()
+    stats(url="http://s/api/v3/series", status=200, elapsed=0.02, size=10, retries=1)
+    stats(url="http://s/api/v3/episode", status=503, elapsed=0.5, size=5)
+
+    metrics.record_scan(
+        "main", 1.5, stats.summary(), issues={"stagione_mista": 2}, episodes={"ita": 7, "eng": 3}, series=4
+    )
+    latency = 'sonarr_lang_checker_request_latency_seconds{sonarr="main",endpoint="/episode",quantile="0.99"}'
+    assert samples(metrics.render().decode("utf-8"))[latency] == "0.5"
+    metrics.record_scan("main", 0.1, ScanStats().summary())
+
+    values = samples(metrics.render().decode("utf-8"))
+    assert values['sonarr_lang_checker_up{sonarr="main"}'] == "0"
+    # A failed scan keeps the last known results.
+    assert values['sonarr_lang_checker_issues{sonarr="main",type="stagione_mista"}'] == "2"
+    assert values['sonarr_lang_checker_issues{sonarr="main",type="serie_mista"}'] == "0"
+    assert values['sonarr_lang_checker_episodes{sonarr="main",language="ita"}'] == "7"
+    assert values['sonarr_lang_checker_scans_total{sonarr="main"}'] == "2"
+    assert values['sonarr_lang_checker_http_requests_total{sonarr="main",status="503"}'] == "1"
+    assert values['sonarr_lang_checker_http_retries_total{sonarr="main"}'] == "1"
+    assert values['sonarr_lang_checker_scan_duration_seconds{sonarr="main"}'] == "0.1"
+    assert latency not in values
+
+
+def test_exporter_scan_publishes_metrics_served_without_calling_sonarr(tmp_path):
+    with FakeSonarr(series_count=3, episodes_per_series=4) as fake:
+        args = parse_args(["--exporter", "--listen", "127.0.0.1:0", "--cache-file", str(tmp_path / "c.sqlite3")])
+        metrics = ExporterMetrics()
+        stop = threading.Event()
+        stop.set()
+        run_exporter_scans([instance("main", fake.base_url, args.cache_file)], args, metrics, stop)
+        first_scan_requests = fake.requests
+        # The second scan reuses the cache: only the series list is fetched.
+        export_instance_metrics(instance("main", fake.base_url, args.cache_file), args, metrics)
+        assert fake.requests == first_scan_requests + 1
+
+        server = MetricsServer(args.listen, metrics)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        try:
+            host, port = server.server_address[:2]
+            before = fake.requests
+            response = requests.get(f"http://{host}:{port}/metrics", timeout=5)
+            assert fake.requests == before
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    values = samples(response.text)
+    assert values['sonarr_lang_checker_up{sonarr="main"}'] == "1"
+    assert values['sonarr_lang_checker_series{sonarr="main"}'] == "3"
+    assert values['sonarr_lang_checker_scans_total{sonarr="main"}'] == "2"
+    assert episode_samples(values) == language_totals(fake)
+
+
+def test_exporter_counts_series_the_report_would_skip():
+    with FakeSonarr(series_count=3, episodes_per_series=4) as fake:
+        fake.series[0]["statistics"]["episodeFileCount"] = 1
+        args = parse_args(["--exporter", "--no-cache"])
+        metrics = ExporterMetrics()
+        export_instance_metrics(instance("main", fake.base_url), args, metrics)
+
+    values = samples(metrics.render().decode("utf-8"))
+    assert values['sonarr_lang_checker_series{sonarr="main"}'] == "3"
+    assert episode_samples(values) == language_totals(fake)
+
+
+def test_unreachable_instance_is_exported_as_down():
+    args = parse_args(["--exporter", "--no-cache", "--retries", "0"])
+    metrics = ExporterMetrics()
+
+    export_instance_metrics(instance("down", "http://127.0.0.1:9"), args, metrics)
+
+    values = samples(metrics.render().decode("utf-8"))
+    assert values['sonarr_lang_checker_up{sonarr="down"}'] == "0"
+    assert not any(key.startswith("sonarr_lang_checker_issues{") for key in values)
+
+
+def test_unexpected_scan_errors_mark_the_instance_down_and_keep_the_exporter_running(tmp_path, capsys):
+    with FakeSonarr(series_count=3, episodes_per_series=4) as fake:
+        args = parse_args(["--exporter", "--cache-file", str(tmp_path / "c.sqlite3")])
+        metrics = ExporterMetrics()
+        stop = threading.Event()
+        stop.set()
+        main_instance = instance("main", fake.base_url, args.cache_file)
+        run_exporter_scans([main_instance], args, metrics, stop)
+        with patch("main.scan_instance", side_effect=sqlite3.OperationalError("database is locked")):
+            run_exporter_scans([main_instance], args, metrics, stop)
+
+    assert "[main] Analisi non riuscita: OperationalError: database is locked" in capsys.readouterr().err
+    values = samples(metrics.render().decode("utf-8"))
+    assert values['sonarr_lang_checker_up{sonarr="main"}'] == "0"
+    assert values['sonarr_lang_checker_series{sonarr="main"}'] == "3"
+    assert values['sonarr_lang_checker_scans_total{sonarr="main"}'] == "2"
+
+
+@pytest.mark.parametrize("extra", [["--serve"], ["--stats"], ["--output", "report.json"]])
+def test_exporter_rejects_one_shot_options(extra):
+    with pytest.raises(SystemExit):
+        parse_args(["--exporter", *extra])
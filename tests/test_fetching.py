@@ -1,19 +1,33 @@
+import json
+import pickle
 import time
 
 import pytest
 import requests
 
+from benchmarks.fake_sonarr import FakeSonarr
 from main import (
     DEFAULT_RETRY_BACKOFF_SECONDS,
     DEFAULT_RETRY_COUNT,
     RETRYABLE_STATUS_CODES,
+    RequestCounter,
+    SERIES_STATISTICS,
+    SeriesListing,
+    SeriesRecord,
     build_session,
+    embedded_episode_files,
     fetch_all_series_language_data,
     get_episode_files,
     get_episodes,
+    get_episodes_with_files,
     get_series,
+    main,
+    order_series,
+    parse_args,
     positive_worker_count,
 )
+from scan_cache import FINGERPRINT_STATISTICS
+from series_filters import SeriesFilter
 
 
 def test_build_session_retries_transient_get_requests_only():
@@ -32,6 +46,15 @@ def test_build_session_retries_transient_get_requests_only():
         assert retry_policy.respect_retry_after_header is True
 
 
+def test_build_session_sizes_shared_connection_pool():
+    session = build_session("api-key", pool_size=8)
+
+    adapter = session.adapters["https://"]
+    assert adapter._pool_maxsize == 8
+    assert adapter._pool_block is True
+    assert adapter.max_retries.total == DEFAULT_RETRY_COUNT
+
+
 class FakeResponse:
     def __init__(self, payload):
         self.payload = payload
@@ -42,9 +65,17 @@ class FakeResponse:
     def json(self):
         return self.payload
 
+    def iter_content(self, chunk_size):
+        body = json.dumps(self.payload).encode()
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    def close(self):
+        return None
+
 
 class FakeSession:
-    def get(self, url, timeout):
+    def get(self, url, timeout, stream=False):
         assert timeout == (3.0, 20.0)
         if "seriesId=2" in url:
             raise requests.Timeout("Sonarr did not answer")
@@ -79,6 +110,51 @@ def test_concurrent_fetch_returns_sorted_data_and_partial_failures():
     assert failures == [{"serie": "Zulu", "errore": "Sonarr did not answer"}]
 
 
+def test_pooled_fetch_shares_one_session_and_closes_it_once():
+    created = []
+
+    class CountingSession(FakeSession):
+        closed = 0
+
+        def close(self):
+            self.closed += 1
+
+    def session_factory():
+        created.append(CountingSession())
+        return created[-1]
+
+    data, failures = fetch_all_series_language_data(
+        [{"id": 1, "title": "alpha"}, {"id": 3, "title": "beta"}, {"id": 2, "title": "Zulu"}],
+        session_factory,
+        "https://sonarr.example.org/api/v3",
+        (3.0, 20.0),
+        workers=2,
+        pooled=True,
+    )
+
+    assert list(data) == ["alpha", "beta"]
+    assert failures == [{"serie": "Zulu", "errore": "Sonarr did not answer"}]
+    assert len(created) == 1
+    assert created[0].closed == 1
+
+
+def test_pooled_session_factory_failure_marks_every_series_failed():
+    data, failures = fetch_all_series_language_data(
+        [{"id": 1, "title": "Broken"}, {"id": 2, "title": "Also broken"}],
+        lambda: (_ for _ in ()).throw(RuntimeError("session failed")),
+        "https://sonarr.example.org/api/v3",
+        (3.0, 20.0),
+        workers=2,
+        pooled=True,
+    )
+
+    assert data == {}
+    assert failures == [
+        {"serie": "Also broken", "errore": "session failed"},
+        {"serie": "Broken", "errore": "session failed"},
+    ]
+
+
 def test_worker_count_is_bounded():
     assert positive_worker_count("1") == 1
     assert positive_worker_count("16") == 16
@@ -86,7 +162,7 @@ def test_worker_count_is_bounded():
 
 def test_same_title_series_are_kept_and_deterministic():
     class DuplicateTitleSession(FakeSession):
-        def get(self, url, timeout):
+        def get(self, url, timeout, stream=False):
             if "seriesId=2" in url:
                 time.sleep(0.01)
             if "/episode?" in url:
@@ -129,7 +205,7 @@ def test_session_factory_failure_becomes_partial_result():
 
 def test_get_series_rejects_invalid_payload():
     class InvalidSeriesSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse({"unexpected": "object"})
 
@@ -141,6 +217,33 @@ def test_get_series_rejects_invalid_payload():
         )
 
 
+def test_get_series_rejects_items_that_are_not_objects():
+    with FakeSonarr(series_count=2, episodes_per_series=1) as fake:
+        fake.series.append("broken")
+        with pytest.raises(ValueError, match="item 2 is not an object"):
+            get_series(build_session("key"), fake.base_url, (3.0, 20.0))
+
+
+def test_get_series_keeps_only_the_fields_the_scan_reads():
+    with FakeSonarr(series_count=2, episodes_per_series=1) as fake:
+        fake.series[0]["images"] = [{"coverType": "poster", "url": "/MediaCover/1/poster.jpg"}]
+        fake.series[0]["statistics"]["percentOfEpisodes"] = 100.0
+        series = get_series(build_session("key"), fake.base_url, (3.0, 20.0))
+
+    first = series[0]
+    assert isinstance(first, SeriesRecord)
+    assert first["id"] == 1 and first.get("title") == "Series 00001"
+    assert "images" not in first and first.get("images") is None
+    assert first["statistics"] == {
+        "episodeFileCount": 1, "episodeCount": 1, "totalEpisodeCount": 1, "sizeOnDisk": 1_000_000_000
+    }
+    assert set(FINGERPRINT_STATISTICS) <= set(SERIES_STATISTICS)
+    assert first.get("languageProfileId", "absent") == "absent"
+    with pytest.raises(KeyError):
+        first["languageProfileId"]
+    assert pickle.loads(pickle.dumps(first)) == first  # Records travel to analysis processes.
+
+
 @pytest.mark.parametrize(
     ("payload", "message"),
     [
@@ -151,7 +254,7 @@ def test_get_series_rejects_invalid_payload():
 )
 def test_get_episodes_rejects_payload_drift(payload, message):
     class InvalidEpisodeSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse(payload)
 
@@ -166,7 +269,7 @@ def test_get_episodes_rejects_payload_drift(payload, message):
 
 def test_get_episodes_accepts_episode_without_downloaded_file():
     class EpisodeWithoutFileSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse([{"seasonNumber": 1}])
 
@@ -180,7 +283,7 @@ def test_get_episodes_accepts_episode_without_downloaded_file():
 
 def test_get_episodes_rejects_non_hashable_episode_file_id():
     class InvalidEpisodeSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse([{"seasonNumber": 1, "episodeFileId": [101]}])
 
@@ -204,7 +307,7 @@ def test_get_episodes_rejects_non_hashable_episode_file_id():
 )
 def test_get_episode_files_rejects_payload_drift(payload, message):
     class InvalidEpisodeFileSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse(payload)
 
@@ -219,7 +322,7 @@ def test_get_episode_files_rejects_payload_drift(payload, message):
 
 def test_get_episode_files_normalizes_null_media_info():
     class NullMediaInfoSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse([{"id": 101, "mediaInfo": None}])
 
@@ -231,9 +334,40 @@ def test_get_episode_files_normalizes_null_media_info():
     ) == {101: {"id": 101, "mediaInfo": {}}}
 
 
+def test_get_episode_files_keeps_only_the_fields_the_analysis_reads():
+    class VerboseEpisodeFileSession:
+        def get(self, _url, timeout, stream=False):
+            assert stream is True
+            return FakeResponse(
+                [
+                    {
+                        "id": 101,
+                        "seasonNumber": 1,
+                        "relativePath": "Season 01/Show - S01E01E02.mkv",
+                        "quality": {"quality": {"name": "WEBDL-1080p"}},
+                        "mediaInfo": {"audioLanguages": "ita/eng", "videoCodec": "x265"},
+                    }
+                ]
+            )
+
+    assert get_episode_files(
+        VerboseEpisodeFileSession(),
+        42,
+        "https://sonarr.example.org/api/v3",
+        (3.0, 20.0),
+    ) == {
+        101: {
+            "id": 101,
+            "seasonNumber": 1,
+            "relativePath": "Season 01/Show - S01E01E02.mkv",
+            "mediaInfo": {"audioLanguages": "ita/eng"},
+        }
+    }
+
+
 def test_get_episode_files_rejects_non_hashable_id():
     class InvalidEpisodeFileSession:
-        def get(self, _url, timeout):
+        def get(self, _url, timeout, stream=False):
             assert timeout == (3.0, 20.0)
             return FakeResponse([{"id": [101], "mediaInfo": {}}])
 
@@ -244,3 +378,197 @@ def test_get_episode_files_rejects_non_hashable_id():
             "https://sonarr.example.org/api/v3",
             (3.0, 20.0),
         )
+
+
+def test_get_episodes_with_files_uses_embedded_episode_files():
+    class EmbeddedSession:
+        def get(self, url, timeout, stream=False):
+            assert url.endswith("/episode?seriesId=42&includeEpisodeFile=true")
+            return FakeResponse(
+                [
+                    {"seasonNumber": 1, "episodeFileId": 7, "episodeFile": {"id": 7, "mediaInfo": None}},
+                    {"seasonNumber": 1, "episodeFileId": 7, "episodeFile": {"id": 7, "mediaInfo": None}},
+                    {"seasonNumber": 1, "episodeFileId": 0},
+                ]
+            )
+
+    episodes, files_by_id = get_episodes_with_files(
+        EmbeddedSession(), 42, "https://sonarr.example.org/api/v3", (3.0, 20.0)
+    )
+
+    assert len(episodes) == 3
+    assert files_by_id == {7: {"id": 7, "mediaInfo": {}}}
+
+
+def test_get_episodes_with_files_detects_missing_embedding():
+    class LegacySession:
+        def get(self, _url, timeout, stream=False):
+            return FakeResponse([{"seasonNumber": 1, "episodeFileId": 7}])
+
+    _, files_by_id = get_episodes_with_files(
+        LegacySession(), 42, "https://sonarr.example.org/api/v3", (3.0, 20.0)
+    )
+
+    assert files_by_id is None
+
+
+def test_embedded_episode_files_keep_episodefile_validation():
+    with pytest.raises(ValueError, match="mediaInfo must be an object"):
+        embedded_episode_files(
+            [{"seasonNumber": 1, "episodeFileId": 7, "episodeFile": {"id": 7, "mediaInfo": []}}],
+            42,
+        )
+
+
+@pytest.mark.parametrize(("embed", "requests_per_series"), [(True, 1), (False, 2)])
+def test_auto_fetch_mode_halves_requests_when_files_are_embedded(embed, requests_per_series):
+    with FakeSonarr(series_count=12, episodes_per_series=6, embed_episode_files=embed) as fake:
+        expected = fetch_all_series_language_data(
+            fake.series, lambda: build_session("key"), fake.base_url, (3.0, 20.0), 1
+        )
+        counter = RequestCounter()
+        actual = fetch_all_series_language_data(
+            fake.series,
+            lambda: build_session("key", request_counter=counter),
+            fake.base_url,
+            (3.0, 20.0),
+            1,
+            fetch_mode="auto",
+        )
+
+    assert actual == expected
+    # Without embedding the /episode answer is reused, so the fallback adds no request.
+    assert counter.count == len(fake.series) * requests_per_series
+
+
+def test_files_fetch_mode_skips_episodes_and_falls_back_without_season_numbers():
+    requested = []
+
+    class FilesSession(FakeSession):
+        def get(self, url, timeout, stream=False):
+            requested.append(url)
+            if "/episodefile?" in url and "seriesId=2" in url:
+                return FakeResponse([{"id": 201, "mediaInfo": {"audioLanguages": "eng"}}])
+            if "/episodefile?" in url:
+                return FakeResponse(
+                    [{"id": 101, "seasonNumber": 1, "mediaInfo": {"audioLanguages": "ita"}}]
+                )
+            return FakeResponse([{"seasonNumber": 3, "episodeFileId": 201}])
+
+    data, failures = fetch_all_series_language_data(
+        [{"id": 1, "title": "alpha"}, {"id": 2, "title": "beta"}],
+        FilesSession,
+        "https://sonarr.example.org/api/v3",
+        (3.0, 20.0),
+        workers=1,
+        fetch_mode="files",
+    )
+
+    assert failures == []
+    assert {title: {season: dict(langs) for season, langs in seasons.items()} for title, seasons in data.items()} == {
+        "alpha": {1: {"ita": 1}},
+        "beta": {3: {"eng": 1}},
+    }
+    assert [url.split("/api/v3/")[1] for url in requested] == [
+        "episodefile?seriesId=1",
+        "episodefile?seriesId=2",
+        "episode?seriesId=2",
+    ]
+
+
+def test_retry_policy_recovers_from_synthetic_server_errors():
+    with FakeSonarr(series_count=8, episodes_per_series=4) as healthy:
+        expected = fetch_all_series_language_data(
+            healthy.series, lambda: build_session("key"), healthy.base_url, (3.0, 20.0), 2
+        )
+    with FakeSonarr(series_count=8, episodes_per_series=4, error_rate=0.3) as flaky:
+        actual = fetch_all_series_language_data(
+            flaky.series, lambda: build_session("key", retries=10, backoff_factor=0), flaky.base_url, (3.0, 20.0), 2
+        )
+
+    assert flaky.errors > 0
+    assert actual == expected
+
+
+def test_order_series_schedules_largest_or_most_recent_first():
+    series = [
+        {"id": 1, "statistics": {"episodeFileCount": 10, "totalEpisodeCount": 12}, "added": "2020-01-01T00:00:00Z"},
+        {"id": 2, "lastAired": "2026-03-01T21:00:00Z", "added": "2019-05-01T00:00:00Z"},
+        {"id": 3, "statistics": {"episodeFileCount": 900, "totalEpisodeCount": 950}, "previousAiring": "bogus"},
+        {"id": 4, "statistics": {"episodeFileCount": 10, "totalEpisodeCount": 40}, "added": "2025-06-01T00:00:00"},
+    ]
+
+    assert [serie["id"] for serie in order_series(series, "largest")] == [3, 4, 1, 2]
+    assert [serie["id"] for serie in order_series(series, "recent")] == [2, 4, 1, 3]
+    assert [serie["id"] for serie in order_series(series, "sonarr")] == [1, 2, 3, 4]
+    assert parse_args([]).order == "largest"
+
+
+def test_largest_first_submits_the_biggest_series_before_the_rest():
+    requested = []
+
+    def session_factory():
+        session = build_session("key")
+        session.hooks["response"].append(lambda response, *args, **kwargs: requested.append(response.url))
+        return session
+
+    with FakeSonarr(series_count=4, episodes_per_series=[2, 3, 30, 1]) as fake:
+        data, failures = fetch_all_series_language_data(
+            order_series(fake.series, "largest"), session_factory, fake.base_url, (3.0, 20.0), 1, fetch_mode="files"
+        )
+
+    assert not failures and len(data) == 4
+    assert [url.rsplit("=", 1)[1] for url in requested] == ["3", "2", "1", "4"]
+
+
+def test_series_listing_starts_the_scan_before_the_listing_ends():
+    listed_at_first_response = []
+
+    def session_factory():
+        session = build_session("key")
+        session.hooks["response"].append(lambda *args, **kwargs: listed_at_first_response.append(len(listing.ids)))
+        return session
+
+    with FakeSonarr(series_count=12, episodes_per_series=[3] * 10 + [1, 3], series_latency=0.02) as fake:
+        for serie in fake.series:  # Large enough for /series to arrive in several chunks.
+            serie["overview"] = "x" * 20_000
+        listing = SeriesListing(
+            build_session("key"), fake.base_url, (3.0, 20.0), SeriesFilter(trivial_files=1), progress=None
+        )
+        data, failures = fetch_all_series_language_data(
+            listing, session_factory, fake.base_url, (3.0, 20.0), 2, pooled=True, fetch_mode="files"
+        )
+        expected = fetch_all_series_language_data(
+            [serie for serie in fake.series if serie["id"] != 11], session_factory, fake.base_url, (3.0, 20.0), 2
+        )
+
+    assert (data, failures) == expected
+    assert listed_at_first_response[0] < 12
+    assert (len(listing.ids), listing.selected, listing.trivial) == (12, 11, 1)
+
+
+def test_sonarr_order_overlaps_the_listing_and_keeps_the_report(tmp_path, capsys):
+    reports = {}
+    with FakeSonarr(series_count=12, episodes_per_series=[3] * 10 + [1, 3], series_latency=0.005) as fake:
+        for order in ("largest", "sonarr", "sonarr"):
+            output = tmp_path / "report.json"
+            argv = [
+                "--apikey", "k", "--url", fake.base_url, "--cache-file", str(tmp_path / f"{order}.sqlite3"),
+                "--structured-json", "--output", str(output), "--exclude", "tag=kids", "--order", order, "--quiet",
+            ]
+            assert main(argv) == 0
+            reports[order] = json.loads(output.read_text(encoding="utf-8"))
+            out = capsys.readouterr().out
+            assert "⏭️ 7/12 serie da analizzare: 4 escluse dai filtri, 1 saltate" in out
+
+    assert reports["sonarr"] == reports["largest"]
+    assert "Cache: 7 serie riutilizzate, 0 da analizzare" in out
+
+
+def test_sonarr_order_fails_the_scan_when_the_listing_breaks(tmp_path, capsys):
+    with FakeSonarr(series_count=4, episodes_per_series=2) as fake:
+        fake.series.insert(2, "broken")
+        argv = ["--apikey", "k", "--url", fake.base_url, "--no-cache", "--order", "sonarr", "--quiet", "--json"]
+        assert main(argv) == 1
+
+    assert "❌ Errore nella connessione a Sonarr: Sonarr /series returned an invalid payload" in capsys.readouterr().out
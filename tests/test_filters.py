@@ -0,0 +1,112 @@
+import argparse
+import json
+
+import pytest
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import build_series_filter, main, parse_args
+from series_filters import FilterError, SeriesFilter, series_condition
+
+SERIES = [
+    {
+        "id": 1,
+        "seriesType": "Anime",
+        "tags": [2],
+        "qualityProfileId": 4,
+        "monitored": True,
+        "path": "/tv/kids/Show A",
+        "rootFolderPath": "/tv/kids/",
+        "statistics": {"episodeFileCount": 10},
+    },
+    {
+        "id": 2,
+        "seriesType": "standard",
+        "tags": [],
+        "qualityProfileId": 1,
+        "monitored": False,
+        "path": "/tv/main/Show B",
+        "rootFolderPath": "/tv/main",
+        "statistics": {"episodeFileCount": 1},
+    },
+    {"id": 3, "seriesType": "standard", "path": "/tv/main/Show C", "statistics": {"episodeFileCount": 0}},
+    {"id": 4, "seriesType": "daily"},
+]
+
+
+def ids(series_filter, series=SERIES):
+    selected, _, _ = series_filter.split(series)
+    return [serie["id"] for serie in selected]
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        ("type=anime,daily", [1, 4]),
+        ("tag=2", [1]),
+        ("quality-profile=1", [2]),
+        ("monitored=no", [2, 3, 4]),
+        ("root-folder=/tv/main/", [2]),
+        ("path=/tv/main/*", [2, 3]),
+        ("min-files=1", [1, 2]),
+        ("max-files=1", [2, 3]),
+    ],
+)
+def test_include_conditions(condition, expected):
+    assert ids(SeriesFilter(include=[series_condition(condition)])) == expected
+
+
+def test_conditions_combine_and_exclude_wins():
+    series_filter = SeriesFilter(
+        include=[series_condition("type=standard,anime"), series_condition("path=/tv/*")],
+        exclude=[series_condition("tag=2")],
+    )
+    assert ids(series_filter) == [2, 3]
+    assert series_filter.split(SERIES)[1:] == (2, 0)
+
+
+def test_trivial_series_are_skipped_only_when_statistics_prove_it():
+    assert SeriesFilter(trivial_files=1).split(SERIES) == ([SERIES[0], SERIES[3]], 0, 2)
+    assert ids(SeriesFilter(trivial_files=0)) == [1, 2, 4]
+
+
+@pytest.mark.parametrize("text", ["color=red", "type", "type=", "min-files=x", "monitored=maybe"])
+def test_invalid_conditions(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        series_condition(text)
+
+
+def test_names_are_resolved_against_sonarr_items():
+    series_filter = SeriesFilter(include=[series_condition("tag=Kids,missing")])
+    assert series_filter.lookups() == {"tag": "tag"}
+    with pytest.raises(FilterError):
+        series_filter.split(SERIES)
+
+    resolved, unknown = series_filter.resolved({"tag": [{"id": 2, "label": "kids"}]})
+    assert unknown == ["tag=missing"]
+    assert ids(resolved) == [1]
+
+
+def test_build_series_filter_follows_the_report_mode():
+    assert build_series_filter(parse_args([])).trivial_files == 1
+    assert build_series_filter(parse_args(["--wanted-langs", "ita"])).trivial_files == 0
+    assert build_series_filter(parse_args(["--show-all"])).trivial_files is None
+    assert build_series_filter(parse_args(["--scan-trivial"])).trivial_files is None
+    assert ids(build_series_filter(parse_args(["--ignore-anime", "--scan-trivial"]))) == [2, 3, 4]
+    for extra in (["--exporter"], ["--snapshot", "scan.snap"], ["--diff-against", "scan.snap"]):
+        assert build_series_filter(parse_args(extra)).trivial_files is None
+
+
+def test_main_skips_filtered_series_before_fetching(tmp_path, capsys):
+    output = tmp_path / "report.json"
+    with FakeSonarr(series_count=12, episodes_per_series=[3] * 10 + [1, 3]) as fake:
+        argv = [
+            "--apikey", "k", "--url", fake.base_url, "--no-cache", "--structured-json", "--output", str(output),
+            "--fetch-mode", "split", "--exclude", "tag=kids", "--include", "monitored=true",
+        ]
+        assert main(argv) == 0
+        requests_made = fake.requests
+
+    # 4 series tagged "kids" (3, 6, 9, 12) and 3 unmonitored (4, 8, 12); series 11 has a single file.
+    assert "⏭️ 5/12 serie da analizzare: 6 escluse dai filtri, 1 saltate" in capsys.readouterr().out
+    assert requests_made == 2 + 5 * 2  # /series, /tag, then episodes and files of 5 series
+    assert json.loads(output.read_text(encoding="utf-8"))["complete"] is True
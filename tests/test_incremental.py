@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import EXIT_OK, get_history_series_ids, main, parse_args, prepare_incremental_scan
+from scan_cache import ScanCache, utc_timestamp
+
+BASE_URL = "https://sonarr.example.org/api/v3"
+
+
+def make_series(series_id=1, info_sync="2026-01-01T00:00:00Z", files=2):
+    return {
+        "id": series_id,
+        "title": f"Series {series_id}",
+        "lastInfoSync": info_sync,
+        "statistics": {"episodeFileCount": files, "sizeOnDisk": 1000},
+    }
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self.payload
+
+
+def test_history_keeps_only_file_events():
+    session = Mock()
+    session.get.return_value = FakeResponse(
+        [
+            {"seriesId": 1, "eventType": "downloadFolderImported"},
+            {"seriesId": 2, "eventType": "grabbed"},
+            {"seriesId": 3, "eventType": "episodeFileDeleted"},
+        ]
+    )
+    since = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    assert get_history_series_ids(session, BASE_URL, since, (3.0, 20.0)) == {1, 3}
+    assert session.get.call_args.kwargs["params"] == {"date": "2026-01-02T03:04:05Z"}
+
+
+def test_history_rejects_payload_drift():
+    session = Mock()
+    session.get.return_value = FakeResponse([{"eventType": "grabbed"}])
+
+    with pytest.raises(ValueError, match="index 0"):
+        get_history_series_ids(session, BASE_URL, datetime.now(timezone.utc), (3.0, 20.0))
+
+
+def test_incremental_lookup_refetches_series_changed_in_history(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.store(make_series(1), {1: {"ita": 2}})
+    cache.store(make_series(2), {1: {"eng": 2}})
+    cache.store(make_series(3), {1: {"eng": 2}})
+    cache.close()
+
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.start_incremental([2])
+    assert cache.lookup(make_series(1, info_sync="2026-02-01T00:00:00Z")) == {1: {"ita": 2}}
+    assert cache.lookup(make_series(2)) is None
+    assert cache.lookup(make_series(3, files=3)) is None
+    cache.close()
+
+
+def test_corrupt_scan_state_is_ignored(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.connection.execute(
+        "INSERT INTO meta (key, value) VALUES (?, 'yesterday')", (f"last_scan:{BASE_URL}",)
+    )
+
+    assert cache.last_complete_scan() is None
+    cache.close()
+
+
+@pytest.mark.parametrize("age", [None, timedelta(hours=200), timedelta(hours=-2)])
+def test_incremental_falls_back_to_full_scan_without_recent_state(tmp_path, age):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    if age is not None:
+        cache.scan_started = utc_timestamp(datetime.now(timezone.utc) - age)
+        cache.mark_complete()
+    session = Mock()
+
+    prepare_incremental_scan(cache, session, BASE_URL, (3.0, 20.0), 168)
+
+    assert cache.refresh is False
+    session.get.assert_not_called()
+    cache.close()
+
+
+def test_incremental_falls_back_to_full_scan_when_history_fails(tmp_path):
+    cache = ScanCache.open(tmp_path / "cache.sqlite3", BASE_URL)
+    cache.mark_complete()
+    session = Mock()
+    session.get.side_effect = requests.ConnectionError("history down")
+
+    prepare_incremental_scan(cache, session, BASE_URL, (3.0, 20.0), 168)
+
+    assert cache.refresh is False
+    cache.close()
+
+
+def test_incremental_requires_the_cache():
+    with pytest.raises(SystemExit):
+        parse_args(["--incremental", "--no-cache"])
+
+
+def test_incremental_run_refetches_only_series_from_history(tmp_path):
+    with FakeSonarr(series_count=5, episodes_per_series=4) as fake:
+        argv = ["--apikey", "key", "--url", fake.base_url, "--json", "--fetch-mode", "split"]
+        assert main(argv) == EXIT_OK
+
+        for serie in fake.series:
+            serie["lastInfoSync"] = "2026-03-01T00:00:00Z"
+        fake.history.append(
+            {"seriesId": 2, "eventType": "downloadFolderImported", "date": "2999-01-01T00:00:00Z"}
+        )
+        fake.reset_counters()
+        assert main([*argv, "--incremental"]) == EXIT_OK
+
+    # /series, /history/since, then /episode + /episodefile for series 2 only.
+    assert fake.requests == 4
+
+
+def test_incremental_fallback_keeps_the_cache_hits(tmp_path, capsys):
+    with FakeSonarr(series_count=5, episodes_per_series=4) as fake:
+        argv = ["--apikey", "key", "--url", fake.base_url, "--json", "--fetch-mode", "split"]
+        assert main(argv) == EXIT_OK
+
+        fake.history.append({"eventType": "downloadFolderImported", "date": "2999-01-01T00:00:00Z"})
+        fake.reset_counters()
+        capsys.readouterr()
+        assert main([*argv, "--incremental"]) == EXIT_OK
+
+    # /series and the unreadable /history/since; every series comes from the cache.
+    assert fake.requests == 2
+    captured = capsys.readouterr()
+    assert "History di Sonarr non disponibile" in captured.err
+    assert "Cache: 5 serie riutilizzate, 0 da analizzare" in captured.out
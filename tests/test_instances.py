@@ -0,0 +1,193 @@
+import json
+
+import pytest
+
+from benchmarks.fake_sonarr import FakeSonarr
+from instances import ConfigError, instance_cache_file, load_instances
+from main import (
+    EXIT_FATAL,
+    EXIT_OK,
+    EXIT_PARTIAL,
+    INSTANCE_SETTING_TYPES,
+    _merge_fetched_series,
+    main,
+    normalize_url,
+)
+
+DEFAULTS = {
+    "workers": 4,
+    "max_in_flight": 64,
+    "timeout": 20.0,
+    "retries": 3,
+    "backoff_factor": 0.25,
+    "cache_file": "/tmp/scan.sqlite3",
+}
+
+
+def write_config(tmp_path, text):
+    path = tmp_path / "instances.toml"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def load(tmp_path, text):
+    return load_instances(write_config(tmp_path, text), DEFAULTS, INSTANCE_SETTING_TYPES, normalize_url)
+
+
+def test_load_instances_applies_defaults_and_overrides(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANIME_KEY", "from-env")
+    main_instance, anime = load(
+        tmp_path,
+        """
+[defaults]
+workers = 2
+retries = 1
+
+[[instances]]
+name = "main"
+url = "http://sonarr:8989/"
+apikey = "secret"
+
+[[instances]]
+name = "anime"
+url = "http://anime:8989/api/v3"
+apikey_env = "ANIME_KEY"
+workers = 8
+backoff_factor = 0
+cache_file = "/data/anime.sqlite3"
+""",
+    )
+
+    assert (main_instance.url, main_instance.apikey) == ("http://sonarr:8989/api/v3", "secret")
+    assert (main_instance.workers, main_instance.retries, main_instance.timeout) == (2, 1, 20.0)
+    assert main_instance.cache_file == "/tmp/scan.main.sqlite3"
+    assert (anime.apikey, anime.workers, anime.backoff_factor) == ("from-env", 8, 0.0)
+    assert anime.cache_file == "/data/anime.sqlite3"
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("", "almeno una tabella"),
+        ('[[instances]]\nname = "a"\napikey = "k"', "url mancante"),
+        ('[[instances]]\nname = "a b"\nurl = "http://a"\napikey = "k"', "richiede un name"),
+        ('[[instances]]\nname = "a"\nurl = "http://a"', "apikey o apikey_env mancante"),
+        ('[[instances]]\nname = "a"\nurl = "http://a"\napikey_env = "UNSET_TEST_KEY"', "non impostata"),
+        ('[[instances]]\nname = "a"\nurl = "http://a"\napikey = "k"\nworkers = 99', "workers deve essere"),
+        ('[[instances]]\nname = "a"\nurl = "http://a"\napikey = "k"\nworkers = true', "workers deve essere un numero"),
+        ('[[instances]]\nname = "a"\nurl = "http://a"\napikey = "k"\nworkers = 2.5', "workers non valido"),
+        ('[[instances]]\nname = "a"\nurl = "http://a"\napikey = "k"\nthreads = 2', "chiavi sconosciute: threads"),
+        ('[defaults]\nurl = "http://a"', "chiavi sconosciute: url"),
+        (
+            '[[instances]]\nname = "a"\nurl = "http://a"\napikey = "k"\n'
+            '[[instances]]\nname = "A"\nurl = "http://b"\napikey = "k"',
+            "nome duplicato",
+        ),
+        ("[[instances]", "TOML non valido"),
+    ],
+)
+def test_load_instances_rejects_invalid_config(tmp_path, monkeypatch, text, message):
+    monkeypatch.delenv("UNSET_TEST_KEY", raising=False)
+    with pytest.raises(ConfigError, match=message):
+        load(tmp_path, text)
+
+
+def test_instance_cache_file_keeps_suffix():
+    assert instance_cache_file("/data/.scan-cache.sqlite3", "4k") == "/data/.scan-cache.4k.sqlite3"
+
+
+def test_merge_qualifies_titles_shared_by_instances():
+    fetched = [
+        ("show", "Show", "1", 2020, {1: {"ita": 1}}, "main"),
+        ("show", "Show", "1", 2020, {1: {"eng": 1}}, "4k"),
+        ("show", "Show", "2", 2021, {1: {"jpn": 1}}, "4k"),
+        ("solo", "Solo", "3", None, {1: {"ita": 1}}, "main"),
+    ]
+
+    data, _ = _merge_fetched_series(fetched, [])
+
+    assert list(data) == ["Show (4k, 2020, ID 1)", "Show (4k, 2021, ID 2)", "Show (main)", "Solo"]
+
+
+@pytest.fixture
+def two_instances(tmp_path):
+    with FakeSonarr(series_count=3, episodes_per_series=4) as first, FakeSonarr(
+        series_count=2, episodes_per_series=4
+    ) as second:
+        yield first, second
+
+
+def test_main_scans_every_configured_instance(two_instances, tmp_path):
+    first, second = two_instances
+    config = write_config(
+        tmp_path,
+        f"""
+[[instances]]
+name = "main"
+url = "{first.base_url}"
+apikey = "a"
+
+[[instances]]
+name = "kids"
+url = "{second.base_url}"
+apikey = "b"
+workers = 1
+""",
+    )
+
+    output = tmp_path / "report.json"
+    cache_file = tmp_path / "scan.sqlite3"
+    exit_code = main(
+        ["--config", str(config), "--cache-file", str(cache_file), "--show-all", "--output", str(output)]
+    )
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert exit_code == EXIT_OK
+    assert (tmp_path / "scan.main.sqlite3").exists() and (tmp_path / "scan.kids.sqlite3").exists()
+    assert {item["serie"] for item in report} == {
+        "Series 00001 (kids)", "Series 00001 (main)", "Series 00002 (kids)", "Series 00002 (main)", "Series 00003",
+    }
+    assert first.requests and second.requests
+
+
+def test_main_reports_unreachable_instance_as_partial(two_instances, tmp_path, capsys):
+    first, _ = two_instances
+    config = write_config(
+        tmp_path,
+        f"""
+[defaults]
+retries = 0
+
+[[instances]]
+name = "main"
+url = "{first.base_url}"
+apikey = "a"
+
+[[instances]]
+name = "down"
+url = "http://127.0.0.1:9"
+apikey = "b"
+""",
+    )
+
+    output = tmp_path / "report.json"
+    exit_code = main(["--config", str(config), "--no-cache", "--structured-json", "--output", str(output)])
+
+    assert exit_code == EXIT_PARTIAL
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert [(failure["istanza"], failure["serie"]) for failure in report["failures"]] == [("down", None)]
+    assert "[down] Errore nella connessione a Sonarr" in capsys.readouterr().err
+
+
+def test_main_fails_when_no_instance_is_reachable(tmp_path):
+    config = write_config(
+        tmp_path,
+        '[defaults]\nretries = 0\n\n[[instances]]\nname = "down"\nurl = "http://127.0.0.1:9"\napikey = "b"\n',
+    )
+
+    assert main(["--config", str(config), "--no-cache", "--json"]) == EXIT_FATAL
+
+
+def test_config_and_serve_are_mutually_exclusive(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--config", str(tmp_path / "instances.toml"), "--serve"])
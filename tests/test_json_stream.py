@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from json_stream import NotAJSONArray, iter_json_array
+
+DOCUMENT = json.dumps(
+    [
+        {"id": 1, "mediaInfo": {"audioLanguages": "ita/jpn"}, "title": "Città 東京"},
+        12345,
+        -1.5e3,
+        "x",
+        True,
+        None,
+        [],
+        {"nested": [1, {"a": "]"}]},
+    ],
+    ensure_ascii=False,
+    indent=1,
+).encode()
+
+
+def chunked(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64, 1 << 20])
+def test_iter_json_array_matches_json_loads_for_any_chunking(size):
+    assert list(iter_json_array(chunked(DOCUMENT, size))) == json.loads(DOCUMENT)
+
+
+def test_iter_json_array_accepts_text_and_empty_arrays():
+    assert list(iter_json_array([" [ ", "] "])) == []
+    assert list(iter_json_array(["[1,", "2]"])) == [1, 2]
+
+
+@pytest.mark.parametrize("document", [b'{"records": []}', b'"text"', b"42"])
+def test_iter_json_array_rejects_other_documents(document):
+    with pytest.raises(NotAJSONArray):
+        list(iter_json_array(chunked(document, 3)))
+
+
+@pytest.mark.parametrize("document", [b"", b"[1, 2", b"[1 2]", b"[1,]", b"[1] [2]", b'[{"a": }]'])
+def test_iter_json_array_rejects_malformed_json(document):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(chunked(document, 2)))
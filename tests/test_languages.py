@@ -1,13 +1,19 @@
+import pickle
 from collections import defaultdict
 
+import pytest
+
 from main import (
     analyze_language_distribution,
     detect_mismatches,
     detect_wanted_coverage,
+    episodes_in_file,
     normalize_audio_languages,
     normalize_url,
     parse_wanted_langs,
+    summarize_episode_files,
 )
+from language_codes import LANGUAGES, SeasonLanguages, SeriesLanguages, get_flag, normalization_cache_stats
 
 
 def test_normalize_audio_languages_aliases_order_and_duplicates():
@@ -16,6 +22,53 @@ def test_normalize_audio_languages_aliases_order_and_duplicates():
     assert normalize_audio_languages("") == "und"
 
 
+def test_normalization_cache_reuses_results_for_repeated_values():
+    before = normalization_cache_stats()
+    for _ in range(3):
+        assert normalize_audio_languages("Jpn / Unknown / jp") == "jpn/und"
+    after = normalization_cache_stats()
+
+    assert after["misses"] - before["misses"] <= 1
+    assert after["hits"] - before["hits"] >= 2
+    assert 0 < after["hit_rate"] <= 1
+    assert after["size"] <= after["maxsize"]
+
+
+def test_get_flag_resolves_aliases_and_keeps_combo_order():
+    assert get_flag("ita/EN") == "🇮🇹 🇬🇧"
+    assert get_flag("german") == "🇩🇪"
+    assert get_flag("xyz") == "🏳️"
+
+
+def test_season_languages_reads_like_a_dict_and_pickles_by_combo():
+    season = SeasonLanguages.from_mapping({"ita": 3, "eng/ita": 2, "und": 1, "kor": 4})
+
+    assert season == {"ita": 3, "eng/ita": 2, "und": 1, "kor": 4}
+    assert season["eng/ita"] == 2
+    assert "fra" not in season
+    assert len(season) == 4
+    assert pickle.loads(pickle.dumps(season)) == season
+
+
+def test_series_languages_packs_every_season_in_one_array():
+    seasons = {2: {"eng": 1}, 0: {"ita": 2, "und": 1}, 1: {"jpn/kor": 5}}
+    series = SeriesLanguages.from_mapping(seasons)
+
+    assert list(series) == [0, 1, 2]
+    assert series == seasons
+    assert series[1] == {"jpn/kor": 5}
+    assert pickle.loads(pickle.dumps(series)) == seasons
+    with pytest.raises(KeyError):
+        series[3]
+
+
+def test_season_languages_coverage_uses_language_masks():
+    season = SeasonLanguages.from_mapping({"ita": 3, "eng/jpn": 2, "und": 1, "kor": 4})
+
+    assert season.coverage(LANGUAGES.mask(["jpn", "kor"])) == (10, 6)
+    assert season.coverage(LANGUAGES.mask(["ita"]), ignore_unknown=True) == (9, 3)
+
+
 def test_parse_wanted_languages_preserves_first_seen_order():
     assert parse_wanted_langs("it, ENG/ita,fr") == ["ita", "eng", "fra"]
 
@@ -81,3 +134,40 @@ def test_wanted_coverage_ignores_unknown_and_sorts_wanted_languages():
             "lingue_desiderate": ["eng", "ita"],
         }
     ]
+
+
+@pytest.mark.parametrize(
+    ("name", "count"),
+    [
+        ("Season 01/Show - S01E01 - Pilot WEBDL-1080p.mkv", 1),
+        ("Show - S01E01E02E03 - Title.mkv", 3),
+        ("Show - S01E01-E02-E03 - Title.mkv", 3),
+        ("Show - S01E01-02-03 - Title.mkv", 3),
+        ("Show - S01E01-03 - Title.mkv", 3),
+        ("Show - S01E01-E04 - Title.mkv", 4),
+        ("Show.S01E01-1080p.mkv", 1),
+        ("Show - 2024-01-31 - Daily.mkv", 1),
+        ("Show - 0153 - Absolute.mkv", 1),
+    ],
+)
+def test_episodes_in_file_reads_multi_episode_names(name, count):
+    assert episodes_in_file({"relativePath": name}) == count
+
+
+def test_summarize_episode_files_counts_multi_episode_files():
+    files = {
+        1: {"seasonNumber": 1, "relativePath": "S01E01E02.mkv", "mediaInfo": {"audioLanguages": "ita"}},
+        2: {"seasonNumber": 1, "relativePath": "S01E03.mkv", "mediaInfo": {}},
+        3: {"seasonNumber": 2, "path": "/tv/Show/S02E01.mkv", "mediaInfo": {"audioLanguages": "eng/ita"}},
+    }
+
+    result = summarize_episode_files({"title": "Example"}, files)
+
+    assert {season: dict(langs) for season, langs in result["Example"].items()} == {
+        1: {"ita": 2, "und": 1},
+        2: {"eng/ita": 1},
+    }
+
+
+def test_summarize_episode_files_requires_season_numbers():
+    assert summarize_episode_files({"title": "Example"}, {1: {"mediaInfo": {}}}) is None
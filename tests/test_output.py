@@ -3,7 +3,10 @@ import stat
 from pathlib import Path
 from unittest.mock import patch
 
-from main import write_json_atomic
+import pytest
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import EXIT_OK, EXIT_PARTIAL, atomic_output, main, parse_args, write_json_atomic
 
 
 def test_write_json_atomic_replaces_existing_file_without_leaving_temporary_files(
@@ -30,3 +33,54 @@ def test_write_json_atomic_preserves_existing_file_mode(tmp_path):
     write_json_atomic({"complete": True}, output)
 
     assert stat.S_IMODE(output.stat().st_mode) == 0o640
+
+
+def test_atomic_output_keeps_previous_file_when_writing_fails(tmp_path):
+    output = tmp_path / "report.ndjson"
+    output.write_text("old\n", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with atomic_output(output) as stream:
+            stream.write("partial\n")
+            raise RuntimeError("scan aborted")
+
+    assert output.read_text(encoding="utf-8") == "old\n"
+    assert list(tmp_path.glob(".report.ndjson.*.tmp")) == []
+
+
+def canonical(item):
+    return json.dumps(item, sort_keys=True)
+
+
+def test_stream_writes_ndjson_matching_the_sorted_report(tmp_path):
+    sorted_output = tmp_path / "report.json"
+    stream_output = tmp_path / "report.ndjson"
+    with FakeSonarr(series_count=6, episodes_per_series=12) as fake:
+        common = ["--apikey", "k", "--url", fake.base_url, "--no-cache"]
+        assert main([*common, "--output", str(sorted_output)]) == EXIT_OK
+        assert main([*common, "--stream", "--structured-json", "--output", str(stream_output)]) == EXIT_OK
+
+    lines = [json.loads(line) for line in stream_output.read_text(encoding="utf-8").splitlines()]
+    assert lines[-1] == {"type": "riepilogo", "serie": 6, "non_riuscite": 0, "complete": True}
+    streamed = [{key: value for key, value in item.items() if key != "id"} for item in lines[:-1]]
+    expected = json.loads(sorted_output.read_text(encoding="utf-8"))
+    assert sorted(map(canonical, streamed)) == sorted(map(canonical, expected))
+    assert all(isinstance(item["id"], int) for item in lines[:-1])
+
+
+def test_stream_prints_progressive_text_and_failures(capsys):
+    with FakeSonarr(series_count=3, episodes_per_series=12) as fake:
+        fake.files[2] = {"not": "a list"}
+        exit_code = main(["--apikey", "k", "--url", fake.base_url, "--no-cache", "--stream", "--workers", "1"])
+
+    captured = capsys.readouterr()
+    assert exit_code == EXIT_PARTIAL
+    assert "Risultati (man mano che le serie vengono analizzate)" in captured.out
+    assert "Series 00001" in captured.out and "Series 00003" in captured.out
+    assert "Errore durante l'elaborazione della serie 'Series 00002'" in captured.err
+
+
+@pytest.mark.parametrize("extra", [["--serve"], ["--engine", "async"], ["--config", "instances.toml"]])
+def test_stream_is_single_scan_thread_engine_only(extra):
+    with pytest.raises(SystemExit):
+        parse_args(["--stream", *extra])
@@ -0,0 +1,75 @@
+import io
+import json
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import main, parse_args
+from scan_progress import ScanProgress, format_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class Counter:
+    count = 0
+
+
+def test_format_duration():
+    assert format_duration(12.4) == "12s"
+    assert format_duration(252) == "4m12s"
+    assert format_duration(3720) == "1h02m"
+
+
+def test_snapshot_estimates_eta_from_fetched_series_only():
+    clock, requests = FakeClock(), Counter()
+    progress = ScanProgress(10, requests=requests, concurrency=lambda: 4, stream=io.StringIO(), clock=clock)
+    progress.add_cached(4)
+    clock.now += 2
+    requests.count = 6
+    progress.advance()
+    progress.advance(failed=True)
+
+    state = progress.snapshot()
+    assert state["done"] == 6 and state["failures"] == 1
+    assert state["requests_per_second"] == 3.0
+    assert state["concurrency"] == 4
+    assert state["eta"] == 4.0  # 4 series left at 2 fetched per 2 seconds
+
+
+def test_terminal_redraws_one_line_and_ends_it_on_finish():
+    clock, stream = FakeClock(), io.StringIO()
+    progress = ScanProgress(2, stream=stream, interactive=True, clock=clock)
+    clock.now += 1
+    progress.advance()
+    progress.advance()  # within the interval: not drawn
+    progress.finish()
+
+    lines = stream.getvalue().split("\r")
+    assert lines[1].startswith("⏳ 1/2 serie (50%)") and "ETA 1s" in lines[1]
+    assert lines[2].startswith("⏳ 2/2 serie (100%)") and lines[2].endswith("\n")
+
+
+def test_log_lines_are_periodic_and_silent_on_finish():
+    clock, stream = FakeClock(), io.StringIO()
+    progress = ScanProgress(3, stream=stream, interactive=False, clock=clock)
+    progress.advance()
+    clock.now += 10
+    progress.advance(failed=True)
+    progress.finish()
+
+    assert stream.getvalue() == "avanzamento serie=2 totale=3 errori=1 eta_secondi=5\n"
+
+
+def test_quiet_silences_progress(tmp_path, capsys):
+    assert parse_args(["-q"]).quiet
+    output = tmp_path / "report.json"
+    with FakeSonarr(series_count=3, episodes_per_series=2) as fake:
+        argv = ["--apikey", "k", "--url", fake.base_url, "--no-cache", "--output", str(output), "--quiet"]
+        assert main(argv) == 0
+
+    assert "avanzamento" not in capsys.readouterr().err
+    assert json.loads(output.read_text(encoding="utf-8"))
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import EXIT_FATAL, EXIT_OK, EXIT_PARTIAL, _qualified_title_pattern, detect_issues, main, parse_args
+from scan_snapshot import EMPTY_SNAPSHOT, HEADER, ScanIndex, Snapshot, SnapshotError, changed_titles, diff_snapshots
+
+LANG_DATA = {
+    "Beta": {1: {"ita": 3, "eng": 2}, 2: {"eng": 5}},
+    "Alpha": {1: {"ita+eng": 4, "eng": 1}},
+    "Città ✓": {3: {"jpn": 1, "Nessuna traccia audio": 2}},
+}
+
+
+def detect(lang_summary):
+    return detect_issues(lang_summary, [], include_all=False, ignore_unknown=False)
+
+
+def write_snapshot(path, lang_data, complete=True):
+    path.write_bytes(ScanIndex(lang_data, complete).encode())
+    return Snapshot(path)
+
+
+def test_snapshot_round_trips_the_season_counts(tmp_path):
+    with write_snapshot(tmp_path / "scan.snap", LANG_DATA, complete=False) as snapshot:
+        assert snapshot.titles == sorted(LANG_DATA)
+        assert {title: snapshot.seasons(title) for title in snapshot.titles} == LANG_DATA
+        assert snapshot.digest == ScanIndex(LANG_DATA).digest
+        assert not snapshot.complete
+
+
+def test_unreadable_snapshots_raise_snapshot_error(tmp_path):
+    path = tmp_path / "scan.snap"
+    data = ScanIndex(LANG_DATA).encode()
+    cases = {
+        b"": "vuoto",
+        b"not a snapshot" + data: "non è uno snapshot",
+        data[:8] + (2).to_bytes(2, "little") + data[10:]: "versione 2 non supportata",
+        data[: HEADER.size + 3]: "troncato",
+    }
+    for content, message in cases.items():
+        path.write_bytes(content)
+        with pytest.raises(SnapshotError, match=message):
+            Snapshot(path)
+
+
+def test_diff_only_decodes_the_series_that_changed(tmp_path):
+    current = {
+        **LANG_DATA,
+        "Beta": {1: {"ita": 3}, 2: {"eng": 5}},
+        "Città ✓": {3: {"jpn": 2, "Nessuna traccia audio": 2}},
+        "Gamma": {1: {"eng": 1, "ita": 1}},
+    }
+    del current["Alpha"]
+    checked = []
+
+    def recording_detect(lang_summary):
+        checked.append(sorted(lang_summary))
+        return detect(lang_summary)
+
+    with write_snapshot(tmp_path / "scan.snap", LANG_DATA) as previous:
+        assert changed_titles(previous, ScanIndex(LANG_DATA)) == ([], [])
+        diff = diff_snapshots(previous, ScanIndex(current), recording_detect)
+        assert checked == [sorted(LANG_DATA), sorted(current)]
+        checked.clear()
+        diff_snapshots(previous, ScanIndex({**current, "Beta": LANG_DATA["Beta"]}), recording_detect)
+        assert checked == [["Alpha", "Città ✓"], ["Città ✓", "Gamma"]]
+
+    def keys(items):
+        return sorted((item["serie"], item.get("stagione") or 0) for item in items)
+
+    assert keys(diff["new"]) == [("Gamma", 0), ("Gamma", 1)]
+    assert keys(diff["resolved"]) == [("Alpha", 0), ("Alpha", 1), ("Beta", 1)]
+    assert [(change["before"]["lingue"], change["after"]["lingue"]) for change in diff["changed"]] == [
+        ({"Nessuna traccia audio": 2, "jpn": 1}, {"Nessuna traccia audio": 2, "jpn": 2})
+    ]
+    assert diff_snapshots(EMPTY_SNAPSHOT, ScanIndex(current), detect)["new"] == detect(current)
+
+
+def run_main(fake, tmp_path, *extra):
+    output = tmp_path / "diff.json"
+    snapshot = str(tmp_path / "scan.snap")
+    argv = ["--apikey", "k", "--url", fake.base_url, "--no-cache", "--output", str(output)]
+    exit_code = main([*argv, "--snapshot", snapshot, "--diff-against", snapshot, *extra])
+    return exit_code, json.loads(output.read_text(encoding="utf-8"))
+
+
+def issues_of(items, serie):
+    return [item for item in items if item["serie"] == serie]
+
+
+def test_runs_report_new_resolved_and_changed_issues(tmp_path):
+    with FakeSonarr(series_count=6, episodes_per_series=12) as fake:
+        exit_code, first = run_main(fake, tmp_path)
+        assert exit_code == EXIT_OK
+        assert first["new"] and not first["resolved"] and not first["changed"]
+
+        assert run_main(fake, tmp_path) == (EXIT_OK, {"new": [], "resolved": [], "changed": []})
+
+        for item in fake.files[4]:
+            item["mediaInfo"]["audioLanguages"] = "ita"
+        for item in fake.files[2][:3]:
+            item["mediaInfo"]["audioLanguages"] = "jpn"
+        exit_code, third = run_main(fake, tmp_path, "--structured-json")
+
+    assert exit_code == EXIT_OK and third["complete"]
+    assert third["resolved"] == issues_of(first["new"], "Series 00004")
+    assert {change["after"]["serie"] for change in third["changed"]} == {"Series 00002"}
+    assert all(change["before"] in first["new"] for change in third["changed"])
+
+
+def test_failed_series_are_carried_over_and_not_reported(tmp_path):
+    with FakeSonarr(series_count=4, episodes_per_series=8) as fake:
+        _, first = run_main(fake, tmp_path)
+        episodes = fake.episodes.pop(3)
+        exit_code, second = run_main(fake, tmp_path, "--retries", "0")
+        assert exit_code == EXIT_PARTIAL
+        assert second == {"new": [], "resolved": [], "changed": []}
+
+        with Snapshot(tmp_path / "scan.snap") as snapshot:
+            assert "Series 00003" in snapshot.titles and not snapshot.complete
+
+        fake.episodes[3] = episodes
+        assert run_main(fake, tmp_path) == (EXIT_OK, {"new": [], "resolved": [], "changed": []})
+    assert issues_of(first["new"], "Series 00003")
+
+
+def test_failed_titles_match_only_their_qualified_forms():
+    pattern = _qualified_title_pattern("Foo")
+    assert all(pattern.fullmatch(title) for title in ("Foo", "Foo (2019, ID 7)", "Foo (ID 7)"))
+    assert not any(pattern.fullmatch(title) for title in ("Foo (2019)", "Foo (main)", "Foobar"))
+    pattern = _qualified_title_pattern("Foo", "main")
+    assert all(pattern.fullmatch(title) for title in ("Foo", "Foo (main)", "Foo (main, 2019, ID 7)"))
+    assert not pattern.fullmatch("Foo (backup)")
+
+
+def test_failed_series_do_not_hide_series_with_a_longer_title(tmp_path):
+    with FakeSonarr(series_count=4, episodes_per_series=8) as fake:
+        fake.series[2]["title"], fake.series[3]["title"] = "Foo", "Foo (2019)"
+        _, first = run_main(fake, tmp_path)
+        fake.episodes.pop(fake.series[2]["id"])
+        for item in fake.files[fake.series[3]["id"]]:
+            item["mediaInfo"]["audioLanguages"] = "ita"
+        exit_code, second = run_main(fake, tmp_path, "--retries", "0")
+
+    assert exit_code == EXIT_PARTIAL
+    assert issues_of(first["new"], "Foo (2019)")
+    assert second["resolved"] == issues_of(first["new"], "Foo (2019)")
+
+
+def test_unreadable_diff_against_is_fatal(tmp_path, capsys):
+    snapshot = tmp_path / "scan.snap"
+    snapshot.write_bytes(b"garbage")
+    argv = ["--apikey", "k", "--url", "https://sonarr", "--diff-against", str(snapshot)]
+    assert main(argv) == EXIT_FATAL
+    assert "Snapshot non leggibile" in capsys.readouterr().err
+
+
+def test_snapshot_is_rejected_with_stream(capsys):
+    with pytest.raises(SystemExit):
+        parse_args(["--apikey", "k", "--url", "https://sonarr", "--snapshot", "scan.snap", "--stream"])
+    assert "--snapshot e --diff-against" in capsys.readouterr().err
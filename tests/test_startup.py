@@ -0,0 +1,68 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import main as main_module
+from main import parse_args
+
+MAIN = Path(main_module.__file__)
+# Imported only when a scan, a server or the cache needs them.
+DEFERRED_MODULES = (
+    "requests",
+    "urllib3",
+    "dotenv",
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+    "sqlite3",
+    "tempfile",
+    "http.server",
+    "tomllib",
+)
+
+
+def startup_imports(*argv):
+    """Run main.py under ``-X importtime``: ``(exit code, modules imported)``.
+
+    Modules the interpreter imports at startup (up to ``site``) are left out;
+    benchmarks/bench_startup.py reports how long the rest take.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(MAIN), *argv], capture_output=True, text=True, timeout=60
+    )
+    imported = set()
+    after_site = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        name = line.split("|")[2]
+        if after_site:
+            imported.add(name.strip())
+        after_site = after_site or name.strip() == "site"
+    return result.returncode, imported
+
+
+@pytest.mark.parametrize(("argv", "exit_code"), [(["--help"], 0), (["--workers", "0"], 2)])
+def test_help_and_argument_errors_skip_the_scan_dependencies(argv, exit_code):
+    returncode, imported = startup_imports(*argv)
+
+    assert returncode == exit_code
+    assert imported and not set(DEFERRED_MODULES) & imported
+
+
+def test_env_file_is_read_after_parsing(tmp_path, monkeypatch):
+    env_file = tmp_path / ".env"
+    env_file.write_text("API_KEY=from-file\nSONARR_URL=http://sonarr:8989\n", encoding="utf-8")
+    monkeypatch.setattr(main_module, "DOTENV_PATH", env_file)
+    for variable in ("API_KEY", "SONARR_URL"):
+        monkeypatch.setenv(variable, "")
+        monkeypatch.delenv(variable)
+
+    args = parse_args(["--apikey", "from-cli"])
+    assert (args.apikey, args.url) == ("from-cli", "http://sonarr:8989")
+    assert args.cache_file  # SCAN_CACHE_FILE from the environment, else the default file
+
+    monkeypatch.setenv("API_KEY", "from-environment")
+    assert parse_args([]).apikey == "from-environment"
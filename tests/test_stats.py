@@ -0,0 +1,124 @@
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import EXIT_OK, main, parse_args
+from scan_stats import ScanStats, endpoint_name, format_stats_table, percentile
+
+
+@pytest.mark.parametrize(
+    "percent, expected",
+    [(50, 5), (95, 10), (99, 10), (10, 1)],
+)
+def test_percentile_uses_nearest_rank(percent, expected):
+    assert percentile(list(range(1, 11)), percent) == expected
+
+
+def test_percentile_of_nothing_is_none():
+    assert percentile([], 50) is None
+
+
+def test_endpoint_name_strips_base_url_and_query():
+    assert endpoint_name("http://sonarr:8989/api/v3/episode?seriesId=1") == "/episode"
+    assert endpoint_name("http://sonarr:8989/other") == "/other"
+
+
+def response(url, status=200, milliseconds=10, retried=0, size=100):
+    history = tuple(SimpleNamespace(status=503, error=None) for _ in range(retried))
+    return SimpleNamespace(
+        url=url,
+        status_code=status,
+        elapsed=timedelta(milliseconds=milliseconds),
+        raw=SimpleNamespace(retries=SimpleNamespace(history=history), tell=lambda: size),
+    )
+
+
+def test_scan_stats_collects_requests_retries_and_bytes():
+    stats = ScanStats()
+    first = response("http://s/api/v3/episode?seriesId=1", milliseconds=10, retried=2, size=300)
+    stats(first)
+    stats.record_body(first, 0.02)
+    stats(url="http://s/api/v3/episodefile?seriesId=1", status=200, elapsed=0.03, size=50, retries=1)
+    stats.record_series("Show", 0.5, analysis_seconds=0.01)
+    stats.add_phase("scan", 1.0)
+    stats.capacity = 2
+
+    summary = stats.summary()
+
+    assert summary["requests"] == 2
+    assert summary["retries"] == 3
+    assert summary["bytes"] == 350
+    assert summary["statuses"] == {"200": 2}
+    assert summary["endpoints"]["/episode"]["latency"]["p50"] == pytest.approx(0.01)
+    assert summary["endpoints"]["/episode"]["transfer"]["p99"] == pytest.approx(0.02)
+    assert summary["series"]["slowest"] == [{"serie": "Show", "seconds": 0.5}]
+    assert summary["utilization"] == pytest.approx(0.25)
+    table = format_stats_table(summary)
+    assert "/episodefile" in table and "Utilizzo dei worker: 25% di 2" in table
+
+
+def test_stats_is_rejected_in_serve_mode():
+    with pytest.raises(SystemExit):
+        parse_args(["--serve", "--stats"])
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_main_prints_json_stats_on_stderr(engine, tmp_path, capsys):
+    with FakeSonarr(series_count=3, episodes_per_series=4) as fake:
+        exit_code = main(
+            [
+                "--apikey", "test",
+                "--url", fake.base_url,
+                "--no-cache",
+                "--engine", engine,
+                "--fetch-mode", "split",
+                "--stats", "json",
+                "--output", str(tmp_path / "report.json"),
+            ]
+        )
+
+    summary = json.loads(capsys.readouterr().err)
+    assert exit_code == EXIT_OK
+    assert summary["requests"] == 7
+    assert set(summary["endpoints"]) == {"/series", "/episode", "/episodefile"}
+    assert summary["endpoints"]["/episode"]["requests"] == 3
+    assert all(data["bytes"] > 0 for data in summary["endpoints"].values())
+    assert set(summary["phases"]) == {"series_list", "scan", "detection", "output"}
+    if engine == "threads":
+        assert summary["series"]["count"] == 3
+        assert summary["workers"] == 4 and summary["utilization"] > 0
+    assert summary["concurrency"] == []
+
+
+def test_json_stats_include_the_adaptive_concurrency(tmp_path, capsys):
+    with FakeSonarr(series_count=6, episodes_per_series=4) as fake:
+        argv = ["--apikey", "k", "--url", fake.base_url, "--no-cache", "--workers", "auto"]
+        assert main([*argv, "--stats", "json", "--output", str(tmp_path / "report.json")]) == EXIT_OK
+
+    summary = json.loads(capsys.readouterr().err)
+    (limits,) = summary["concurrency"]
+    assert limits["instance"] is None
+    assert limits["min"] <= limits["final"] <= limits["max"]
+    assert limits["changes"] == len(limits["timeline"]) - 1
+    assert "Concorrenza adattiva" in format_stats_table(summary)
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_stats_count_compressed_and_decoded_bytes(engine, tmp_path, capsys):
+    reports = []
+    for compression in ((), ("gzip",)):
+        output = tmp_path / f"report{len(reports)}.json"
+        with FakeSonarr(series_count=3, episodes_per_series=20, compression=compression) as fake:
+            argv = ["--apikey", "k", "--url", fake.base_url, "--no-cache", "--engine", engine]
+            assert main([*argv, "--stats", "json", "--output", str(output)]) == EXIT_OK
+        reports.append(output.read_text(encoding="utf-8"))
+        summary = json.loads(capsys.readouterr().err)
+
+    assert reports[0] == reports[1]
+    for data in summary["endpoints"].values():
+        assert 0 < data["bytes"] < data["decoded_bytes"]
+    assert summary["decoded_bytes"] > 5 * summary["bytes"]
+    assert "decodificati" in format_stats_table(summary)
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks.fake_sonarr import FakeSonarr
+from main import create_webhook_server, normalize_url, parse_args
+from webhook_server import SeriesDebouncer, parse_webhook_event
+
+
+@pytest.fixture
+def fake_sonarr():
+    with FakeSonarr(series_count=3, episodes_per_series=4) as fake:
+        yield fake
+
+
+@pytest.fixture
+def start_server(fake_sonarr):
+    servers = []
+
+    def start(*extra):
+        args = parse_args(
+            [
+                "--apikey", "test",
+                "--url", fake_sonarr.base_url,
+                "--serve",
+                "--listen", "127.0.0.1:0",
+                "--debounce", "0.05",
+                "--show-all",
+                "--no-cache",
+                *extra,
+            ]
+        )
+        server = create_webhook_server(args, normalize_url(args.url), (3.0, 5.0), fake_sonarr.series)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        server.server_close()
+        server.debouncer.close()
+        thread.join()
+
+
+def wait_for_report(url, previous):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        report = requests.get(f"{url}/report", timeout=5).json()
+        if report != previous:
+            return report
+        time.sleep(0.02)
+    raise AssertionError("report was not updated")
+
+
+def series_entries(report, title):
+    return [item for item in report["results"] if item["serie"] == title]
+
+
+def test_parse_webhook_event_maps_sonarr_payloads():
+    payload = {"eventType": "Download", "series": {"id": 7, "title": "Show", "year": 2020, "type": "anime"}}
+
+    assert parse_webhook_event(payload) == (
+        "refresh",
+        {"id": 7, "title": "Show", "year": 2020, "seriesType": "anime"},
+    )
+    assert parse_webhook_event({"eventType": "SeriesDelete", "series": {"id": 7}}) == ("remove", {"id": 7})
+    assert parse_webhook_event({"eventType": "Test"}) is None
+    with pytest.raises(ValueError, match="series.id"):
+        parse_webhook_event({"eventType": "Download"})
+
+
+def test_debouncer_coalesces_bursts_per_series():
+    batches = []
+    flushed = threading.Event()
+
+    def flush(batch):
+        batches.append(batch)
+        flushed.set()
+
+    debouncer = SeriesDebouncer(0.1, flush)
+    try:
+        for value in range(5):
+            debouncer.add(1, value)
+        debouncer.add(2, "x")
+        assert flushed.wait(2)
+    finally:
+        debouncer.close()
+
+    assert batches == [{1: 4, 2: "x"}]
+
+
+def test_webhook_refreshes_only_the_notified_series(fake_sonarr, start_server):
+    url = start_server()
+    report = requests.get(f"{url}/report", timeout=5).json()
+    assert report["complete"] is True
+    assert {item["serie"] for item in report["results"]} == {"Series 00001", "Series 00002", "Series 00003"}
+
+    for file in fake_sonarr.files[2]:
+        file["mediaInfo"]["audioLanguages"] = "jpn"
+    fake_sonarr.reset_counters()
+    response = requests.post(
+        f"{url}/webhook",
+        json={"eventType": "Download", "series": {"id": 2, "title": "Series 00002", "year": 2002}},
+        timeout=5,
+    )
+    assert response.status_code == 202
+
+    report = wait_for_report(url, report)
+    assert series_entries(report, "Series 00002") == [
+        {"type": "stagione_ok", "serie": "Series 00002", "stagione": 1, "lingue": {"jpn": 4}},
+        {"type": "serie_ok", "serie": "Series 00002", "lingue": ["jpn"]},
+    ]
+    # Only the notified series was fetched again: its /series/{id} item and one /episode request.
+    assert fake_sonarr.requests == 2
+
+    response = requests.post(
+        f"{url}/webhook", json={"eventType": "SeriesDelete", "series": {"id": 1}}, timeout=5
+    )
+    assert response.status_code == 202
+    report = wait_for_report(url, report)
+    assert series_entries(report, "Series 00001") == []
+
+
+def test_webhook_refresh_filters_on_the_sonarr_series(fake_sonarr, start_server):
+    fake_sonarr.series[1]["monitored"] = False
+    url = start_server("--include", "monitored=true")
+    report = requests.get(f"{url}/report", timeout=5).json()
+    assert {item["serie"] for item in report["results"]} == {"Series 00001", "Series 00003"}
+
+    fake_sonarr.reset_counters()
+    for serie_id in (1, 2):
+        event = {"eventType": "Download", "series": {"id": serie_id, "title": f"Series {serie_id:05d}"}}
+        assert requests.post(f"{url}/webhook", json=event, timeout=5).status_code == 202
+    # /series/1 and its /episode, then /series/2, which is still not monitored.
+    deadline = time.monotonic() + 5
+    while fake_sonarr.requests < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.1)
+    report = requests.get(f"{url}/report", timeout=5).json()
+    assert fake_sonarr.requests == 3
+    assert {item["serie"] for item in report["results"]} == {"Series 00001", "Series 00003"}
+
+    fake_sonarr.series[1]["monitored"] = True
+    event = {"eventType": "Download", "series": {"id": 2, "title": "Series 00002"}}
+    assert requests.post(f"{url}/webhook", json=event, timeout=5).status_code == 202
+    report = wait_for_report(url, report)
+    assert {item["serie"] for item in report["results"]} == {"Series 00001", "Series 00002", "Series 00003"}
+
+
+def test_webhook_password_is_enforced(start_server):
+    url = start_server("--webhook-password", "segreta")
+    event = {"eventType": "Test"}
+
+    assert requests.post(f"{url}/webhook", json=event, timeout=5).status_code == 401
+    assert requests.post(f"{url}/webhook", json=event, auth=("sonarr", "sbagliata"), timeout=5).status_code == 401
+    response = requests.post(f"{url}/webhook", json=event, auth=("sonarr", "segreta"), timeout=5)
+    assert response.status_code == 202
+    assert response.json() == {"accepted": False}
+
+
+def test_serve_rejects_output_file():
+    with pytest.raises(SystemExit):
+        parse_args(["--serve", "--output", "report.json"])
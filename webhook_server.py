@@ -0,0 +1,204 @@
+"""Long-running listener that keeps the language report current from Sonarr webhooks."""
+
+import base64
+import hmac
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Sonarr Connect → Webhook event types that change a series' episode files.
+REFRESH_EVENTS = frozenset({"Download", "EpisodeFileDelete", "Rename"})
+REMOVE_EVENTS = frozenset({"SeriesDelete"})
+MAX_WEBHOOK_BODY = 1024 * 1024
+
+
+def parse_webhook_event(payload):
+    """Return ``(action, serie)`` for a Sonarr webhook body, or None to ignore it.
+
+    ``action`` is ``"refresh"`` or ``"remove"``; ``serie`` is shaped like a
+    /series item (``id``, ``title``, ``year``, ``seriesType``).
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("webhook body must be a JSON object")
+    event_type = payload.get("eventType")
+    if event_type in REFRESH_EVENTS:
+        action = "refresh"
+    elif event_type in REMOVE_EVENTS:
+        action = "remove"
+    else:
+        return None
+    series = payload.get("series")
+    if not isinstance(series, dict) or series.get("id") is None:
+        raise ValueError(f"{event_type} webhook without series.id")
+    serie = {key: series[key] for key in ("id", "title", "year") if key in series}
+    if "type" in series:
+        serie["seriesType"] = series["type"]
+    return action, serie
+
+
+class ReportState:
+    """Latest per-series scan results and the report rendered from them.
+
+    Entries and failures are keyed by series id; ``render(entries, failures)``
+    turns their values into the report list and runs under the state lock.
+    """
+
+    def __init__(self, render):
+        self._render = render
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._failures = {}
+        self._report = {"results": [], "failures": [], "complete": True, "updated_at": None}
+
+    def update(self, entries=None, failures=None, removed=()):
+        with self._lock:
+            for series_id, entry in (entries or {}).items():
+                self._entries[series_id] = entry
+                self._failures.pop(series_id, None)
+            for series_id, failure in (failures or {}).items():
+                self._entries.pop(series_id, None)
+                self._failures[series_id] = failure
+            for series_id in removed:
+                self._entries.pop(series_id, None)
+                self._failures.pop(series_id, None)
+            results, failure_list = self._render(
+                list(self._entries.values()), list(self._failures.values())
+            )
+            self._report = {
+                "results": results,
+                "failures": failure_list,
+                "complete": not failure_list,
+                "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+
+    def report(self):
+        with self._lock:
+            return self._report
+
+
+class SeriesDebouncer:
+    """Collect series ids and hand them over in batches once events stop arriving.
+
+    A batch is flushed ``delay`` seconds after its last event, and at most
+    ``max_delay`` seconds after its first one so a busy import queue cannot
+    postpone updates forever.
+    """
+
+    def __init__(self, delay: float, flush, max_delay=None):
+        self.delay = delay
+        self.max_delay = max_delay if max_delay is not None else delay * 10
+        self._flush = flush
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._first_event = None
+        self._last_event = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="webhook-debouncer", daemon=True)
+        self._thread.start()
+
+    def add(self, key, value):
+        with self._condition:
+            now = time.monotonic()
+            self._pending[key] = value
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._first_event is None:
+                        self._condition.wait()
+                        continue
+                    now = time.monotonic()
+                    due = min(self._last_event + self.delay, self._first_event + self.max_delay)
+                    if now >= due:
+                        break
+                    self._condition.wait(due - now)
+                if self._closed and not self._pending:
+                    return
+                batch = self._pending
+                self._pending = {}
+                self._first_event = self._last_event = None
+            self._flush(batch)
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    server_version = "sonarr-lang-checker"
+
+    def log_message(self, format, *args):
+        return None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] == "/report":
+            self._send_json(200, self.server.state.report())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"errore": "not found"})
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0] != "/webhook":
+            self._send_json(404, {"errore": "not found"})
+            return
+        if not self._authorized():
+            self.send_response(401)
+            self.send_header("WWW-Authenticate", 'Basic realm="sonarr-lang-checker"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            if not 0 <= length <= MAX_WEBHOOK_BODY:
+                raise ValueError("webhook body too large")
+            event = parse_webhook_event(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as error:
+            self._send_json(400, {"errore": str(error)})
+            return
+        if event is not None:
+            action, serie = event
+            self.server.debouncer.add(serie["id"], (action, serie))
+        self._send_json(202, {"accepted": event is not None})
+
+    def _authorized(self):
+        password = self.server.password
+        if not password:
+            return True
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Basic "):
+            return False
+        try:
+            _, _, supplied = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            return False
+        return hmac.compare_digest(supplied.encode(), password.encode())
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """POST /webhook receives Sonarr events, GET /report serves the current report."""
+
+    daemon_threads = True
+
+    def __init__(self, address, state: ReportState, debouncer: SeriesDebouncer, password=None):
+        super().__init__(address, _WebhookHandler)
+        self.state = state
+        self.debouncer = debouncer
+        self.password = password